@@ -0,0 +1,522 @@
+"""
+Module containing benchmarks for the performance-sensitive parts of the game.
+Each benchmark prints its own results, and can be run from the command line:
+
+    python benchmark.py <benchmark name> [count]
+"""
+
+
+# Standard Library Modules
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+# Third-party Library Modules
+import numpy as np
+
+# Local Modules
+from computer_player import ComputerPlayer, Position
+from game_board import Board, Piece
+from game_records import GameArchive
+from game_server import GameServer
+from hubs import PlayerLounge
+from matchmaking import MatchmakingQueue
+from sessions import configure_sessions
+from simulation import GreedyPolicy, RandomPolicy, run_simulation
+from user_store import (
+    CachedJsonUserRepository,
+    JsonUserRepository,
+    configure_repository,
+    new_user,
+    replace_file
+)
+from user_utils import bootstrap_users
+from win_conditions import VictoryChecker, batch_victory
+
+
+def benchmark_batch_victory(count=10000):
+    """
+    Benchmark comparing batch_victory() against the scalar referee, checking
+    the same random final positions one board at a time.
+
+    Args:
+    1. count (int): The number of positions to check.
+    """
+    players = [Piece("Bench1", "red", "O", "1"), Piece("Bench2", "blue", "X", "2")]
+    board = Board(players)
+    referee = VictoryChecker(board, players)
+    rng = np.random.default_rng(0)
+    positions = rng.choice(["0", "1", "2"], size=(count, 6, 7), p=[0.4, 0.3, 0.3])
+
+    start = time.perf_counter()
+    for position in positions:
+        board.array = position
+        referee.check_victory()
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_victory(positions)
+    batch = time.perf_counter() - start
+
+    print(f"Scalar referee: {count / scalar:,.0f} boards/s")
+    print(f"Batch referee: {count / batch:,.0f} boards/s")
+    print(f"Speed-up: {scalar / batch:.1f}x")
+
+
+def benchmark_computer_player(count=20, time_budget=0.1):
+    """
+    Benchmark of the computer player's search, playing a game against itself
+    and reporting the depth reached and nodes searched per second per move.
+
+    Args:
+    1. count (int): The maximum number of moves to play.
+    2. time_budget (float): The number of seconds allowed per move.
+    """
+    computer = ComputerPlayer(time_budget=time_budget)
+    position = Position()
+    nodes, seconds, depths = 0, 0.0, []
+    for _ in range(count):
+        column = computer.search(position)
+        search = computer.last_search
+        nodes += search["nodes"]
+        seconds += search["seconds"]
+        depths.append(search["depth"])
+        if position.is_winning_move(column) or position.moves == 41:
+            break
+        position.play(column)
+
+    print(f"Moves searched: {len(depths)}")
+    print(f"Average depth: {sum(depths) / len(depths):.1f} plies")
+    print(f"Average time per move: {seconds / len(depths) * 1000:.1f} ms")
+    print(f"Search speed: {nodes / seconds:,.0f} nodes/s")
+
+
+def benchmark_simulation(count=20000):
+    """
+    Benchmark of the simulation harness, playing random against greedy games
+    with 1 worker and then doubling the workers up to the number of CPUs, to
+    show how throughput scales with cores.
+
+    Args:
+    1. count (int): The number of games to play per run.
+    """
+    policies = [RandomPolicy(), GreedyPolicy()]
+    workers, single = 1, None
+    while workers <= (os.cpu_count() or 1):
+        results = run_simulation(count, policies, workers)
+        single = single or results["games_per_second"]
+        print(
+            f"{workers} worker(s): {results['games_per_second']:,.0f} games/s "
+            f"({results['games_per_second'] / single / workers:.0%} efficiency)"
+        )
+        workers *= 2
+
+
+def _write_users(path, usernames):
+    """Writes a users file of new accounts."""
+    replace_file(path, json.dumps([
+        new_user(username, "0000", "white", "O") for username in usernames
+    ], indent=4).encode("utf-8"))
+
+
+def _user_store_writer(path, backend, writer, count, usernames):
+    """
+    Writer process of benchmark_user_store(), alternating between changing a
+    user's piece color and recording a game between two users.
+    """
+    rng = random.Random(writer)
+    if backend == "json":
+        repository = JsonUserRepository(path)
+    else:
+        # Every change is written at once, as if each writer was a session
+        # ending after one change.
+        repository = CachedJsonUserRepository(
+            path, flush_every=1, flush_interval=None, compact_every=100
+        )
+    for index in range(count):
+        if index % 2:
+            players = rng.sample(usernames, 2)
+            repository.record_game(players, players[0])
+        else:
+            repository.update(rng.choice(usernames), color=f"writer{writer}")
+    repository.close()
+
+
+def benchmark_user_store(writers=8, count=100, users=1000):
+    """
+    Stress benchmark of the JSON user repositories, with several processes
+    writing to the same users file at once. Reports the throughput of each
+    backend, and checks that no game result was lost.
+
+    Args:
+    1. writers (int): The number of writer processes.
+    2. count (int): The number of changes made by each writer.
+    3. users (int): The number of users in the file.
+    """
+    usernames = [f"user{index:06}" for index in range(users)]
+    for backend in ("json", "cached_json"):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "users.json")
+            _write_users(path, usernames)
+            processes = [
+                multiprocessing.Process(
+                    target=_user_store_writer,
+                    args=(path, backend, writer, count, usernames)
+                )
+                for writer in range(writers)
+            ]
+            start = time.perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            seconds = time.perf_counter() - start
+
+            repository = CachedJsonUserRepository(path, flush_interval=None)
+            recorded = sum(user["games_played"] for user in repository.all())
+            repository.close()
+            lost = writers * (count // 2) - recorded // 2
+            print(
+                f"{backend}: {writers * count / seconds:,.0f} changes/s with "
+                f"{writers} writers, {lost} game results lost"
+            )
+
+
+def benchmark_startup(users=100000):
+    """
+    Benchmark of the time taken to prepare user accounts before the first
+    prompt: bootstrap_users() (checking and loading users.json), then
+    building the player lounge's leaderboards.
+
+    Args:
+    1. users (int): The number of users in the file.
+    """
+    usernames = [f"user{index:06}" for index in range(users)]
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as temporary:
+        os.chdir(temporary)
+        try:
+            _write_users("users.json", usernames)
+            start = time.perf_counter()
+            bootstrap_users().flush()
+            PlayerLounge()
+            seconds = time.perf_counter() - start
+            print(f"{users:,} users: {seconds:.2f} s with bootstrap_users()")
+            configure_repository("json").close()
+        finally:
+            os.chdir(directory)
+
+
+async def _game_server_client(port, rng, latencies, started, login=None):
+    """
+    Function to play one game on a game server, as a guest or logged in,
+    dropping pieces onto random columns that are not full, and timing how
+    long each move takes to be confirmed.
+
+    Args:
+    1. port (int): The server's port on localhost.
+    2. rng (random.Random): The random number generator choosing columns.
+    3. latencies (list): The list each move's latency (s) is added to.
+    4. started (list): The list the number of tables in progress is added to
+       as each of the client's games starts.
+    5. login (str): The username and pin to log in with, or None to play as
+       a guest.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if login is not None:
+        writer.write(f"LOGIN {login}\n".encode("utf-8"))
+    writer.write(b"JOIN\n")
+    heights = [0] * 8
+    seat = turn = None
+    sent = None
+    while True:
+        line = (await reader.readline()).decode("utf-8").split()
+        if not line or line[0] == "OVER":
+            break
+        if line[0] == "START":
+            seat, turn = line[2], "1"
+            started.append(line[1])
+        elif line[0] == "MOVE":
+            heights[int(line[2])] += 1
+            turn = "2" if line[1] == "1" else "1"
+            if line[1] == seat:
+                latencies.append(time.perf_counter() - sent)
+        elif line[0] == "ERR":
+            raise RuntimeError(" ".join(line))
+        # After a winning move, this DROP is refused once OVER is read.
+        columns = [column for column in range(1, 8) if heights[column] < 6]
+        if turn == seat and line[0] != "OK" and columns:
+            sent = time.perf_counter()
+            writer.write(f"DROP {rng.choice(columns)}\n".encode("utf-8"))
+    # Waits for the server to be done with the client, logging it out.
+    writer.write(b"QUIT\n")
+    while line and line != ["OK", "QUIT"]:
+        line = (await reader.readline()).decode("utf-8").split()
+    writer.close()
+
+
+async def _game_server_load(tables, seed, logins):
+    """
+    Function to start a game server on a free port of localhost, and play a
+    game at every table at once, the clients given logins logging in first.
+    Returns the move latencies (s), the peak number of tables in progress and
+    the time taken (s).
+    """
+    server = GameServer(GameArchive("games.bin"))
+    listener = await asyncio.start_server(
+        server.handle, "127.0.0.1", 0, backlog=2 * tables
+    )
+    port = listener.sockets[0].getsockname()[1]
+    latencies = []
+    started = []
+    peak = []
+    rng = random.Random(seed)
+
+    async def sample():
+        # Samples the tables in progress while the clients play.
+        while True:
+            peak.append(len(server.tables))
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.ensure_future(sample())
+    start = time.perf_counter()
+    logins = logins + [None] * (2 * tables - len(logins))
+    await asyncio.gather(*(
+        _game_server_client(port, rng, latencies, started, login)
+        for login in logins
+    ))
+    seconds = time.perf_counter() - start
+    sampler.cancel()
+    listener.close()
+    await listener.wait_closed()
+    return latencies, max(peak), seconds
+
+
+def benchmark_game_server(tables=1000, seed=0, accounts=0.5):
+    """
+    Load benchmark of the game server, with twice as many clients as tables
+    connecting over localhost in the same event loop, each playing one game
+    of random moves. Part of the clients log in to accounts, so that their
+    logins, results and logouts are recorded in a users file, and every game
+    in an archive, as by serve(). Reports the peak number of tables in
+    progress, the moves per second, and the latency percentiles of a move
+    (from sending DROP to receiving its MOVE).
+
+    Args:
+    1. tables (int): The number of tables played at once.
+    2. seed (int): The seed of the clients' random moves.
+    3. accounts (float): The share of the tables played by logged in
+       clients.
+    """
+    usernames = [
+        f"user{index:06}" for index in range(2 * round(tables * accounts))
+    ]
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as temporary:
+        os.chdir(temporary)
+        try:
+            _write_users("users.json", usernames)
+            bootstrap_users()
+            latencies, peak, seconds = asyncio.run(_game_server_load(
+                tables, seed, [f"{username} 0000" for username in usernames]
+            ))
+            configure_repository("json").close()
+            configure_sessions()
+        finally:
+            os.chdir(directory)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    print(
+        f"{tables:,} tables ({peak:,} at once, {len(usernames) // 2:,} "
+        f"logged in): {len(latencies):,} moves in "
+        f"{seconds:.2f} s, {len(latencies) / seconds:,.0f} moves/s"
+    )
+    print(
+        f"Move latency: p50 {p50:.2f} ms, p90 {p90:.2f} ms, p99 {p99:.2f} ms"
+    )
+
+
+def benchmark_matchmaking(players=100000, seed=0):
+    """
+    Benchmark of the matchmaking queue with many players waiting. Players
+    join with ratings spread around 50 and join times spread over a minute,
+    then are paired in one round, and the players left are paired again as
+    their gaps widen. Reports the throughput of joining and pairing.
+
+    Args:
+    1. players (int): The number of players waiting.
+    2. seed (int): The seed of the players' ratings and join times.
+    """
+    rng = random.Random(seed)
+    entries = [
+        (index, min(100.0, max(0.0, rng.gauss(50, 20))), rng.uniform(0, 60))
+        for index in range(players)
+    ]
+    queue = MatchmakingQueue()
+    start = time.perf_counter()
+    for player, rating, joined in entries:
+        queue.enqueue(player, rating, joined)
+    seconds = time.perf_counter() - start
+    print(
+        f"Enqueued {players:,} players in {seconds * 1000:.1f} ms "
+        f"({players / seconds:,.0f} players/s)"
+    )
+
+    ratings = {player: rating for player, rating, _ in entries}
+    now = 60.0
+    while queue:
+        waiting = len(queue)
+        start = time.perf_counter()
+        pairs = queue.pair(now)
+        seconds = time.perf_counter() - start
+        if not pairs:
+            break
+        gaps = [abs(ratings[first] - ratings[second]) for first, second in pairs]
+        print(
+            f"t={now:.0f} s: {waiting:,} waiting, {len(pairs):,} pairs in "
+            f"{seconds * 1000:.1f} ms ({len(pairs) / seconds:,.0f} pairs/s), "
+            f"mean gap {sum(gaps) / len(gaps):.2f}, max gap {max(gaps):.2f}"
+        )
+        now += 10.0
+
+
+async def _spectator(port, slow, received):
+    """
+    Function to watch the game at table 1 of a game server. A slow spectator
+    takes no lines at all, with a small receive buffer; the others count the
+    MOVE, CLEARED and SNAPSHOT lines they get until the game is over.
+
+    Returns the spectator's streams.
+    """
+    sock = socket.socket()
+    if slow:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    writer.write(b"WATCH 1\n")
+    await reader.readline()
+    if not slow:
+        async def watch():
+            while True:
+                line = (await reader.readline()).decode("utf-8")
+                if not line or line.startswith("OVER"):
+                    return
+                kind = line.split()[0]
+                received[kind] = received.get(kind, 0) + 1
+
+        received["tasks"].append(asyncio.ensure_future(watch()))
+    return reader, writer
+
+
+async def _spectator_load(spectators, moves, slow):
+    """
+    Function to start a game server on a free port of localhost, seat two
+    players at table 1 with spectators watching, and play a number of moves.
+    The players drop pieces along the bottom row and clear the board every
+    six pieces, so the game never ends by itself.
+
+    Returns the move latencies (s), the lines each kind of spectator line
+    reached the fast spectators, and the number of snapshots that replaced
+    lines for slow spectators.
+    """
+    server = GameServer()
+    listener = await asyncio.start_server(
+        server.handle, "127.0.0.1", 0, backlog=spectators + 2
+    )
+    port = listener.sockets[0].getsockname()[1]
+    players = [
+        await asyncio.open_connection("127.0.0.1", port) for _ in range(2)
+    ]
+    for reader, writer in players:
+        writer.write(b"JOIN\n")
+        await reader.readline()
+    await players[0][0].readline()
+
+    received = {"tasks": []}
+    watchers = [
+        await _spectator(port, index < spectators * slow, received)
+        for index in range(spectators)
+    ]
+    feeds = [spectator.feed for spectator in server.tables[1].spectators]
+
+    latencies = []
+    for index in range(moves):
+        step = index % 7
+        seat = step % 2 if step < 6 else 0
+        command = f"DROP {step + 1}" if step < 6 else "CLEAR"
+        start = time.perf_counter()
+        players[seat][1].write(f"{command}\n".encode("utf-8"))
+        await players[seat][0].readline()
+        latencies.append(time.perf_counter() - start)
+        await players[1 - seat][0].readline()
+    players[0][1].write(b"SURRENDER\n")
+
+    await asyncio.gather(*received.pop("tasks"))
+    for _, writer in players + watchers:
+        writer.close()
+    # Lets the server see every connection close before the loop stops.
+    await asyncio.sleep(0.1)
+    listener.close()
+    await listener.wait_closed()
+    return latencies, received, sum(feed.snapshots for feed in feeds)
+
+
+def benchmark_spectators(spectators=200, moves=20000, slow=0.5):
+    """
+    Benchmark of one game server table watched by many spectators, some of
+    them too slow to take the lines they are sent. Reports the latency
+    percentiles of the players' moves with and without spectators, what the
+    other spectators received, and how often slow spectators had their
+    lines replaced by a snapshot.
+
+    Args:
+    1. spectators (int): The number of spectators.
+    2. moves (int): The number of moves played (clearing the board counts as
+       a move).
+    3. slow (float): The share of spectators who take no lines.
+    """
+    for watching in (0, spectators):
+        latencies, received, snapshots = asyncio.run(
+            _spectator_load(watching, moves, slow)
+        )
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(
+            f"{watching} spectators ({int(watching * slow)} slow): move "
+            f"latency p50 {p50:.2f} ms, p99 {p99:.2f} ms"
+        )
+        if watching:
+            fast = watching - int(watching * slow)
+            print(
+                f"Fast spectators: {received.get('MOVE', 0) // fast:,} MOVE, "
+                f"{received.get('CLEARED', 0) // fast:,} CLEARED and "
+                f"{received.get('SNAPSHOT', 0) / fast:.1f} SNAPSHOT lines "
+                "each; slow spectators: "
+                f"{snapshots / (watching - fast):.1f} snapshots each"
+            )
+
+
+BENCHMARKS = {
+    "batch_victory": benchmark_batch_victory,
+    "computer_player": benchmark_computer_player,
+    "game_server": benchmark_game_server,
+    "matchmaking": benchmark_matchmaking,
+    "simulation": benchmark_simulation,
+    "spectators": benchmark_spectators,
+    "startup": benchmark_startup,
+    "user_store": benchmark_user_store,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmark.py ({' / '.join(BENCHMARKS)}) [count]")
+        sys.exit(1)
+    BENCHMARKS[sys.argv[1]](
+        *(float(arg) if "." in arg else int(arg) for arg in sys.argv[2:])
+    )
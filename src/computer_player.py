@@ -0,0 +1,366 @@
+"""
+Module that contains the ComputerPlayer class, an opponent that can take
+either seat of a match, and the Position class, the compact representation of
+the board it searches on.
+"""
+
+
+# Standard Library Modules
+import time
+
+
+# Board geometry of a Position. Column c occupies bits 7c to 7c + 6, bit 7c
+# being the bottom slot, the same layout as BitBoard's bitboards. The 7th bit
+# of each column is a sentinel that is never set.
+WIDTH = 7
+HEIGHT = 6
+BOTTOM_MASK = sum(1 << (column * (HEIGHT + 1)) for column in range(WIDTH))
+BOARD_MASK = BOTTOM_MASK * ((1 << HEIGHT) - 1)
+# Columns (0-6) searched from the center outwards.
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+# Move orders trying a given column (e.g. a transposition table's best move)
+# first, then the rest from the center outwards.
+ORDER_AFTER = {
+    first: (first,) + tuple(column for column in MOVE_ORDER if column != first)
+    for first in MOVE_ORDER
+}
+# Score of a win on the spot. Wins found sooner score higher.
+WIN_SCORE = 1000
+
+
+def bottom_mask(column):
+    """Returns the bitmask of the bottom slot of a column (0-6)."""
+    return 1 << (column * (HEIGHT + 1))
+
+
+def top_mask(column):
+    """Returns the bitmask of the top slot of a column (0-6)."""
+    return 1 << (HEIGHT - 1 + column * (HEIGHT + 1))
+
+
+def column_mask(column):
+    """Returns the bitmask of all the slots of a column (0-6)."""
+    return ((1 << HEIGHT) - 1) << (column * (HEIGHT + 1))
+
+
+def alignment(position):
+    """
+    Function to check whether a bitboard holds 4 aligned pieces, by shifting
+    it onto itself in each of the four directions.
+
+    Args:
+    1. position (int): The bitboard of one player.
+
+    Returns True if 4 pieces are aligned, False otherwise.
+    """
+    # Horizontal, diagonal (both ways), and vertical neighbours are 7, 6, 8,
+    # and 1 bits apart respectively.
+    for shift in (HEIGHT + 1, HEIGHT, HEIGHT + 2, 1):
+        pairs = position & (position >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+def winning_cells(position, mask):
+    """
+    Function to find the empty slots that would complete a line of 4 for a
+    player.
+
+    Args:
+    1. position (int): The bitboard of the player.
+    2. mask (int): The bitboard of all occupied slots.
+
+    Returns a bitboard of those slots.
+    """
+    # Vertical lines can only be completed from the top.
+    cells = (position << 1) & (position << 2) & (position << 3)
+    for shift in (HEIGHT + 1, HEIGHT, HEIGHT + 2):
+        pairs = (position << shift) & (position << (2 * shift))
+        cells |= pairs & (position << (3 * shift))
+        cells |= pairs & (position >> shift)
+        pairs = (position >> shift) & (position >> (2 * shift))
+        cells |= pairs & (position << shift)
+        cells |= pairs & (position >> (3 * shift))
+    return cells & (BOARD_MASK ^ mask)
+
+
+class Position:
+    """
+    Represents a board position in a compact form for searching, so that no
+    NumPy array is copied or indexed while exploring moves.
+
+    Attributes:
+    1. current (int): The bitboard of the player to move.
+    2. mask (int): The bitboard of all occupied slots.
+    3. moves (int): The number of pieces on the board.
+    """
+    __slots__ = ("current", "mask", "moves")
+
+    def __init__(self, current=0, mask=0, moves=0):
+        self.current = current
+        self.mask = mask
+        self.moves = moves
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        A method to build a Position from a Board (or BitBoard). Player 1
+        always moves first, so the player to move is the one with fewer
+        pieces on the board.
+
+        Args:
+        1. board (Board): The board to read the position from.
+
+        Returns the Position.
+        """
+        if hasattr(board, "bitboards"):
+            bitboards = list(board.bitboards)
+        else:
+            bitboards = [0, 0]
+            for column in range(WIDTH):
+                for height in range(HEIGHT):
+                    slot = board.slot(HEIGHT - 1 - height, column + 1)
+                    if slot == "0":
+                        break
+                    bitboards[int(slot) - 1] |= 1 << (column * (HEIGHT + 1) + height)
+        moves = bitboards[0].bit_count() + bitboards[1].bit_count()
+        to_move = 0 if bitboards[0].bit_count() == bitboards[1].bit_count() else 1
+        return cls(bitboards[to_move], bitboards[0] | bitboards[1], moves)
+
+    @classmethod
+    def from_moves(cls, columns):
+        """
+        A method to build a Position by playing a sequence of columns (1-7)
+        from an empty board.
+        """
+        position = cls()
+        for column in columns:
+            position.play(column - 1)
+        return position
+
+    def key(self):
+        """
+        Returns an integer identifying the position, unique since each column
+        of current + mask is the player's pieces plus a bit above the stack.
+        """
+        return self.current + self.mask
+
+    def can_play(self, column):
+        """Returns whether a column (0-6) has a free slot left."""
+        return not self.mask & top_mask(column)
+
+    def play(self, column):
+        """
+        A method to drop a piece of the player to move in a column (0-6). The
+        position then belongs to the other player.
+        """
+        self.current ^= self.mask
+        self.mask |= self.mask + bottom_mask(column)
+        self.moves += 1
+
+    def is_winning_move(self, column):
+        """Returns whether dropping in a column (0-6) wins for the player to move."""
+        position = self.current | (
+            (self.mask + bottom_mask(column)) & column_mask(column)
+        )
+        return alignment(position)
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time budget of a move runs out."""
+
+
+class ComputerPlayer:
+    """
+    Represents a computer player that chooses a column for the seat it takes.
+
+    The computer runs a negamax search with alpha-beta pruning over Position
+    instances, trying moves from the center outwards. The search deepens one
+    ply at a time until the time budget of the move runs out, and the answer of
+    the deepest completed search is played. Results are kept in a
+    transposition table so that deeper searches reuse shallower ones.
+
+    Attributes:
+    1. _time_budget (float): The number of seconds allowed per move.
+    2. _max_depth (int): The deepest search attempted, in plies.
+    3. _table (dict): The transposition table, mapping Position keys to
+       (depth, flag, score, column) tuples.
+    4. _last_search (dict): Statistics of the last move chosen (column, score,
+       depth, nodes, seconds, nodes_per_second, book).
+    5. _book (OpeningBook): An opening book consulted before searching, or
+       None.
+    """
+    # Transposition table flags, telling whether a stored score is exact or
+    # only a bound.
+    EXACT, LOWER, UPPER = 0, 1, 2
+    # Entries kept in the transposition table before it is emptied.
+    TABLE_SIZE = 1_000_000
+
+    def __init__(self, time_budget=0.1, max_depth=42, book=None):
+        self._time_budget = time_budget
+        self._max_depth = max_depth
+        self._book = book
+        self._table = {}
+        self._last_search = None
+        self._nodes = 0
+        self._deadline = 0
+
+    @property
+    def time_budget(self):
+        """A method to access the number of seconds allowed per move."""
+        return self._time_budget
+
+    @time_budget.setter
+    def time_budget(self, time_budget):
+        """A method to set the number of seconds allowed per move."""
+        self._time_budget = float(time_budget)
+
+    @property
+    def last_search(self):
+        """A method to access the statistics of the last move chosen."""
+        return self._last_search
+
+    def choose_move(self, board):
+        """
+        A method to choose the column to drop the computer's piece onto.
+
+        Args:
+        1. board (Board): The board of the match, with the computer to move.
+
+        Returns the column number (1-7).
+        """
+        return self.search(Position.from_board(board)) + 1
+
+    def search(self, position):
+        """
+        A method to search a position by iterative deepening, until the time
+        budget runs out, a forced result is found, or max_depth is reached.
+
+        Args:
+        1. position (Position): The position to search, with the computer to
+           move.
+
+        Returns the best column found (0-6).
+        """
+        start = time.perf_counter()
+        entry = self._book.lookup(position) if self._book is not None else None
+        if entry is not None:
+            column, score = entry
+            self._last_search = {
+                "column": column,
+                "score": score,
+                "depth": 0,
+                "nodes": 0,
+                "seconds": time.perf_counter() - start,
+                "nodes_per_second": 0.0,
+                "book": True,
+            }
+            return column - 1
+
+        self._deadline = start + self._time_budget
+        self._nodes = 0
+        if len(self._table) > self.TABLE_SIZE:
+            self._table.clear()
+
+        legal = [column for column in MOVE_ORDER if position.can_play(column)]
+        best_column, best_score, depth_reached = legal[0], 0, 0
+        for depth in range(1, min(self._max_depth, 42 - position.moves) + 1):
+            try:
+                column, score = self._search_root(position, depth, legal)
+            except _SearchTimeout:
+                break
+            best_column, best_score, depth_reached = column, score, depth
+            # A forced win or loss will not change with deeper searches.
+            if abs(score) > WIN_SCORE - 43:
+                break
+            # Searches the best column first at the next depth.
+            legal.remove(column)
+            legal.insert(0, column)
+
+        elapsed = time.perf_counter() - start
+        self._last_search = {
+            "column": best_column + 1,
+            "score": best_score,
+            "depth": depth_reached,
+            "nodes": self._nodes,
+            "seconds": elapsed,
+            "nodes_per_second": self._nodes / elapsed if elapsed else 0.0,
+            "book": False,
+        }
+        return best_column
+
+    def _search_root(self, position, depth, legal):
+        """Searches every legal column of the root position to a given depth."""
+        alpha, beta = -WIN_SCORE, WIN_SCORE
+        best_column = legal[0]
+        for column in legal:
+            if position.is_winning_move(column):
+                return column, WIN_SCORE - position.moves
+            child = Position(position.current, position.mask, position.moves)
+            child.play(column)
+            score = -self._negamax(child, depth - 1, -beta, -alpha)
+            if score > alpha:
+                alpha, best_column = score, column
+        return best_column, alpha
+
+    def _negamax(self, position, depth, alpha, beta):
+        """
+        Scores a position from the point of view of the player to move,
+        looking a given number of plies ahead within an alpha-beta window.
+        """
+        self._nodes += 1
+        if not self._nodes & 255 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+        current, mask, moves = position.current, position.mask, position.moves
+        if moves == 42:
+            return 0
+        for column in MOVE_ORDER:
+            if position.can_play(column) and position.is_winning_move(column):
+                return WIN_SCORE - moves
+        if depth == 0:
+            # Counts the slots that would complete a line for either side.
+            opponent = current ^ mask
+            return (
+                winning_cells(current, mask).bit_count()
+                - winning_cells(opponent, mask).bit_count()
+            )
+
+        key = current + mask
+        entry = self._table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, flag, score, first = entry
+            if entry_depth >= depth:
+                if flag == self.EXACT:
+                    return score
+                if flag == self.LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        alpha_original = alpha
+        best_score, best_column = -WIN_SCORE, None
+        order = MOVE_ORDER if first is None else ORDER_AFTER[first]
+        for column in order:
+            if not mask & top_mask(column):
+                child = Position(current, mask, moves)
+                child.play(column)
+                score = -self._negamax(child, depth - 1, -beta, -alpha)
+                if score > best_score:
+                    best_score, best_column = score, column
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+
+        if best_score <= alpha_original:
+            flag = self.UPPER
+        elif best_score >= beta:
+            flag = self.LOWER
+        else:
+            flag = self.EXACT
+        self._table[key] = (depth, flag, best_score, best_column)
+        return best_score
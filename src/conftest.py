@@ -0,0 +1,30 @@
+"""
+Module of helpers shared by the test modules.
+"""
+
+
+from user_store import STATS_FIELDS, new_user
+
+
+def stored_user(username, games_played=0, wins=0, losses=0):
+    """
+    Returns a user dictionary as stored in the user repository, with a game
+    record (games not won or lost being draws).
+    """
+    draws = games_played - wins - losses
+    return dict(
+        new_user(username, "1234", "red", "O"),
+        games_played=games_played,
+        wins=wins,
+        losses=losses,
+        win_ratio=(
+            round((wins + 0.5 * draws) / games_played * 100, 2)
+            if games_played else 0.0
+        ),
+    )
+
+
+def game_record(username, games_played, wins, losses):
+    """Returns a game record as stored in the user repository."""
+    user = stored_user(username, games_played, wins, losses)
+    return {field: user[field] for field in STATS_FIELDS}
@@ -34,3 +34,22 @@ class InvalidCommandError(Exception):
     """Error raised when general command does not match format."""
     def __init__(self, message):
         super().__init__(message)
+
+
+class GameOverError(Exception):
+    """Error raised when a move is attempted on a game that is already over."""
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class UserRecordError(Exception):
+    """
+    Error raised when the user accounts file is not in the right format.
+
+    Attributes:
+    1. index (int): The index of the first bad record in the file, or None if
+       the file as a whole is at fault.
+    """
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        self.index = index
@@ -5,6 +5,7 @@ Connect Four, namely the game board and game pieces.
 
 
 # Standard Library Modules
+import functools
 import re
 
 # Third-party Library Modules
@@ -21,6 +22,57 @@ from custom_errors import (
 )
 
 
+@functools.lru_cache(maxsize=32)
+def render_static_frame(player_names, colors, piece_types):
+    """
+    Function to build the parts of the board's visual representation that only
+    change with the players' names and pieces. Results are cached, so the
+    logo and headers are only built again when a player or piece changes.
+
+    Args:
+    1. player_names (tuple): The names of player 1 and player 2.
+    2. colors (tuple): The piece colors of player 1 and player 2.
+    3. piece_types (tuple): The piece types of player 1 and player 2.
+
+    Returns a tuple of:
+    1. header (str): The logo, player names, and column numbers.
+    2. divider (str): The line between two rows of the board.
+    3. edge (str): The slider at the bottom of the board.
+    4. glyphs (dict): A reference to display the board. "1" key refers to
+       player 1's piece representation in the board (from the Piece.drop()
+       method), "2" key refers to that of player 2's. Value is the piece
+       type colored with its color.
+    """
+    glyphs = {
+        "0": " ",
+        "1": colored(piece_types[0], colors[0]),
+        "2": colored(piece_types[1], colors[1]),
+    }
+
+    # Creates a CONNECT 4 ASCII art logo
+    logo = colored(
+           art.text2art("CONNECT 4", font="small", space = 0),
+           "light_grey")
+
+    header = "\n".join([
+        # CONNECT 4 logo sliced to remove its built-in line breaks
+        logo[0:-10],
+        # Player names and preview of their pieces' representation centered
+        # to the board.
+        f"{player_names[0]} = {glyphs['1']}".center(58),
+        f"{player_names[1]} = {glyphs['2']}".center(58),
+        # The heading "COLUMN NUMBER" centered to the board.
+        colored("\n" + "        COLUMN NUMBER        ".center(50), "white"),
+        # The column numbers above each column, centered to the board.
+        "          " + colored(
+            "".join(f"  {i+1} " for i in range(7)) + " ", "black", "on_white"
+        ),
+    ])
+    divider = ("+---" * 7 + "+").center(50)
+    edge = ("+===" * 7 + "+").center(50)
+    return header, divider, edge, glyphs
+
+
 class Piece:
     """
     Represents a game piece used in the game.
@@ -130,13 +182,11 @@ class Piece:
            onto which the piece will be dropped.
         2. column (str): A string digit representing the column number of the
            board to drop the piece onto
+
+        Returns the index of the row (0 being the top row of the board's
+        array) where the piece landed.
         """
-        row = -1
-        while board.array[row, column - 1] != "0":
-            row -= 1
-            if row < -6:
-                raise ColumnFullError("Column is full. Please try again: ")
-        board.array[row, column - 1] = self.player
+        return board.drop(column, self.player)
 
 
 class Board:
@@ -150,21 +200,12 @@ class Board:
     1. _array (np.array): A NumPy array with 6 lists (representing rows) with
        7 elements each (representing columns). 0 represents an empty space
        in the cage.
-    2. _edge (str): Component used to display the board. It is the bottom edge 
-       of the game board, representing the slider to clear the board.
-    3. _divider (str): Component used to display the board. Represents the 
-       dividers between each row of the game board.
-    4. _column (list): A list of components to display the board. Represents
-       each "cage" of the board, i.e. the columns.
-    5. players (list): A list of Piece class instances, defining the pieces and
+    2. players (list): A list of Piece class instances, defining the pieces and
        players that is playing on the board, accessing its properties such as
        piece color, piece type, player name, etc to be displayed by the board.
     """
     def __init__(self, players):
         self._array = np.array([["0" for i in range(7)] for i in range(6)])
-        self._edge = "+===" *7 + "+"
-        self._divider = "+---"*7 + "+"
-        self._column = [f"  {i+1} " for i in range(7)]
         self._players = players
 
     @property
@@ -187,56 +228,201 @@ class Board:
         """A method to set the board's array."""
         self._array = array
 
+    def render(self):
+        """
+        A method to build the board array's visual representation. The parts
+        that do not depend on the pieces' positions come from
+        render_static_frame(), which is cached.
+
+        Returns the representation as a single string.
+        """
+        header, divider, edge, glyphs = render_static_frame(
+            tuple(player.player_name for player in self.players),
+            tuple(player.color for player in self.players),
+            tuple(player.piece_type for player in self.players),
+        )
+        lines = [header]
+        for row in self.array:
+            lines.append(divider)
+            # Displays the content of each slot in the board, with space in
+            # the beginning to center the board.
+            lines.append(
+                " " * 10 + "".join(f"| {glyphs[slot]} " for slot in row) + "|"
+            )
+        # Adds the slider of the board
+        lines.append(edge)
+        return "\n".join(lines)
+
     def display(self):
         """A method to display the board array's visual representation."""
-        # Create a dictionary as a reference to display the board. "1" key
-        # refers to players 1's piece representation in the board (from the
-        # Piece.drop() method), "2" key refers that of player 2's. Value is
-        # the Piece instance's _piece_type colored with its _color.
-        piece_dict = {
-            "0": " ",
-            "1": colored(self.players[0].piece_type, self.players[0].color),
-            "2": colored(self.players[1].piece_type, self.players[1].color),
-        }
-
-        # Creates a CONNECT 4 ASCII art logo
-        logo = colored(
-               art.text2art("CONNECT 4", font="small", space = 0),
-               "light_grey")
-
-        # Prints the visual representation of the array on the board.
-        # Prints CONNECT 4 logo sliced to remove its built-in line breaks
-        print(logo[0:-10])
-        # Prints player names and preview of their pieces' representation
-        # centered to the board.
-        print(
-            f"{self._players[0].player_name} = {piece_dict.get('1')}".center(58)
-            )
-        print(
-            f"{self._players[1].player_name} = {piece_dict.get('2')}".center(58)
-            )
-        # Prints the heading "COLUMN NUMBER" centered to the board.
-        print(colored("\n" + "        COLUMN NUMBER        ".center(50), "white"))
-        # Prints the column numbers above each column, centered to the board.
-        print(
-            "          " + colored("".join(self._column) + " ",
-            "black", "on_white")
-            )
+        # Written in one go rather than line by line.
+        print(self.render())
 
-        # Prints the actual game board.
-        cage_row = ""
-        for row in self._array:
-            print(self._divider.center(50))
-            # Displays the content of each slot in the board based on the dict.
-            for slot in row:
-                # Adds each slot into cage_row, to form display of a row
-                cage_row += f"| {piece_dict.get(slot)} "
-            # Prints the row, with space in the beginning to center the board.
-            print(" " * 10 + cage_row + "|")
-            cage_row = ""
-        # Prints the slider of the board
-        print(self._edge.center(50))
+    def slot(self, row, column):
+        """
+        A method to access the content of a single slot of the board.
+
+        Args:
+        1. row (int): The index of the row (0 being the top row of the array).
+        2. column (int): The column number (1-7).
+
+        Returns "0" if the slot is empty, or the player number ("1" or "2")
+        of the piece occupying it.
+        """
+        return str(self.array[row, column - 1])
+
+    def can_drop(self, column):
+        """
+        A method to check whether a column (1-7) still has a free slot.
+        """
+        return self.slot(0, column) == "0"
+
+    def drop(self, column, player):
+        """
+        A method to place a player's piece in the lowest free slot of a column.
+
+        Args:
+        1. column (int): The column number (1-7) to drop the piece onto.
+        2. player (str): The player number of the piece (i.e. "1" or "2").
+
+        Raises ColumnFullError if the column has no free slot left.
+
+        Returns the index of the row (0 being the top row of the array) where
+        the piece landed.
+        """
+        row = -1
+        while self.array[row, column - 1] != "0":
+            row -= 1
+            if row < -6:
+                raise ColumnFullError("Column is full. Please try again: ")
+        self.array[row, column - 1] = player
+        return 6 + row
 
     def clear_board(self):
         """A method to clear the board, equivalent to pulling board slider"""
         self.array = np.array([["0" for i in range(7)] for i in range(6)])
+
+
+class BitBoard(Board):
+    """
+    Represents a game board backed by integer bitboards instead of a NumPy
+    array of strings. It behaves like a Board, but dropping a piece is a
+    constant-time bit operation, which matters when games are replayed or
+    simulated in bulk.
+
+    Each player owns one integer. Column c (0-6) occupies bits 7c to 7c + 6,
+    bit 7c being the bottom slot; the 7th bit of every column is left empty
+    as a sentinel. A height table keeps track of the next free slot of each
+    column.
+
+    Attributes (in addition to those of Board):
+    1. _bitboards (list): Two integers, the occupied slots of player 1 and
+       player 2 respectively.
+    2. _heights (list): The number of pieces in each of the 7 columns.
+    3. _array (np.array): Read-only NumPy view of the board, materialised
+       from the bitboards on first access and discarded on every change.
+    """
+    def __init__(self, players):
+        super().__init__(players)
+        self._bitboards = [0, 0]
+        self._heights = [0] * 7
+        self._array = None
+
+    @property
+    def bitboards(self):
+        """A method to access the bitboards of player 1 and player 2."""
+        return tuple(self._bitboards)
+
+    @property
+    def heights(self):
+        """A method to access the number of pieces in each column."""
+        return tuple(self._heights)
+
+    @property
+    def array(self):
+        """
+        A method to access the board's array. The array is built from the
+        bitboards the first time it is requested after a change, and is
+        read-only, since changes have to go through drop().
+        """
+        if self._array is None:
+            array = np.full((6, 7), "0")
+            for index, bitboard in enumerate(self._bitboards):
+                bits = (bitboard >> np.arange(49, dtype=np.int64)) & 1
+                # Columns of 7 bits (bottom first) into rows (top first).
+                occupied = bits.reshape(7, 7)[:, :6].T[::-1]
+                array[occupied == 1] = str(index + 1)
+            array.flags.writeable = False
+            self._array = array
+        return self._array
+
+    @array.setter
+    def array(self, array):
+        """
+        A method to set the board's array. The bitboards and height table are
+        rebuilt from it, so the array is expected to follow gravity.
+        """
+        self._bitboards = [0, 0]
+        self._heights = [0] * 7
+        for column in range(7):
+            for row in range(5, -1, -1):
+                slot = str(array[row][column])
+                if slot == "0":
+                    break
+                height = self._heights[column]
+                self._bitboards[int(slot) - 1] |= 1 << (column * 7 + height)
+                self._heights[column] = height + 1
+        self._array = None
+
+    def slot(self, row, column):
+        """
+        A method to access the content of a single slot of the board, read
+        straight from the bitboards.
+
+        Args:
+        1. row (int): The index of the row (0 being the top row of the array).
+        2. column (int): The column number (1-7).
+
+        Returns "0" if the slot is empty, or the player number ("1" or "2")
+        of the piece occupying it.
+        """
+        bit = 1 << ((column - 1) * 7 + 5 - row)
+        if self._bitboards[0] & bit:
+            return "1"
+        if self._bitboards[1] & bit:
+            return "2"
+        return "0"
+
+    def can_drop(self, column):
+        """
+        A method to check whether a column (1-7) still has a free slot.
+        """
+        return self._heights[column - 1] < 6
+
+    def drop(self, column, player):
+        """
+        A method to place a player's piece in the lowest free slot of a column,
+        using the height table instead of scanning the column.
+
+        Args:
+        1. column (int): The column number (1-7) to drop the piece onto.
+        2. player (str): The player number of the piece (i.e. "1" or "2").
+
+        Raises ColumnFullError if the column has no free slot left.
+
+        Returns the index of the row (0 being the top row of the array) where
+        the piece landed.
+        """
+        height = self._heights[column - 1]
+        if height == 6:
+            raise ColumnFullError("Column is full. Please try again: ")
+        self._bitboards[int(player) - 1] |= 1 << ((column - 1) * 7 + height)
+        self._heights[column - 1] = height + 1
+        self._array = None
+        return 5 - height
+
+    def clear_board(self):
+        """A method to clear the board, equivalent to pulling board slider"""
+        self._bitboards = [0, 0]
+        self._heights = [0] * 7
+        self._array = None
@@ -12,12 +12,16 @@ Includes four functions that represents the three phases of the game:
 
 # Standard Library Modules
 import re
+import time
 
 # Third Party Modules
 from termcolor import colored
 
 # Local Modules
 from custom_errors import ColumnFullError
+from game_records import GameRecord
+from game_state import GameState
+from user_utils import record_result
 from utilities import (
     clear_screen,
     reset_screen,
@@ -71,7 +75,7 @@ def game_start(players):
           "press enter when ready! ")
 
 
-def game_in_progress(board, players, referee):
+def game_in_progress(board, players, referee, computers=None, archive=None):
     """
     Function to decide how a game is run from start until when game result is
     detected.
@@ -84,21 +88,44 @@ def game_in_progress(board, players, referee):
     3. referee (VictoryChecker): An instance of the VictoryChecker class,
        defining the referee that checks the state of the board each game turn
        to see if the game should be over.
+    4. computers (dict): Maps a seat (0 for player 1, 1 for player 2) to the
+       ComputerPlayer instance playing it. None by default, meaning both
+       seats are played through input().
+    5. archive (GameArchive): The archive the finished game is recorded in.
+       None by default, meaning the game is not recorded.
     """
-    player_turn = 0
-    move_count = 0
-
-    # Game loops as long as referee does not detect a winner and there are
-    # less than 42 move counts, which is the total number of slots available in
-    # the board.
-    while referee.check_victory() is None and move_count < 42:
+    computers = computers or {}
+    # The rules of the match are run by a GameState; this function only reads
+    # the players' commands and displays the board.
+    game = GameState(board, players, referee)
+    started = time.time()
+    # The computer's last move, shown to the human player on their turn.
+    computer_report = None
+
+    # Game loops as long as the game has no result, i.e. no winner, no
+    # surrender, and fewer than 42 pieces on the board.
+    while not game.is_over:
         # Refreshes the screen and board state
         reset_screen(board)
-
-        player_command = input(
-            f"\n{colored(players[player_turn].player_name, players[player_turn].color)}"
-            f"'s turn: "
-        )
+        player = game.current_player
+
+        if game.turn in computers:
+            # The computer's column is always a legal drop.
+            computer = computers[game.turn]
+            player_command = str(computer.choose_move(board))
+            search = computer.last_search
+            computer_report = (
+                f"{player.player_name} played column {search['column']} "
+                + ("(opening book)" if search["book"] else
+                   f"(depth {search['depth']}, "
+                   f"{search['nodes_per_second']:,.0f} nodes/s)")
+            )
+        else:
+            if computer_report is not None:
+                print(computer_report)
+            player_command = input(
+                f"\n{colored(player.player_name, player.color)}'s turn: "
+            )
 
         # Input loops until the player makes a valid move"
         while True:
@@ -107,47 +134,43 @@ def game_in_progress(board, players, referee):
                 # drop is attempted
                 if player_command.isdigit():
                     try:
-                        players[player_turn].drop(board, int(player_command))
+                        game.play(int(player_command))
                     # If column is full, piece drop and input is refused.
                     except ColumnFullError as error:
                         player_command = input(error)
-                    # If piece drop is successful, alternate player turn and
-                    # increase move count by 1.
                     else:
-                        player_turn = int(not player_turn)
-                        move_count += 1
                         break
                 # If "clear", game is reset. No wins are recorded.
                 elif player_command.lower() == "clear":
-                    board.clear_board()
-                    player_turn = 0
-                    move_count = 0
+                    game.clear()
                     break
                 # If "surrender", the player's surrender state is turned on,
                 # and the player loses the game.
                 elif player_command.lower() == "surrender":
-                    players[player_turn].surrender = True
-                    reset_screen(board)
-                    # Returns the winning Piece and the surrendering Piece.
-                    return referee.check_victory(), players[player_turn]
+                    game.surrender(player)
+                    break
             else:
                 player_command = input("Invalid input, please try again: ")
 
+    if archive is not None:
+        archive.append(GameRecord.from_game(game, started))
+
     reset_screen(board)
-    # Returns referee's result (None if no winners hence draw), and surrendering
-    # Piece (which is None) as a tuple.
-    return referee.check_victory(), None
+    # Returns the winning Piece (None if no winners hence draw), and the
+    # surrendering Piece (None if nobody surrendered) as a tuple.
+    return game.result()
 
 
 def game_complete(game_result, users):
     """
     Function to decide what is to be done when game is completed. Users' stats
-    in the .json file are updated.
+    in the user repository are updated.
     
     Args:
     1. game_result (tuple): A tuple containing the names of the winning player
        (if any) & surrendering player (if any). Returned by game_in_progress().
-    2. users (list): A list of User instances to update game stats.
+    2. users (list): A list of User instances to update game stats, in the
+       order of the players' seats.
     """
     winner, surrendered = game_result
     if winner is None:
@@ -157,9 +180,13 @@ def game_complete(game_result, users):
             print(f"{surrendered.player_name} surrendered!")
         print(f"{winner.player_name} wins!")
 
-    # Updates each user's game stats
-    users[0].update_game_history(winner)
-    users[1].update_game_history(winner)
+    # Updates both users' game stats as one game result. Users are in the
+    # same order as the players' seats.
+    if winner is None:
+        record_result(users[0], users[1], draw=True)
+    else:
+        seat = int(winner.player) - 1
+        record_result(users[seat], users[1 - seat])
 
     play_again = validate_input("Play again? (y / n): ","^[yn]$")
     return play_again
@@ -0,0 +1,236 @@
+"""
+Module for recording finished games in a compact binary archive, and replaying
+them onto a board.
+
+An archive file starts with an 8-byte magic string, followed by one record per
+game, appended as games finish. A record is a fixed-size header (lengths of
+the players' names, outcome, number of moves, start and end timestamps), the
+players' names, and the moves packed 3 bits each: 1-7 for a column, 0 for the
+board being cleared.
+"""
+
+
+# Standard Library Modules
+import os
+import struct
+import time
+
+
+MAGIC = b"C4GAMES1"
+# Name lengths of player 1 and player 2, outcome, number of moves, and start
+# and end timestamps (seconds since the epoch).
+RECORD_HEADER = struct.Struct("<BBBHII")
+# Outcome bits: the winning seat (1 or 2, 0 for a draw) in the lowest 2 bits,
+# and whether the loser surrendered.
+SURRENDER_FLAG = 4
+# Move value standing for the board being cleared.
+CLEAR = 0
+
+
+def pack_moves(moves):
+    """
+    Function to pack moves (0-7) into 3 bits each.
+
+    Returns the packed moves as bytes.
+    """
+    value = 0
+    for index, move in enumerate(moves):
+        value |= move << (3 * index)
+    return value.to_bytes((3 * len(moves) + 7) // 8, "little")
+
+
+def unpack_moves(data, count):
+    """
+    Function to unpack a number of moves packed by pack_moves().
+
+    Returns the moves as a tuple.
+    """
+    value = int.from_bytes(data, "little")
+    return tuple((value >> (3 * index)) & 7 for index in range(count))
+
+
+class GameRecord:
+    """
+    Represents a finished game as stored in an archive.
+
+    Attributes:
+    1. players (tuple): The names of player 1 and player 2.
+    2. winner (int): The winning seat (1 or 2), or 0 for a draw.
+    3. surrendered (bool): Whether the losing player surrendered.
+    4. moves (tuple): The columns played (1-7) in order, with a 0 wherever the
+       board was cleared.
+    5. started (int): When the game started, in seconds since the epoch.
+    6. ended (int): When the game ended, in seconds since the epoch.
+    """
+    def __init__(self, players, winner, surrendered, moves, started, ended):
+        self.players = tuple(players)
+        self.winner = winner
+        self.surrendered = surrendered
+        self.moves = tuple(moves)
+        self.started = int(started)
+        self.ended = int(ended)
+
+    @classmethod
+    def from_game(cls, game, started, ended=None):
+        """
+        A method to build the record of a finished GameState.
+
+        Args:
+        1. game (GameState): The finished game.
+        2. started (float): When the game started, in seconds since the epoch.
+        3. ended (float): When the game ended. Defaults to now if None.
+
+        Returns the GameRecord.
+        """
+        winner, surrendered = game.result()
+        return cls(
+            [player.player_name for player in game.players],
+            0 if winner is None else game.players.index(winner) + 1,
+            surrendered is not None,
+            game.history,
+            started,
+            time.time() if ended is None else ended,
+        )
+
+    def to_bytes(self):
+        """A method to encode the record in its binary form."""
+        names = [name.encode("utf-8") for name in self.players]
+        outcome = self.winner | (SURRENDER_FLAG if self.surrendered else 0)
+        return (
+            RECORD_HEADER.pack(
+                len(names[0]), len(names[1]), outcome, len(self.moves),
+                self.started, self.ended
+            )
+            + names[0] + names[1] + pack_moves(self.moves)
+        )
+
+    def replay(self, board, ply=None):
+        """
+        A method to rebuild the game onto a board, without going through
+        game_in_progress().
+
+        Args:
+        1. board (Board): The board to replay onto. It is cleared first.
+        2. ply (int): The number of moves to replay (clearing the board counts
+           as a move). Defaults to the whole game if None.
+
+        Returns the board.
+        """
+        board.clear_board()
+        turn = 0
+        for move in self.moves[:ply]:
+            if move == CLEAR:
+                board.clear_board()
+                turn = 0
+            else:
+                board.drop(move, str(turn + 1))
+                turn = 1 - turn
+        return board
+
+
+class GameArchive:
+    """
+    Represents an archive file of game records.
+
+    Attributes:
+    1. _path (str): The path of the archive file.
+    2. _repaired (bool): Whether an incomplete last record has been cut off
+       the file, before the first record is added.
+    """
+    def __init__(self, path):
+        self._path = path
+        self._repaired = False
+
+    @property
+    def path(self):
+        """A method to access the path of the archive file."""
+        return self._path
+
+    def append(self, record):
+        """
+        A method to add a record at the end of the archive, creating the file
+        if it does not exist yet.
+
+        Args:
+        1. record (GameRecord): The record to add.
+
+        Raises ValueError if the file is not a game archive.
+        """
+        if not self._repaired:
+            # Records added after a record cut short (e.g. by a crash while
+            # appending) could never be read, so it is cut off first.
+            if os.path.exists(self._path):
+                with open(self._path, "r+b") as file:
+                    file.truncate(self._complete_size(file))
+            self._repaired = True
+        with open(self._path, "ab") as file:
+            if file.tell() == 0:
+                file.write(MAGIC)
+            file.write(record.to_bytes())
+
+    def _complete_size(self, file):
+        """
+        Returns the size of an archive file up to the end of its last complete
+        record, or 0 if it is too short to hold the magic number.
+
+        Args:
+        1. file (file): The archive file, opened in binary mode.
+
+        Raises ValueError if the file is not a game archive.
+        """
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        magic = file.read(len(MAGIC))
+        if len(magic) < len(MAGIC) and MAGIC.startswith(magic):
+            return 0
+        if magic != MAGIC:
+            raise ValueError(f"{self._path} is not a game archive.")
+        end = len(MAGIC)
+        while end + RECORD_HEADER.size <= size:
+            file.seek(end)
+            length1, length2, _, count, _, _ = RECORD_HEADER.unpack(
+                file.read(RECORD_HEADER.size)
+            )
+            record_end = (
+                end + RECORD_HEADER.size + length1 + length2
+                + (3 * count + 7) // 8
+            )
+            if record_end > size:
+                break
+            end = record_end
+        return end
+
+    def __iter__(self):
+        """
+        A method to read every record of the archive in order, one at a time.
+        An incomplete last record is left out.
+        """
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self._path} is not a game archive.")
+            while True:
+                header = file.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                length1, length2, outcome, count, started, ended = (
+                    RECORD_HEADER.unpack(header)
+                )
+                names = file.read(length1 + length2)
+                packed = file.read((3 * count + 7) // 8)
+                # A record cut short (e.g. by a crash while appending) ends
+                # the archive.
+                if (len(names) < length1 + length2
+                        or len(packed) < (3 * count + 7) // 8):
+                    return
+                moves = unpack_moves(packed, count)
+                yield GameRecord(
+                    [names[:length1].decode("utf-8"),
+                     names[length1:].decode("utf-8")],
+                    outcome & 3,
+                    bool(outcome & SURRENDER_FLAG),
+                    moves,
+                    started,
+                    ended,
+                )
@@ -0,0 +1,716 @@
+"""
+Module for hosting many Connect Four matches at once, for players connecting
+over a TCP or Unix socket. Each match is played at its own table, with its own
+GameState (board, pieces and referee), and the results are recorded with the
+same account and stats functions as the terminal game.
+
+The protocol is line-based: each command and each reply is one line of
+UTF-8 text, with space-separated words. A line that is not UTF-8 text, or is
+longer than the stream's limit (64 KiB), is answered with an ERR line, and
+the connection is closed.
+
+Commands:
+1. LOGIN <username> <pin>: Log in to a user account. Players who do not log
+   in play as guests.
+2. JOIN: Wait for a table, to be paired with the player with the closest win
+   ratio. The gap accepted widens the longer players wait.
+3. DROP <column>: Drop a piece onto a column (1-7).
+4. CLEAR: Pull the board's slider.
+5. SURRENDER: Forfeit the game.
+6. TABLES: List the tables with a game in progress.
+7. WATCH <table>: Watch the game at a table, without playing.
+8. UNWATCH: Stop watching.
+9. QUIT: Leave the server, forfeiting the game in progress.
+
+Replies and events:
+1. OK <command> [details]: The command was carried out.
+2. ERR <message>: The command was refused.
+3. START <table> <seat> <opponent>: A game starts, seat 1 moving first.
+4. MOVE <seat> <column> <row>: A piece was dropped (row 0 being the top row).
+5. CLEARED <seat>: The board was cleared, seat 1 moving first again.
+6. OVER <winner> <surrendered>: The game is over. The seats of the winner
+   (0 for a draw) and of the surrendering player (0 if nobody surrendered).
+7. SNAPSHOT <table> <player 1> <player 2> <seat> <moves>: The game being
+   watched: the players' names, the seat to move, and the columns played
+   since the board was last cleared, as one string of digits (- if none).
+
+Spectators get one SNAPSHOT, then the MOVE, CLEARED and OVER lines of the
+game as they happen. A spectator falling too far behind has the lines they
+missed replaced by a new SNAPSHOT.
+
+The server can be started from the command line, on a port of localhost or
+on a Unix socket:
+
+    python game_server.py [port | socket path]
+"""
+
+
+# Standard Library Modules
+import asyncio
+import collections
+import itertools
+import socket
+import sys
+import time
+
+# Local Modules
+from custom_errors import (
+    ColumnFullError,
+    GameOverError,
+    InvalidCommandError
+)
+from game_board import Piece
+from game_records import GameArchive, GameRecord
+from game_state import GameState
+from matchmaking import MatchmakingQueue
+from start_menu import validate_account
+from user_utils import User, bootstrap_users, logout, record_result
+
+
+class SpectatorFeed:
+    """
+    Represents the lines on their way to a spectator. Lines are queued
+    without waiting, and written by a task of the feed's own, so a slow
+    spectator never holds up the players or the other spectators. Once
+    QUEUE_SIZE lines are waiting, they are replaced by a snapshot of the game.
+
+    Attributes:
+    1. _writer (asyncio.StreamWriter): The stream to the spectator.
+    2. _limits (tuple): The stream's own write buffer limits (low, high)
+       and the socket's own send buffer size to give back, while they are
+       replaced by BUFFER_SIZE, or None.
+    3. _lines (collections.deque): The lines waiting to be written.
+    4. _ready (asyncio.Event): Set while lines are waiting.
+    5. _task (asyncio.Task): The task writing the lines.
+    6. snapshots (int): The number of times the spectator fell behind.
+    """
+    QUEUE_SIZE = 64
+    # Bytes buffered by the stream, and by the socket, before the task waits
+    # for the spectator, while a game is watched, keeping the memory held for
+    # each spectator small.
+    BUFFER_SIZE = 4096
+
+    def __init__(self, writer):
+        self._writer = writer
+        self._limits = None
+        self._lines = collections.deque()
+        self._ready = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+        self.snapshots = 0
+
+    def start(self):
+        """
+        A method to cap the stream's and the socket's write buffers at
+        BUFFER_SIZE, as the player starts watching a game.
+        """
+        if self._limits is not None:
+            return
+        transport = self._writer.transport
+        low, high = transport.get_write_buffer_limits()
+        transport.set_write_buffer_limits(self.BUFFER_SIZE)
+        sndbuf = None
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            sndbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF, self.BUFFER_SIZE
+            )
+            # Some systems (Linux) double the size set, and report the size
+            # doubled, so the size to give back is scaled the same way.
+            sndbuf = sndbuf * self.BUFFER_SIZE // sock.getsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF
+            )
+        self._limits = (low, high, sndbuf)
+
+    def stop(self):
+        """
+        A method to give the stream and the socket their own write buffer
+        sizes back, once the game watched is over. The lines waiting are
+        still written.
+        """
+        if self._limits is None:
+            return
+        low, high, sndbuf = self._limits
+        self._writer.transport.set_write_buffer_limits(high, low)
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        self._limits = None
+
+    def reset(self):
+        """
+        A method to drop the lines waiting, and give the stream and the
+        socket their own write buffer sizes back, as the player stops
+        watching a game.
+        """
+        self._lines.clear()
+        self._ready.clear()
+        self.stop()
+
+    def push(self, line, snapshot):
+        """
+        A method to queue a line, without waiting.
+
+        Args:
+        1. line (str): The line.
+        2. snapshot (function): Returns the snapshot of the game, the line
+           included, sent instead if the queue is full.
+        """
+        if len(self._lines) >= self.QUEUE_SIZE:
+            self._lines.clear()
+            line = snapshot()
+            self.snapshots += 1
+        self._lines.append(line)
+        self._ready.set()
+
+    async def _run(self):
+        """
+        A method to write the lines queued, all at once, as soon as the
+        spectator has taken the previous ones.
+        """
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                lines = "".join(f"{line}\n" for line in self._lines)
+                self._lines.clear()
+                self._writer.write(lines.encode("utf-8"))
+                await self._writer.drain()
+        except ConnectionError:
+            pass
+
+    def close(self):
+        """A method to stop writing, dropping the lines waiting."""
+        self._task.cancel()
+
+
+class Player:
+    """
+    Represents a connection to the server.
+
+    Attributes:
+    1. _writer (asyncio.StreamWriter): The stream to the player.
+    2. account (dict): The user dictionary of the player's account, or None
+       for a guest.
+    3. user (User): The User instance recording the player's stats.
+    4. table (Table): The table the player sits at, or None.
+    5. seat (int): The player's seat at the table (0 for player 1, 1 for
+       player 2), or None.
+    6. watching (Table): The table the player watches, or None.
+    7. _feed (SpectatorFeed): The feed of the games watched, or None until
+       the player first watches one.
+    """
+    def __init__(self, writer):
+        self._writer = writer
+        self.account = None
+        self.user = User(
+            "Guest", games_played=None, wins=None, losses=None, win_ratio=None
+        )
+        self.table = None
+        self.seat = None
+        self.watching = None
+        self._feed = None
+
+    @property
+    def name(self):
+        """A method to access the player's username, or Guest."""
+        return self.user.username
+
+    @property
+    def rating(self):
+        """
+        A method to access the player's rating for matchmaking: their win
+        ratio, or the middle one for a guest or an account with no games
+        played yet.
+        """
+        if self.account is None or not self.user.games_played:
+            return 50.0
+        return self.user.win_ratio
+
+    @property
+    def feed(self):
+        """
+        A method to access the feed of the games the player watches, started
+        on first access.
+        """
+        if self._feed is None:
+            self._feed = SpectatorFeed(self._writer)
+        return self._feed
+
+    def send(self, line):
+        """A method to queue a line to the player, without waiting."""
+        self._writer.write(f"{line}\n".encode("utf-8"))
+
+    def close(self):
+        """A method to stop the player's feed, if started."""
+        if self._feed is not None:
+            self._feed.close()
+
+
+class Table:
+    """
+    Represents a match between two connected players.
+
+    Attributes:
+    1. id (int): The number of the table.
+    2. players (list): The Player instances of player 1 and player 2.
+    3. game (GameState): The match, with its own board, pieces and referee.
+    4. started (float): When the game started, in seconds since the epoch.
+    5. spectators (set): The Player instances watching the game.
+    """
+    def __init__(self, table_id, players):
+        self.id = table_id
+        self.players = players
+        self.started = time.time()
+        self.spectators = set()
+        pieces = []
+        for seat, player in enumerate(players):
+            if player.account is None:
+                pieces.append(Piece(
+                    f"Guest{seat + 1}", "white", "OX"[seat], str(seat + 1)
+                ))
+            else:
+                pieces.append(Piece(
+                    player.name, player.account["color"],
+                    player.account["piece_type"], str(seat + 1)
+                ))
+        self.game = GameState.new(pieces)
+
+    def broadcast(self, line):
+        """
+        A method to send a line to both players, and queue it for every
+        spectator.
+        """
+        for player in self.players:
+            player.send(line)
+        for spectator in self.spectators:
+            spectator.feed.push(line, self.snapshot)
+
+    def over_line(self):
+        """Returns the OVER line of the game, or None while in progress."""
+        if not self.game.is_over:
+            return None
+        winner, surrendered = self.game.result()
+        return (
+            f"OVER {0 if winner is None else winner.player} "
+            f"{0 if surrendered is None else surrendered.player}"
+        )
+
+    def snapshot(self):
+        """
+        Returns the SNAPSHOT line of the game, followed by its OVER line once
+        the game is over.
+        """
+        moves = "".join(str(column) for column in self.game.moves) or "-"
+        line = (
+            f"SNAPSHOT {self.id} {self.players[0].name} "
+            f"{self.players[1].name} {self.game.turn + 1} {moves}"
+        )
+        over = self.over_line()
+        return line if over is None else f"{line}\n{over}"
+
+
+class GameServer:
+    """
+    Represents the server: the players connected, and the tables they play
+    at. Every connection is handled by handle() in the same event loop, and
+    the accounts, sessions and archive, which block on files, are written in
+    a worker thread, one call at a time.
+
+    Attributes:
+    1. _tables (dict): The tables with a game in progress, by number.
+    2. _queue (MatchmakingQueue): The players waiting for a table.
+    3. _table_ids (iterator): The numbers of the next tables.
+    4. _commands (dict): The method handling each command.
+    5. _archive (GameArchive): The archive finished games are recorded in, or
+       None.
+    6. _storage_lock (asyncio.Lock): Held while storage is read or written.
+    """
+    # Seconds given to a player sent an error to close their side of the
+    # connection, before it is closed anyway.
+    CLOSE_TIMEOUT = 5.0
+
+    def __init__(self, archive=None):
+        self._archive = archive
+        self._tables = {}
+        self._queue = MatchmakingQueue()
+        self._table_ids = itertools.count(1)
+        self._storage_lock = asyncio.Lock()
+        self._commands = {
+            "LOGIN": self.login,
+            "JOIN": self.join,
+            "DROP": self.drop,
+            "CLEAR": self.clear,
+            "SURRENDER": self.surrender,
+            "TABLES": self.list_tables,
+            "WATCH": self.watch,
+            "UNWATCH": self.unwatch,
+        }
+
+    @property
+    def tables(self):
+        """A method to access the tables with a game in progress."""
+        return self._tables
+
+    async def handle(self, reader, writer):
+        """
+        A method to serve one connection until the player quits, disconnects
+        or sends a line that cannot be read, as a callback of
+        asyncio.start_server().
+
+        Args:
+        1. reader (asyncio.StreamReader): The stream from the player.
+        2. writer (asyncio.StreamWriter): The stream to the player.
+        """
+        player = Player(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._refuse(
+                        player, reader, writer, "ERR Line too long."
+                    )
+                    break
+                if not line:
+                    break
+                try:
+                    line = line.decode("utf-8")
+                except UnicodeDecodeError:
+                    await self._refuse(
+                        player, reader, writer, "ERR Lines must be UTF-8 text."
+                    )
+                    break
+                command, *args = line.split() or [""]
+                command = command.upper()
+                if command == "QUIT":
+                    await self.leave(player)
+                    player.send("OK QUIT")
+                    break
+                if command not in self._commands:
+                    player.send(f"ERR Unknown command: {command}")
+                else:
+                    result = self._commands[command](player, *args)
+                    if asyncio.iscoroutine(result):
+                        await result
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            await self.leave(player)
+            player.close()
+            writer.close()
+
+    async def _refuse(self, player, reader, writer, error):
+        """
+        A method to answer a line that cannot be read, before the connection
+        is closed: the player leaves, and the stream to them ends with the
+        error. What they still send is dropped until they close their side
+        (or CLOSE_TIMEOUT passes), so that closing does not reset the
+        connection before they have read the error.
+
+        Args:
+        1. player (Player): The player.
+        2. reader (asyncio.StreamReader): The stream from the player.
+        3. writer (asyncio.StreamWriter): The stream to the player.
+        4. error (str): The ERR line.
+        """
+        await self.leave(player)
+        player.send(error)
+        if writer.can_write_eof():
+            writer.write_eof()
+
+        async def drop_input():
+            """Reads what the player sends until they close their side."""
+            while await reader.read(1 << 16):
+                pass
+
+        try:
+            await asyncio.wait_for(drop_input(), self.CLOSE_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+    async def _store(self, function, *args, **kwargs):
+        """
+        Returns the result of a call to storage, run in a worker thread so the
+        event loop goes on serving the other players, and after any earlier
+        call has finished.
+
+        Args:
+        1. function (function): The function reading or writing storage.
+        2. args (list): Its arguments.
+        3. kwargs (dict): Its keyword arguments.
+        """
+        async with self._storage_lock:
+            return await asyncio.to_thread(function, *args, **kwargs)
+
+    async def login(self, player, *args):
+        """
+        A method to log a player in to their user account, with the same
+        validation as the terminal game.
+
+        Args:
+        1. player (Player): The player.
+        2. args (list): The username and pin.
+        """
+        if len(args) != 2:
+            player.send("ERR Usage: LOGIN <username> <pin>")
+        elif player.account is not None or player.table is not None:
+            player.send("ERR Already logged in or playing.")
+        else:
+            account = await self._store(validate_account, *args)
+            if account is None:
+                player.send("ERR Invalid username or PIN.")
+            elif account == "Duplicate":
+                player.send("ERR That account is already logged in.")
+            else:
+                player.account = account
+                player.user = User(
+                    account["username"], account["games_played"],
+                    account["wins"], account["losses"], account["win_ratio"]
+                )
+                player.send(f"OK LOGIN {player.name}")
+
+    def join(self, player, *args):
+        """
+        A method to add a player to the matchmaking queue, and seat them at
+        a table straight away if they can be paired.
+
+        Args:
+        1. player (Player): The player.
+        """
+        if player.table is not None or player in self._queue:
+            player.send("ERR Already at a table.")
+            return
+        self._stop_watching(player)
+        self._queue.enqueue(player, player.rating)
+        self.matchmake()
+        if player in self._queue:
+            player.send("OK JOIN waiting")
+
+    def matchmake(self):
+        """
+        A method to seat every pair of waiting players the matchmaking queue
+        allows at a new table, the player who waited longest moving first.
+        """
+        for players in self._queue.pair():
+            table = Table(next(self._table_ids), list(players))
+            self._tables[table.id] = table
+            for seat, seated in enumerate(table.players):
+                seated.table, seated.seat = table, seat
+                seated.send(
+                    f"START {table.id} {seat + 1} {players[1 - seat].name}"
+                )
+
+    async def run_matchmaking(self, interval=1.0):
+        """
+        A method to pair waiting players again at regular intervals, as the
+        rating gaps they accept widen.
+
+        Args:
+        1. interval (float): The time between two rounds of pairing (s).
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.matchmake()
+
+    def _turn(self, player):
+        """
+        Returns the player's table if it is their turn to move, or None after
+        telling them why not.
+        """
+        table = player.table
+        if table is None:
+            player.send("ERR Not at a table.")
+            return None
+        if table.game.turn != player.seat:
+            player.send("ERR Not your turn.")
+            return None
+        return table
+
+    async def drop(self, player, *args):
+        """
+        A method to drop the player's piece onto a column.
+
+        Args:
+        1. player (Player): The player.
+        2. args (list): The column number (1-7).
+        """
+        table = self._turn(player)
+        if table is None:
+            return
+        if len(args) != 1 or not args[0].isdigit():
+            player.send("ERR Usage: DROP <column>")
+            return
+        column = int(args[0])
+        try:
+            row = table.game.play(column)
+        except (ColumnFullError, GameOverError, InvalidCommandError) as error:
+            player.send(f"ERR {str(error).rstrip(': ')}")
+            return
+        table.broadcast(f"MOVE {player.seat + 1} {column} {row}")
+        if table.game.is_over:
+            await self._finish(table)
+
+    def clear(self, player, *args):
+        """
+        A method to pull the board's slider. No result is recorded.
+
+        Args:
+        1. player (Player): The player.
+        """
+        table = self._turn(player)
+        if table is not None:
+            table.game.clear()
+            table.broadcast(f"CLEARED {player.seat + 1}")
+
+    async def surrender(self, player, *args):
+        """
+        A method for a player to forfeit the game, whether it is their turn
+        or not.
+
+        Args:
+        1. player (Player): The player.
+        """
+        table = player.table
+        if table is None:
+            player.send("ERR Not at a table.")
+            return
+        table.game.surrender(table.game.players[player.seat])
+        await self._finish(table)
+
+    async def _finish(self, table):
+        """
+        A method to announce the result of a game, free the table, and record
+        the result in both players' stats.
+
+        Args:
+        1. table (Table): The table of the finished game.
+        """
+        table.broadcast(table.over_line())
+        del self._tables[table.id]
+        for player in table.players:
+            player.table, player.seat = None, None
+        for spectator in table.spectators:
+            spectator.watching = None
+            spectator.feed.stop()
+        table.spectators.clear()
+
+        winner = table.game.result()[0]
+        users = [player.user for player in table.players]
+        if winner is None:
+            await self._store(record_result, users[0], users[1], draw=True)
+        else:
+            seat = int(winner.player) - 1
+            await self._store(record_result, users[seat], users[1 - seat])
+        if self._archive is not None:
+            await self._store(
+                self._archive.append,
+                GameRecord.from_game(table.game, table.started)
+            )
+
+    def list_tables(self, player, *args):
+        """
+        A method to list the numbers of the tables with a game in progress.
+
+        Args:
+        1. player (Player): The player.
+        """
+        player.send(" ".join(["OK TABLES", *map(str, self._tables)]))
+
+    def watch(self, player, *args):
+        """
+        A method for a player to watch the game at a table: they get a
+        snapshot of the game, then every change to it.
+
+        Args:
+        1. player (Player): The player.
+        2. args (list): The table number.
+        """
+        if player.table is not None or player in self._queue:
+            player.send("ERR Players cannot watch a game.")
+            return
+        if len(args) != 1 or not args[0].isdigit():
+            player.send("ERR Usage: WATCH <table>")
+            return
+        table = self._tables.get(int(args[0]))
+        if table is None:
+            player.send(f"ERR No game at table {args[0]}.")
+            return
+        self._stop_watching(player)
+        table.spectators.add(player)
+        player.watching = table
+        player.send(f"OK WATCH {table.id}")
+        player.feed.start()
+        player.feed.push(table.snapshot(), table.snapshot)
+
+    def unwatch(self, player, *args):
+        """
+        A method for a player to stop watching a game.
+
+        Args:
+        1. player (Player): The player.
+        """
+        if player.watching is None:
+            player.send("ERR Not watching a game.")
+        else:
+            self._stop_watching(player)
+            player.send("OK UNWATCH")
+
+    def _stop_watching(self, player):
+        """
+        A method to take a player off the spectators of a table, dropping the
+        lines of its game still waiting.
+        """
+        if player.watching is not None:
+            player.watching.spectators.discard(player)
+            player.watching = None
+            player.feed.reset()
+
+    async def leave(self, player):
+        """
+        A method to remove a player who quits or disconnects: their game is
+        forfeited, and their account logged out. Nothing is done twice.
+
+        Args:
+        1. player (Player): The player.
+        """
+        self._queue.remove(player)
+        self._stop_watching(player)
+        if player.table is not None:
+            await self.surrender(player)
+        if player.account is not None:
+            player.account = None
+            await self._store(logout, player.name)
+
+
+async def serve(address="8765"):
+    """
+    Function to run a game server until it is interrupted.
+
+    Args:
+    1. address (str): A port number to listen to on localhost, or the path of
+       a Unix socket.
+    """
+    bootstrap_users()
+    server = GameServer(GameArchive("games.bin"))
+    if address.isdigit():
+        listener = await asyncio.start_server(
+            server.handle, "127.0.0.1", int(address)
+        )
+    else:
+        listener = await asyncio.start_unix_server(server.handle, address)
+    print(f"Serving Connect Four on {address}.")
+    matchmaking = asyncio.ensure_future(server.run_matchmaking())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        matchmaking.cancel()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(*sys.argv[1:2]))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,193 @@
+"""
+Module that contains the GameState class, the rules of a Connect Four match
+without any input or display. It is the engine that game_in_progress() runs
+matches through, and that computer players, tests, and simulations can drive
+directly.
+"""
+
+
+# Local Modules
+from custom_errors import GameOverError, InvalidCommandError
+from game_board import BitBoard, Piece
+from win_conditions import VictoryChecker
+
+
+class GameState:
+    """
+    Represents a match in progress, played one step at a time.
+
+    Attributes:
+    1. _board (Board): The Board instance where the game is played.
+    2. _players (list): The Piece instances of player 1 and player 2.
+    3. _referee (VictoryChecker): The referee checking the board after each
+       move.
+    4. _turn (int): The seat of the player to move (0 for player 1, 1 for
+       player 2).
+    5. _moves (list): The columns played since the board was last cleared.
+    6. _history (list): Every column played since the game started, with a 0
+       wherever the board was cleared.
+    7. _last_move (tuple): The (column, row, player) of the last piece
+       dropped, or None if the board is empty.
+    8. _result (tuple): The winning Piece (None for a draw) and surrendering
+       Piece (None if nobody surrendered) once the game is over, or None while
+       the game is in progress.
+    """
+    def __init__(self, board, players, referee):
+        self._board = board
+        self._players = players
+        self._referee = referee
+        self._turn = 0
+        self._moves = []
+        self._history = []
+        self._last_move = None
+        self._result = None
+
+    @classmethod
+    def new(cls, players=None):
+        """
+        A method to set up a game on a fresh BitBoard, with its own referee.
+
+        Args:
+        1. players (list): The Piece instances of player 1 and player 2.
+           Defaults to two plain pieces if None.
+
+        Returns the GameState.
+        """
+        if players is None:
+            players = [
+                Piece("Player1", "white", "O", "1"),
+                Piece("Player2", "white", "X", "2"),
+            ]
+        board = BitBoard(players)
+        return cls(board, players, VictoryChecker(board, players))
+
+    @property
+    def board(self):
+        """A method to access the game's board."""
+        return self._board
+
+    @property
+    def players(self):
+        """A method to access the game's Piece instances."""
+        return self._players
+
+    @property
+    def turn(self):
+        """A method to access the seat of the player to move."""
+        return self._turn
+
+    @property
+    def current_player(self):
+        """A method to access the Piece instance of the player to move."""
+        return self._players[self._turn]
+
+    @property
+    def moves(self):
+        """A method to access the columns played since the last clear."""
+        return tuple(self._moves)
+
+    @property
+    def history(self):
+        """
+        A method to access every column played since the game started, with a
+        0 wherever the board was cleared.
+        """
+        return tuple(self._history)
+
+    @property
+    def move_count(self):
+        """A method to access the number of pieces on the board."""
+        return len(self._moves)
+
+    @property
+    def last_move(self):
+        """A method to access the (column, row, player) of the last drop."""
+        return self._last_move
+
+    @property
+    def is_over(self):
+        """A method to check whether the game has a result."""
+        return self._result is not None
+
+    def legal_moves(self):
+        """
+        A method to list the columns a piece can be dropped onto.
+
+        Returns a list of column numbers (1-7), empty if the game is over.
+        """
+        if self._result is not None:
+            return []
+        return [column for column in range(1, 8) if self._board.can_drop(column)]
+
+    def play(self, column):
+        """
+        A method to drop the piece of the player to move onto a column, and
+        let the referee check the result.
+
+        Args:
+        1. column (int): The column number (1-7).
+
+        Raises GameOverError if the game is over, InvalidCommandError if the
+        column does not exist, and ColumnFullError if the column is full.
+
+        Returns the index of the row (0 being the top row of the board's
+        array) where the piece landed.
+        """
+        if self._result is not None:
+            raise GameOverError("The game is over.")
+        if column not in range(1, 8):
+            raise InvalidCommandError("Invalid column, please try again: ")
+        player = self._players[self._turn]
+        row = player.drop(self._board, column)
+        self._moves.append(column)
+        self._history.append(column)
+        self._last_move = (column, row, player.player)
+        self._turn = int(not self._turn)
+
+        winner = self._referee.check_victory(self._last_move)
+        if winner is not None:
+            self._result = (winner, None)
+        # A full board without a winner is a draw.
+        elif len(self._moves) == 42:
+            self._result = (None, None)
+        return row
+
+    def clear(self):
+        """
+        A method to pull the board's slider. All pieces are removed and player
+        1 moves first again; no result is recorded.
+
+        Raises GameOverError if the game is over.
+        """
+        if self._result is not None:
+            raise GameOverError("The game is over.")
+        self._board.clear_board()
+        self._turn = 0
+        self._moves = []
+        self._history.append(0)
+        self._last_move = None
+
+    def surrender(self, player):
+        """
+        A method for a player to forfeit the game, granting the other player
+        victory.
+
+        Args:
+        1. player (Piece): The Piece instance of the surrendering player.
+
+        Raises GameOverError if the game is over.
+        """
+        if self._result is not None:
+            raise GameOverError("The game is over.")
+        player.surrender = True
+        self._result = (self._referee.surrender(), player)
+
+    def result(self):
+        """
+        A method to access the result of the game.
+
+        Returns None while the game is in progress, or a tuple of the winning
+        Piece (None for a draw) and the surrendering Piece (None if nobody
+        surrendered) once it is over.
+        """
+        return self._result
@@ -6,14 +6,14 @@ and methods from GameHub itself.
 
 
 # Standard Library Modules
-import json
-import operator
 import sys
 
 # Third-party Library Modules
 from termcolor import colored
 
 #Local Modules
+from leaderboards import METRICS, Leaderboards, leaderboards
+from user_store import repository
 from utilities import change_piece_properties, clear_screen, validate_input
 
 
@@ -160,10 +160,13 @@ class GameHub:
 
             # If command is a move_hub() function, return the new hub.
             # Else, perform the function, with additional args as specified by
-            # the feature dictionary.
+            # the feature dictionary. Functions returning the name of a hub
+            # (rather than None) also move the user to it.
             function_args = feature_dict.get("additional_args", [])
             if feature_dict.get("function") != self.move_hub:
-                feature_dict.get("function")(command, *function_args)
+                move_to = feature_dict.get("function")(command, *function_args)
+                if move_to is not None:
+                    return move_to
             else:
                 return feature_dict.get("function")(*function_args)
 
@@ -211,16 +214,22 @@ class GameHub:
 class PlayerLounge(GameHub):
     """
     Represents the lounge of the game, a hub with features such as piece 
-    customization, high-score board, and search for a specific user's record.
+    customization, high-score board, and search for a specific user's record
+    or rankings.
 
     The class inherits from the GameHub class which represents hub-like objects.
 
     Attributes:
     1. customi - u2 (str): Colored string to be displayed in the hub's ASCII art.
-    2. users_record (list) = List of dictionaries, each dictionary containing
-       a user's game history.
+    2. leaderboards (Leaderboards) = Every user's game history, ranked by
+       each high-score metric. Built from a users record if one is given: a
+       list of dictionaries, each dictionary containing a user's game
+       history.
     """
-    def __init__(self, users_record):
+    # Number of ranks shown per page of a high-score board.
+    PAGE_SIZE = 20
+
+    def __init__(self, users_record=None):
         customi = colored("CUSTOMIZE", "cyan")
         high_sco = colored("HIGH SCORE", "yellow")
         ex_to = colored("EXIT TO", "red")
@@ -247,24 +256,36 @@ class PlayerLounge(GameHub):
      _/                                                \_
     /                                                    \
             """,
-            features=["customize", "user_info", "high_score"],
+            features=["customize", "user_info", "high_score", "ranking",
+                      "browse"],
             prompt=(
                 "Welcome to the player lounge! Here you can customize " 
                 "your piece and access player statistics." 
+                "\nRANKING: A user's rank in each high-score board\n"
+                "BROWSE: Any page of a high-score board"
             )
         )
-        self._users_record = users_record
+        # Without a users record, the shared leaderboards are used.
+        self._leaderboards = (
+            leaderboards() if users_record is None
+            else Leaderboards(users_record)
+        )
 
 
     @property
     def users_record(self):
         """A method to access the users record."""
-        return self._users_record
+        return self._leaderboards.records()
 
     @users_record.setter
     def users_record(self, users_record):
         """A method to set the users record."""
-        self._users_record = users_record
+        self._leaderboards = Leaderboards(users_record)
+
+    @property
+    def leaderboards(self):
+        """A method to access the users' leaderboards."""
+        return self._leaderboards
 
     @property
     def visuals(self):
@@ -272,14 +293,24 @@ class PlayerLounge(GameHub):
         return self._visuals
 
     def update_users_record(self):
-        """A method to update the ._users_record attribute."""
-        with open("users.json", "r", encoding="utf-8") as file:
-            users_record = json.load(file)
-        key_del_list = ["pin", "color", "piece_type", "logged_in"]
-        for user in users_record:
-            for key in key_del_list:
-                del user[key]
-        self.users_record = users_record
+        """
+        A method to update the users record, by switching to the leaderboards
+        kept up to date as games are recorded. The repository is only read
+        the first time.
+        """
+        self._leaderboards = leaderboards()
+
+    def find_user(self, username):
+        """
+        A method to find a user's game record, matching the username whatever
+        its case through the user repository's username index.
+
+        Returns the game record, or None if the user is not found.
+        """
+        account = repository().find(username)
+        if account is not None:
+            username = account["username"]
+        return self._leaderboards.get(username)
 
     def display_user_details(self, username):
         """
@@ -289,14 +320,13 @@ class PlayerLounge(GameHub):
         1. username = The username key that will be searched in self.users_record
            and displayed along with the rest of the user details (dictionary).
         """
-        for user in self.users_record:
-            if user["username"] == username:
-                print(f"{user['username']}'s stats:")
-                print(f"Games played: {user['games_played']}")
-                print(f"Wins: {user['wins']}")
-                print(f"Losses: {user['losses']}")
-                print(f"Win ratio: {user['win_ratio']}%")
-                break
+        user = self.find_user(username)
+        if user is not None:
+            print(f"{user['username']}'s stats:")
+            print(f"Games played: {user['games_played']}")
+            print(f"Wins: {user['wins']}")
+            print(f"Losses: {user['losses']}")
+            print(f"Win ratio: {user['win_ratio']}%")
         else:
             print("Invalid username.")
 
@@ -309,26 +339,58 @@ class PlayerLounge(GameHub):
         1. sorter (str): Determines the criteria from which to display the
            highest scorers (e.g. "wins", "games played," "win_ratio", etc.).
         """
-        sorted_list = sorted(
-            self.users_record,
-            key=operator.itemgetter(sorter),
-            reverse=True
-        )
-
         print(f"Most {sorter}:\n")
 
-        count = 0
-        for user in sorted_list:
+        # Display 5 records. Or if there are fewer than 5 records in users
+        # record, display all.
+        for user in self._leaderboards.top(sorter, 5):
             print(f"{user['username']}'s stats:")
             print(f"Games played: {user['games_played']}")
             print(f"Wins: {user['wins']}")
             print(f"Losses: {user['losses']}")
             print(f"Win ratio: {user['win_ratio']}%\n\n\n")
-            count += 1
-            # Display 5 records. Or if there are fewer than 5 records in
-            # users record, display all.
-            if count == 5 or count == len(self.users_record):
-                break
+
+    def display_user_ranking(self, username):
+        """
+        A method to display a user's rank and percentile (the percentage of
+        users with a lower score) in each high-score board.
+
+        Args:
+        1. username (str): The username of the user.
+        """
+        user = self.find_user(username)
+        if user is None:
+            print("Invalid username.")
+            return
+        username = user["username"]
+        total = len(self._leaderboards)
+        print(f"{username}'s rankings:")
+        for metric in METRICS:
+            rank = self._leaderboards.rank(metric, username)
+            percentile = self._leaderboards.percentile(metric, username)
+            print(
+                f"{metric}: {user[metric]}, rank {rank} of {total}, ahead of "
+                f"{percentile}% of users"
+            )
+
+    def display_leaderboard_page(self, command):
+        """
+        A method to display a page of a high-score board.
+
+        Args:
+        1. command (str): The board's metric (e.g. "wins"), optionally
+           followed by the first rank of the page (e.g. "wins 1000"). Pages
+           start at rank 1 by default.
+        """
+        metric, _, start = command.lower().partition(" ")
+        start = int(start) if start else 1
+        page = self._leaderboards.page(metric, start, self.PAGE_SIZE)
+        if not page:
+            print(f"There are only {len(self._leaderboards)} users.")
+            return
+        print(f"Most {metric}, ranks {start} - {page[-1][0]}:\n")
+        for rank, user in page:
+            print(f"{rank}. {user['username']}: {user[metric]}")
 
     def customization(self, command, players):
         """
@@ -391,7 +453,30 @@ class PlayerLounge(GameHub):
             self.display_high_scorer,
         )
 
-        features_list = [customize_dict, user_info_dict, high_score_dict]
+        ranking_dict = self.generate_feature_dict(
+            self.features[3],
+            "Which user's rankings do you want to view?",
+            ["Type username", "exit"],
+            self.display_user_ranking,
+            # Disables validation and lets user type in unrestricted lines
+            # of string as a keyword for username search.
+            custom_match=".*"
+        )
+        browse_dict = self.generate_feature_dict(
+            self.features[4],
+            ("Which high-score board do you want to browse? Add the first "
+             "rank of the page to skip to it (e.g. wins 1000)."),
+            ["wins", "games_played", "win_ratio", "exit"],
+            self.display_leaderboard_page,
+            custom_match=(
+                f"^(({'|'.join(METRICS)})( [1-9][0-9]*)?|exit)$"
+            )
+        )
+
+        features_list = [
+            customize_dict, user_info_dict, high_score_dict, ranking_dict,
+            browse_dict
+        ]
 
         # self.enter_logic defines what happens when the user enters the hub,
         # and returns where the user wants to go next once they decide to leave
@@ -415,6 +500,8 @@ class MainLobby(GameHub):
 
     Attributes:
     1. loun - ex (str): Colored strings to be displayed in the hub's ASCII art.
+    2. computer_seat (int): The seat taken by the computer in the next match
+       (0 for player 1, 1 for player 2), or None for a player match.
     """
     def __init__(self):
         loun = colored("LOUNGE", "blue")
@@ -445,16 +532,37 @@ class MainLobby(GameHub):
             prompt=(
                 "Welcome to Terminal Connect Four! Select an option:\n"
                 "LOUNGE: Customize your piece, or view player statistics\n"
-                "MATCH: Start a player match\n"
+                "MATCH: Start a player match, or a match against the computer\n"
                 "EXIT: All users logout and exit the game"
             )
         )
+        self._computer_seat = None
 
     @property
     def visuals(self):
         """A method to access the hub's ASCII art representation."""
         return self._visuals
 
+    @property
+    def computer_seat(self):
+        """A method to access the seat taken by the computer, if any."""
+        return self._computer_seat
+
+    def select_match(self, command):
+        """
+        A method to start a match from the "match" feature of the MainLobby
+        hub, against the computer or not.
+
+        Args:
+        1. command (str): The command entered by the user. "cpu1" or "cpu2"
+           lets the computer take player 1's or player 2's seat, anything else
+           starts a player match.
+
+        Returns the name of the hub to move into.
+        """
+        self._computer_seat = {"cpu1": 0, "cpu2": 1}.get(command.lower())
+        return self.move_hub("match")
+
     def enter(self):
         """
         A method that defines what happens when a player decide to enter the
@@ -478,10 +586,10 @@ class MainLobby(GameHub):
 
         match_dict = self.generate_feature_dict(
             self.features[1],
-            "Start a match?",
-            ["press Enter", "exit"],
-            self.move_hub,
-            ["match"],
+            ("Start a match? Press Enter for a player match, or type cpu1 / "
+             "cpu2 to let the computer take player 1's / player 2's seat."),
+            ["press Enter", "cpu1", "cpu2", "exit"],
+            self.select_match,
             # Disables validation and lets user type in unrestricted lines
             # of string because entering does not require a specific format.
             custom_match=".*"
@@ -0,0 +1,408 @@
+"""
+Module for the high-score boards of the player lounge. Users are kept ranked
+by each metric as game results are recorded, so showing a board or a user's
+rank never sorts the whole user base.
+
+The boards in use are built from the user repository on first access with
+leaderboards(), kept up to date with update_leaderboards() as this program
+records games, and brought up to date with the repository when it was
+changed by another program.
+"""
+
+
+# Standard Library Modules
+from bisect import bisect_left, insort
+
+# Local Modules
+from user_store import STATS_FIELDS, repository
+
+
+# Metrics users are ranked by.
+METRICS = ("wins", "games_played", "win_ratio")
+
+
+class FenwickTree:
+    """
+    Represents a list of counts, answering prefix sums and finding which count
+    a running total falls in, both in O(log n) (a Fenwick, or binary indexed,
+    tree).
+
+    Attributes:
+    1. _tree (list): The partial sums, 1-based.
+    """
+    def __init__(self, counts=()):
+        self._tree = [0] + list(counts)
+        # Each partial sum is added to the next one covering it.
+        for index in range(1, len(self._tree)):
+            parent = index + (index & -index)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[index]
+
+    def add(self, index, delta):
+        """A method to add delta to the count at an index (0-based)."""
+        index += 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index):
+        """Returns the sum of the counts before an index (0-based)."""
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, position):
+        """
+        A method to find which count a running total falls in.
+
+        Args:
+        1. position (int): The running total (0-based), less than the sum of
+           all counts.
+
+        Returns a tuple of the index of the count and the position within it.
+        """
+        index = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if (index + step < len(self._tree)
+                    and self._tree[index + step] <= position):
+                index += step
+                position -= self._tree[index]
+            step >>= 1
+        return index, position
+
+
+class Leaderboard:
+    """
+    Represents users ranked by one metric, highest score first. Users with the
+    same score keep their creation order.
+
+    The ranking is a sorted list of (negated score, creation order, username)
+    keys, split into blocks of at most 2 * BLOCK_SIZE keys. Changing a user's
+    score removes and inserts one key, which searches the blocks' last keys
+    and then one block, and only shifts the keys of that block. A Fenwick tree
+    of the blocks' lengths turns a key into its rank, and a rank into its key,
+    in O(log n); it is only rebuilt when blocks are split or dropped.
+
+    Attributes:
+    1. _blocks (list): The sorted blocks of keys.
+    2. _maxes (list): The last key of each block.
+    3. _keys (dict): The key of each username.
+    4. _lengths (FenwickTree): The lengths of the blocks.
+    """
+    BLOCK_SIZE = 512
+
+    def __init__(self, entries=()):
+        # Entries are (username, score, creation order) tuples to start with.
+        self._keys = {
+            username: (-score, order, username)
+            for username, score, order in entries
+        }
+        keys = sorted(self._keys.values())
+        self._blocks = [
+            keys[start:start + self.BLOCK_SIZE]
+            for start in range(0, len(keys), self.BLOCK_SIZE)
+        ]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._lengths = FenwickTree(len(block) for block in self._blocks)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _reindex(self):
+        """A method to rebuild the tree of lengths after blocks changed."""
+        self._lengths = FenwickTree(len(block) for block in self._blocks)
+
+    def _insert(self, key):
+        """A method to insert a key in its block, splitting it if too long."""
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._reindex()
+            return
+        index = bisect_left(self._maxes, key)
+        # Keys after the last block's last key go at the end of it.
+        if index == len(self._blocks):
+            index -= 1
+        block = self._blocks[index]
+        insort(block, key)
+        self._maxes[index] = block[-1]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self._blocks[index:index + 1] = [
+                block[:self.BLOCK_SIZE], block[self.BLOCK_SIZE:]
+            ]
+            self._maxes[index:index + 1] = [
+                block[self.BLOCK_SIZE - 1], block[-1]
+            ]
+            self._reindex()
+        else:
+            self._lengths.add(index, 1)
+
+    def _remove(self, key):
+        """A method to remove a key from its block, dropping empty blocks."""
+        index = bisect_left(self._maxes, key)
+        block = self._blocks[index]
+        del block[bisect_left(block, key)]
+        if block:
+            self._maxes[index] = block[-1]
+            self._lengths.add(index, -1)
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+            self._reindex()
+
+    def update(self, username, score, order):
+        """
+        A method to add a user to the board, or move them to a new score.
+
+        Args:
+        1. username (str): The username.
+        2. score (float): The user's score in the board's metric.
+        3. order (int): The user's creation order, ranking users with the same
+           score.
+        """
+        key = (-score, order, username)
+        old_key = self._keys.get(username)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._remove(old_key)
+        self._insert(key)
+        self._keys[username] = key
+
+    def _position(self, key):
+        """Returns the number of keys on the board before a key."""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._blocks):
+            return len(self._keys)
+        return self._lengths.prefix(index) + bisect_left(self._blocks[index], key)
+
+    def page(self, start, count):
+        """
+        A method to list the usernames of a range of ranks.
+
+        Args:
+        1. start (int): The first rank listed (1 being the highest score).
+        2. count (int): The number of users to list.
+
+        Returns a list of up to count usernames, highest score first.
+        """
+        usernames = []
+        if not 0 < start <= len(self._keys):
+            return usernames
+        index, offset = self._lengths.find(start - 1)
+        for block in self._blocks[index:]:
+            for key in block[offset:offset + count - len(usernames)]:
+                usernames.append(key[2])
+            if len(usernames) == count:
+                break
+            offset = 0
+        return usernames
+
+    def top(self, count):
+        """
+        A method to list the usernames of the highest ranked users.
+
+        Args:
+        1. count (int): The number of users to list.
+
+        Returns a list of up to count usernames, highest score first.
+        """
+        return self.page(1, count)
+
+    def rank(self, username):
+        """
+        A method to find a user's rank (1 being the highest score).
+
+        Returns the rank, or None if the user is not on the board.
+        """
+        key = self._keys.get(username)
+        if key is None:
+            return None
+        return self._position(key) + 1
+
+    def count_below(self, score):
+        """Returns the number of users with a lower score than a score."""
+        # Keys of users with the same score come before this key.
+        return len(self._keys) - self._position((-score, float("inf")))
+
+
+class Leaderboards:
+    """
+    Represents the game records of every user, ranked by each of METRICS.
+
+    Attributes:
+    1. _records (dict): The game record (STATS_FIELDS) of each username, in
+       creation order.
+    2. _order (dict): The creation order of each username.
+    3. _boards (dict): The Leaderboard of each metric.
+    """
+    def __init__(self, records=()):
+        # Records are game records (e.g. from UserRepository.stats()), in
+        # creation order.
+        self._records = {}
+        self._order = {}
+        for record in records:
+            self._order[record["username"]] = len(self._order)
+            self._records[record["username"]] = {
+                field: record[field] for field in STATS_FIELDS
+            }
+        self._boards = {
+            metric: Leaderboard(
+                (username, record[metric], self._order[username])
+                for username, record in self._records.items()
+            )
+            for metric in METRICS
+        }
+
+    def __len__(self):
+        return len(self._records)
+
+    def records(self):
+        """Returns a list of every user's game record, in creation order."""
+        return [dict(record) for record in self._records.values()]
+
+    def get(self, username):
+        """Returns a copy of a user's game record, or None if not found."""
+        record = self._records.get(username)
+        return None if record is None else dict(record)
+
+    def refresh(self, records):
+        """
+        A method to bring the boards up to date with every user's game
+        record, re-ranking only the users whose record changed.
+
+        Args:
+        1. records (list): Every user's game record, in creation order.
+
+        Returns the number of users re-ranked.
+        """
+        changed = 0
+        for record in records:
+            known = self._records.get(record["username"])
+            if known is None or any(
+                    known[field] != record[field] for field in STATS_FIELDS
+            ):
+                self.update(record)
+                changed += 1
+        return changed
+
+    def update(self, record):
+        """
+        A method to add a user's game record, or replace it after a game.
+
+        Args:
+        1. record (dict): The user's game record. Fields other than
+           STATS_FIELDS are ignored.
+        """
+        username = record["username"]
+        if username not in self._order:
+            self._order[username] = len(self._order)
+        self._records[username] = {
+            field: record[field] for field in STATS_FIELDS
+        }
+        for metric, board in self._boards.items():
+            board.update(username, record[metric], self._order[username])
+
+    def top(self, metric, count):
+        """
+        A method to list the game records of the highest ranked users.
+
+        Args:
+        1. metric (str): One of METRICS.
+        2. count (int): The number of users to list.
+
+        Returns a list of up to count game records, highest score first.
+        """
+        return [
+            dict(self._records[username])
+            for username in self._boards[metric].top(count)
+        ]
+
+    def rank(self, metric, username):
+        """
+        A method to find a user's rank in a metric (1 being the highest).
+
+        Returns the rank, or None if the user is not found.
+        """
+        return self._boards[metric].rank(username)
+
+    def percentile(self, metric, username):
+        """
+        A method to find the percentage of users with a lower score than a
+        user in a metric.
+
+        Returns the percentage (0 - 100), or None if the user is not found.
+        """
+        record = self._records.get(username)
+        if record is None:
+            return None
+        below = self._boards[metric].count_below(record[metric])
+        return round(below / len(self._records) * 100, 2)
+
+    def page(self, metric, start, count):
+        """
+        A method to list the game records of a range of ranks in a metric.
+
+        Args:
+        1. metric (str): One of METRICS.
+        2. start (int): The first rank listed (1 being the highest).
+        3. count (int): The number of users to list.
+
+        Returns a list of up to count tuples of a rank and a game record.
+        """
+        return [
+            (rank, dict(self._records[username]))
+            for rank, username in enumerate(
+                self._boards[metric].page(start, count), start
+            )
+        ]
+
+
+# The leaderboards in use, the repository they were built from, and its
+# version when they were last brought up to date with it.
+_leaderboards = None
+_source = None
+_version = None
+
+
+def leaderboards():
+    """
+    Function to access the leaderboards of the repository in use, built from
+    its game records on first access, and refreshed from them whenever the
+    repository changed since (e.g. games recorded by another program).
+    """
+    global _leaderboards, _source, _version
+    if _leaderboards is None or _source is not repository():
+        _source = repository()
+        _version = _source.version
+        _leaderboards = Leaderboards(_source.stats_view())
+    else:
+        version = _source.version
+        if version is None or version != _version:
+            _version = version
+            _leaderboards.refresh(_source.stats_view())
+    return _leaderboards
+
+
+def update_leaderboards(*records, version=None):
+    """
+    Function to bring the leaderboards up to date with new or changed game
+    records. Nothing is done if they have not been built yet, since they will
+    be built from the repository, changes included.
+
+    Args:
+    1. records (dict): The game records (or user dictionaries) that changed.
+    2. version (object): The repository's version before the change, or None.
+       If the leaderboards were up to date with it, they are marked up to
+       date with the version after the change, so that only changes made by
+       other programs have them refreshed by leaderboards().
+    """
+    global _version
+    if _leaderboards is not None and _source is repository():
+        for record in records:
+            _leaderboards.update(record)
+        if version is not None and version == _version:
+            _version = _source.version
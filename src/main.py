@@ -9,18 +9,21 @@ import colorama
 
 # Local Modules
 from game_board import Board, Piece
+from computer_player import ComputerPlayer
+from opening_book import load_book
+from game_records import GameArchive
 from win_conditions import VictoryChecker
 from game_engine import game_in_progress, game_complete, game_reset, game_start
 from start_menu import game_setup, start_screen
-from user_utils import User, reset_log, generate_users_record, check_json
+from user_utils import User, reset_log, bootstrap_users
 from hubs import PlayerLounge, MainLobby
 
 
-# Start program by ensuring users.json file and is in the right format,
-# and logging all players out as a fail-safe
-check_json()
-reset_log()
-# Log all players out when program exits.
+# Start program by choosing where user accounts are stored (users.json unless
+# CONNECT4_USER_STORE=sqlite), ensuring users.json file is in the right format
+# while loading it, and keeping logins in the shared sessions.json lease file
+bootstrap_users()
+# Log this program's players out when program exits.
 atexit.register(reset_log)
 # Colorama.init ensures termcolor also works on Windows and other systems.
 colorama.init(autoreset=True)
@@ -39,8 +42,11 @@ board = Board(players)
 referee = VictoryChecker(board, players)
 # Game hubs used throughout the program.
 main_lobby = MainLobby()
-users_record = generate_users_record()
-player_lounge = PlayerLounge(users_record)
+# Opening book of the computer player, if one has been generated.
+opening_book = load_book("opening_book.bin")
+# Archive where every finished game is recorded.
+game_archive = GameArchive("games.bin")
+player_lounge = PlayerLounge()
 
 
 start_screen()
@@ -59,11 +65,24 @@ while True:
             player_lounge.enter(players)
             continue
         case "match":
+            # Seats the computer if one was picked in the lobby. Its seat is
+            # recorded as a guest, so the logged-in user's stats are untouched.
+            seat = main_lobby.computer_seat
+            computers = (
+                {} if seat is None
+                else {seat: ComputerPlayer(book=opening_book)}
+            )
+            match_users = list(users)
+            if seat is not None:
+                match_users[seat] = User("Guest", games_played=None, wins=None,
+                                         losses=None, win_ratio=None)
             # Starts match loop
             while True:
                 game_start(players)
-                game_result = game_in_progress(board, players, referee)
-                post_game = game_complete(game_result, users)
+                game_result = game_in_progress(
+                    board, players, referee, computers, game_archive
+                )
+                post_game = game_complete(game_result, match_users)
                 if post_game.lower() == "y":
                     game_reset(board, players)
                     continue
@@ -0,0 +1,174 @@
+"""
+Module for pairing players waiting for a match by how close their ratings
+(their win ratio, 0 - 100) are. The rating gap a player accepts widens the
+longer they wait, so that players with unusual ratings are still matched.
+
+Waiting players are kept in buckets of ratings, so adding a player is O(1)
+and a round of pairing costs O(pairs + buckets), however many players wait.
+"""
+
+
+# Standard Library Modules
+import time
+from collections import deque
+
+
+class MatchmakingQueue:
+    """
+    Represents the players waiting for a match, by rating bucket.
+
+    Players in the same bucket are paired first, oldest first, whatever their
+    gap: the bucket width is the smallest gap told apart. The players left
+    (at most one per bucket) are then paired across buckets, oldest first,
+    with the closest player whose rating is within the gap either of them
+    accepts.
+
+    Attributes:
+    1. _bucket_width (float): The rating range of a bucket.
+    2. _base_gap (float): The rating gap accepted on joining the queue.
+    3. _widening (float): The rating gap added per second of waiting.
+    4. _max_gap (float): The largest rating gap accepted.
+    5. _clock (function): The clock of joining and pairing times (s).
+    6. _tickets (dict): The (rating, joined, player) ticket of each player.
+    7. _buckets (dict): The tickets of each bucket, oldest first. Tickets of
+       players who left are only dropped when reached.
+    8. _counts (dict): The number of players waiting in each bucket.
+    """
+    def __init__(
+            self, bucket_width=2.5, base_gap=5.0, widening=1.0, max_gap=100.0,
+            clock=time.monotonic
+    ):
+        self._bucket_width = bucket_width
+        self._base_gap = base_gap
+        self._widening = widening
+        self._max_gap = max_gap
+        self._clock = clock
+        self._tickets = {}
+        self._buckets = {}
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __contains__(self, player):
+        return player in self._tickets
+
+    def gap(self, player, now=None):
+        """
+        A method to work out the rating gap a waiting player accepts.
+
+        Args:
+        1. player: The player.
+        2. now (float): The current time. Defaults to the clock if None.
+        """
+        joined = self._tickets[player][1]
+        now = self._clock() if now is None else now
+        return min(
+            self._max_gap, self._base_gap + self._widening * (now - joined)
+        )
+
+    def enqueue(self, player, rating, now=None):
+        """
+        A method to add a player to the queue.
+
+        Args:
+        1. player: The player, any hashable value (e.g. a username).
+        2. rating (float): The player's rating.
+        3. now (float): The time the player joined. Defaults to the clock if
+           None.
+
+        Raises ValueError if the player is already waiting.
+        """
+        if player in self._tickets:
+            raise ValueError(f"{player} is already waiting for a match.")
+        ticket = (rating, self._clock() if now is None else now, player)
+        self._tickets[player] = ticket
+        key = int(rating // self._bucket_width)
+        self._buckets.setdefault(key, deque()).append(ticket)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def remove(self, player):
+        """
+        A method to take a player out of the queue, if they are waiting.
+        """
+        ticket = self._tickets.pop(player, None)
+        if ticket is not None:
+            self._drop(int(ticket[0] // self._bucket_width))
+
+    def _drop(self, key):
+        """A method to count one player less in a bucket."""
+        self._counts[key] -= 1
+        if not self._counts[key]:
+            del self._counts[key]
+            del self._buckets[key]
+
+    def _first(self, key):
+        """Returns the oldest ticket of a bucket still waiting."""
+        bucket = self._buckets[key]
+        while self._tickets.get(bucket[0][2]) is not bucket[0]:
+            bucket.popleft()
+        return bucket[0]
+
+    def _pop(self, key):
+        """A method to take the oldest waiting player out of a bucket."""
+        ticket = self._first(key)
+        self._buckets[key].popleft()
+        del self._tickets[ticket[2]]
+        self._drop(key)
+        return ticket[2]
+
+    def pair(self, now=None):
+        """
+        A method to pair as many waiting players as their gaps allow, and
+        take them out of the queue.
+
+        Args:
+        1. now (float): The current time. Defaults to the clock if None.
+
+        Returns a list of (player, player) pairs, the player who waited
+        longest first.
+        """
+        now = self._clock() if now is None else now
+        pairs = []
+        for key in list(self._counts):
+            while self._counts.get(key, 0) >= 2:
+                pairs.append((self._pop(key), self._pop(key)))
+
+        # The players left, one per bucket, by rating. Each has neighbours
+        # (indexes of the closest players left below and above) that skip
+        # over players paired already.
+        singles = [self._first(key) for key in sorted(self._counts)]
+        below = list(range(-1, len(singles) - 1))
+        above = list(range(1, len(singles) + 1))
+        paired = set()
+        for index in sorted(
+                range(len(singles)), key=lambda index: singles[index][1]
+        ):
+            if index in paired:
+                continue
+            rating, joined, player = singles[index]
+            best = None
+            for other in (below[index], above[index]):
+                if not 0 <= other < len(singles):
+                    continue
+                distance = abs(singles[other][0] - rating)
+                accepted = max(
+                    self.gap(player, now), self.gap(singles[other][2], now)
+                )
+                if distance <= accepted and (
+                        best is None
+                        or distance < abs(singles[best][0] - rating)
+                ):
+                    best = other
+            if best is None:
+                continue
+            first, second = sorted((index, best), key=lambda i: singles[i][1])
+            pairs.append((singles[first][2], singles[second][2]))
+            for matched in (index, best):
+                paired.add(matched)
+                if below[matched] >= 0:
+                    above[below[matched]] = above[matched]
+                if above[matched] < len(singles):
+                    below[above[matched]] = below[matched]
+                self.remove(singles[matched][2])
+        return pairs
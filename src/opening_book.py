@@ -0,0 +1,181 @@
+"""
+Module for the opening book of the computer player: the best column of the
+first positions of a game, searched once offline and stored in a binary file.
+
+The file starts with an 8-byte magic string and the number of entries, then
+holds one fixed-size entry (position key, best column, score) per position,
+sorted by key. It is memory-mapped rather than read, and looked up by binary
+search, so opening it costs nothing up front and processes using the same
+book share its pages.
+
+A book can be generated from the command line:
+
+    python opening_book.py <output file> [plies] [seconds per position]
+"""
+
+
+# Standard Library Modules
+import mmap
+import os
+import struct
+import sys
+
+# Local Modules
+from computer_player import ComputerPlayer, Position, alignment, WIDTH
+
+
+MAGIC = b"C4BOOK01"
+HEADER = struct.Struct("<8sI")
+# Position key, best column (1-7), and score of an entry.
+ENTRY = struct.Struct("<QBh")
+
+
+def mirror_key(key):
+    """
+    Function to mirror a position key left to right, by reversing the order of
+    its 7-bit columns.
+    """
+    mirrored = 0
+    for column in range(WIDTH):
+        mirrored |= ((key >> (7 * column)) & 0x7F) << (7 * (WIDTH - 1 - column))
+    return mirrored
+
+
+def canonical_key(position):
+    """
+    Function to give a position and its mirror image the same key.
+
+    Args:
+    1. position (Position): The position.
+
+    Returns a tuple of the key and whether it is the key of the mirror image.
+    """
+    key = position.key()
+    mirrored = mirror_key(key)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+def generate_book(path, plies=6, time_budget=0.05):
+    """
+    Function to search every position of the first plies of a game, and
+    write the best column of each to an opening book file.
+
+    Args:
+    1. path (str): The path of the book file to write.
+    2. plies (int): Positions with fewer pieces than this are included.
+    3. time_budget (float): The number of seconds searched per position.
+
+    Returns the number of entries written.
+    """
+    computer = ComputerPlayer(time_budget=time_budget)
+    entries = {}
+    layer = [Position()]
+    for _ in range(plies):
+        next_layer = []
+        for position in layer:
+            key, mirrored = canonical_key(position)
+            if key in entries:
+                continue
+            column = computer.search(position)
+            score = computer.last_search["score"]
+            # Entries are stored for the canonical orientation.
+            entries[key] = ((WIDTH - 1 - column) if mirrored else column, score)
+            for child_column in range(WIDTH):
+                if not position.can_play(child_column):
+                    continue
+                child = Position(position.current, position.mask, position.moves)
+                child.play(child_column)
+                # Positions won by the last move have nothing left to search.
+                if not alignment(child.current ^ child.mask):
+                    next_layer.append(child)
+        layer = next_layer
+
+    # Written to a temporary file first, so that a book in use is never seen
+    # half-written.
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(entries)))
+        for key in sorted(entries):
+            column, score = entries[key]
+            file.write(ENTRY.pack(key, column + 1, score))
+    os.replace(temporary, path)
+    return len(entries)
+
+
+class OpeningBook:
+    """
+    Represents an opening book file, memory-mapped for lookups.
+
+    Attributes:
+    1. _file (file): The open book file.
+    2. _map (mmap.mmap): The read-only memory map of the file.
+    3. _count (int): The number of entries in the book.
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book.")
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, position):
+        """
+        A method to find a position in the book.
+
+        Args:
+        1. position (Position): The position, with the computer to move.
+
+        Returns a tuple of the best column (1-7) and its score, or None if the
+        position is not in the book.
+        """
+        key, mirrored = canonical_key(position)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, column, score = ENTRY.unpack_from(
+                self._map, HEADER.size + middle * ENTRY.size
+            )
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                return (WIDTH + 1 - column if mirrored else column), score
+        return None
+
+    def close(self):
+        """A method to close the memory map and the file."""
+        self._map.close()
+        self._file.close()
+
+
+def load_book(path):
+    """
+    Function to open an opening book if there is one.
+
+    Args:
+    1. path (str): The path of the book file.
+
+    Returns the OpeningBook, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    count = generate_book(
+        sys.argv[1],
+        int(sys.argv[2]) if len(sys.argv) > 2 else 6,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.05,
+    )
+    print(f"{count:,} positions written to {sys.argv[1]}.")
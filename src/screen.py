@@ -0,0 +1,105 @@
+"""
+Module that contains the Screen class, which clears and redraws the terminal
+with ANSI escape sequences written from the program itself, instead of running
+a shell command.
+"""
+
+
+# Standard Library Modules
+import shutil
+import sys
+
+
+# ANSI escape sequences
+HOME = "\x1b[H"
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_LINE_END = "\x1b[K"
+CLEAR_SCREEN_END = "\x1b[J"
+
+
+def move_to(line):
+    """Returns the ANSI escape sequence moving the cursor to a line (1-based)."""
+    return f"\x1b[{line};1H"
+
+
+class Screen:
+    """
+    Represents the terminal the game is displayed on.
+
+    The screen remembers the last frame it drew (e.g. the game board), so that
+    redrawing a frame only rewrites the lines that changed since. When the
+    output is not a terminal (e.g. piped to a file), nothing is cleared and
+    frames are written out in full.
+
+    Attributes:
+    1. _stream (file): The stream written to. Defaults to sys.stdout at the
+       time of writing if None.
+    2. _frame (list): The lines of the frame currently on screen, starting at
+       the top line, or None if the screen content is unknown.
+    """
+    # Lines kept free below a frame for the prompts that follow it. If the
+    # terminal is too short for them, the screen would scroll and the lines on
+    # screen would no longer be where the frame left them.
+    PROMPT_LINES = 4
+
+    def __init__(self, stream=None):
+        self._stream = stream
+        self._frame = None
+
+    @property
+    def stream(self):
+        """A method to access the stream the screen writes to."""
+        return self._stream if self._stream is not None else sys.stdout
+
+    @property
+    def is_terminal(self):
+        """A method to check whether the stream is an interactive terminal."""
+        try:
+            return self.stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def write(self, text):
+        """A method to write text to the stream in one go, and flush it."""
+        self.stream.write(text)
+        self.stream.flush()
+
+    def clear(self):
+        """A method to clear the terminal, equivalent to the clear command."""
+        self._frame = None
+        if self.is_terminal:
+            self.write(HOME + CLEAR_SCREEN)
+
+    def draw(self, frame):
+        """
+        A method to display a frame at the top of the terminal, followed by an
+        empty line for prompts. Only lines that differ from the frame on screen
+        are rewritten, and anything printed below the previous frame is
+        cleared.
+
+        Args:
+        1. frame (str): The frame to display, e.g. from Board.render().
+        """
+        lines = frame.split("\n")
+        if not self.is_terminal:
+            self.write(frame + "\n")
+            return
+
+        rows = shutil.get_terminal_size().lines
+        if self._frame is None or len(lines) + self.PROMPT_LINES > rows:
+            # The frame on screen is unknown, so the screen is repainted.
+            output = [HOME + CLEAR_SCREEN + frame]
+        else:
+            output = [
+                move_to(index + 1) + line + CLEAR_LINE_END
+                for index, line in enumerate(lines)
+                if index >= len(self._frame) or self._frame[index] != line
+            ]
+            output.append(move_to(len(lines) + 1) + CLEAR_SCREEN_END)
+        output.append(move_to(len(lines) + 1))
+        self.write("".join(output))
+        self._frame = lines
+
+
+# The screen of the program, shared by all its modules.
+SCREEN = Screen()
@@ -0,0 +1,201 @@
+"""
+Module that keeps track of which users are logged in. Login state is not part
+of the stored user accounts: logging in or out never writes the user
+repository.
+
+Sessions are either held in memory, for a single process, or in a small
+lease file shared by every process using the same users (only users logged in
+are in it). A lease expires after LEASE_SECONDS, or as soon as the process
+holding it is gone, so a crash never leaves a user locked out.
+
+The registry in use is set with configure_sessions() and accessed with
+sessions().
+"""
+
+
+# Standard Library Modules
+import json
+import os
+import time
+
+# Local Modules
+from user_store import file_lock, replace_file, username_key
+
+
+# Lease file shared by the processes of the terminal game and game server.
+SESSIONS_FILE = "sessions.json"
+# Time after which a lease expires, even if its process is still running.
+LEASE_SECONDS = 12 * 60 * 60
+
+
+def process_alive(pid):
+    """
+    Function to check whether a process is running on this machine. Where
+    this cannot be checked safely (Windows), processes are assumed running,
+    and leases only end when they expire.
+    """
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SessionRegistry:
+    """
+    Represents the users logged in, by username, whatever their case.
+
+    Attributes:
+    1. _path (str): The path of the lease file, or None to keep sessions in
+       memory.
+    2. _lease_seconds (float): The time after which a lease expires.
+    3. _clock (function): The clock of lease expiry times (s since the epoch).
+    4. _leases (dict): The sessions in memory, by username key, when there is
+       no lease file. Each lease is a dictionary of the username, the pid of
+       the process holding it, and its expiry time.
+    5. _own (set): The username keys of the sessions held by this process.
+    """
+    def __init__(self, path=None, lease_seconds=LEASE_SECONDS, clock=time.time):
+        self._path = path
+        self._lease_seconds = lease_seconds
+        self._clock = clock
+        self._leases = {}
+        self._own = set()
+
+    @property
+    def path(self):
+        """A method to access the path of the lease file, if any."""
+        return self._path
+
+    def _read(self):
+        """Returns the leases of the lease file, live or not."""
+        try:
+            with open(self._path, "r", encoding="utf-8") as file:
+                leases = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return leases if isinstance(leases, dict) else {}
+
+    def _live(self, leases):
+        """Returns the leases that have not expired, by username key."""
+        now = self._clock()
+        return {
+            key: lease for key, lease in leases.items()
+            if lease["expires"] > now and process_alive(lease["pid"])
+        }
+
+    def _modify(self, change):
+        """
+        A method to change the live leases. With a lease file, the file is
+        locked, read, and only replaced if the leases changed.
+
+        Args:
+        1. change (function): Changes the leases dictionary passed to it, and
+           returns the result of the method.
+
+        Returns the result of change.
+        """
+        if self._path is None:
+            self._leases = self._live(self._leases)
+            return change(self._leases)
+        with file_lock(self._path):
+            leases = self._read()
+            live = self._live(leases)
+            result = change(live)
+            if live != leases:
+                replace_file(self._path, json.dumps(live).encode("utf-8"))
+        return result
+
+    def is_logged_in(self, username):
+        """A method to check whether a user is logged in, by any process."""
+        if self._path is None:
+            leases = self._leases
+        else:
+            with file_lock(self._path, exclusive=False):
+                leases = self._read()
+        key = username_key(username)
+        lease = leases.get(key)
+        return lease is not None and key in self._live({key: lease})
+
+    def login(self, username):
+        """
+        A method to start a session for a user.
+
+        Returns True if the user was logged in, or False if they already are.
+        """
+        key = username_key(username)
+
+        def change(leases):
+            if key in leases:
+                return False
+            leases[key] = {
+                "username": username,
+                "pid": os.getpid(),
+                "expires": self._clock() + self._lease_seconds,
+            }
+            return True
+
+        if not self._modify(change):
+            return False
+        self._own.add(key)
+        return True
+
+    def logout(self, username):
+        """
+        A method to end a user's session.
+
+        Returns True if the user was logged in, or False otherwise.
+        """
+        key = username_key(username)
+        self._own.discard(key)
+        return self._modify(lambda leases: leases.pop(key, None) is not None)
+
+    def logout_all(self):
+        """
+        A method to end every session held by this process. Sessions of
+        other processes sharing the lease file are left alone.
+
+        Returns the number of users logged out.
+        """
+        own, self._own = self._own, set()
+        if not own:
+            return 0
+        return self._modify(
+            lambda leases: sum(leases.pop(key, None) is not None for key in own)
+        )
+
+
+# The registry in use.
+_sessions = None
+
+
+def configure_sessions(path=None):
+    """
+    Function to choose where sessions are kept. Sessions held by this process
+    in the previous registry are ended.
+
+    Args:
+    1. path (str): The path of the lease file, or None to keep sessions in
+       memory.
+
+    Returns the registry.
+    """
+    global _sessions
+    if _sessions is not None:
+        _sessions.logout_all()
+    _sessions = SessionRegistry(path)
+    return _sessions
+
+
+def sessions():
+    """
+    Function to access the registry in use, keeping sessions in memory if
+    configure_sessions() has not been called.
+    """
+    if _sessions is None:
+        configure_sessions()
+    return _sessions
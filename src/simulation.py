@@ -0,0 +1,235 @@
+"""
+Module to simulate games between computer policies without any input or
+display, spread over a pool of processes. Each finished game is streamed to an
+optional results file as soon as its batch completes, so memory stays flat no
+matter how many games are played.
+
+Can be run from the command line:
+
+    python simulation.py <games> <policy 1> <policy 2> [workers] [output file]
+
+where a policy is "random", "greedy", "computer", or a comma-separated list of
+columns for a scripted policy (e.g. "4,4,3").
+"""
+
+
+# Standard Library Modules
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Local Modules
+from computer_player import ComputerPlayer, Position
+from game_state import GameState
+
+
+# Number of games a worker plays per task. Large enough that the cost of
+# sending a task to a worker is negligible, small enough to keep the results
+# of a task in memory.
+BATCH_SIZE = 500
+
+
+class RandomPolicy:
+    """Represents a policy that drops pieces in random legal columns."""
+    def choose(self, game, rng):
+        """Returns a random legal column (1-7) of the game."""
+        return rng.choice(game.legal_moves())
+
+
+class GreedyPolicy:
+    """
+    Represents a policy that takes an immediate win if there is one, blocks
+    the other player's immediate win otherwise, and plays randomly otherwise.
+    """
+    def choose(self, game, rng):
+        """Returns the chosen column (1-7) of the game."""
+        legal = game.legal_moves()
+        position = Position.from_moves(game.moves)
+        for column in legal:
+            if position.is_winning_move(column - 1):
+                return column
+        # Playing a null move gives the other player the turn.
+        opponent = Position(position.current ^ position.mask, position.mask)
+        for column in legal:
+            if opponent.is_winning_move(column - 1):
+                return column
+        return rng.choice(legal)
+
+
+class ScriptedPolicy:
+    """
+    Represents a policy that plays a fixed list of columns in order, falling
+    back on the leftmost legal column once the list is used up or when a
+    listed column is full.
+
+    Attributes:
+    1. columns (tuple): The columns (1-7) to play, in order.
+    """
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+
+    def choose(self, game, rng):
+        """Returns the chosen column (1-7) of the game."""
+        legal = game.legal_moves()
+        # The policy's own move number, whichever seat it plays.
+        turn = game.move_count // 2
+        if turn < len(self.columns) and self.columns[turn] in legal:
+            return self.columns[turn]
+        return legal[0]
+
+
+class ComputerPolicy:
+    """
+    Represents a policy played by a ComputerPlayer. Its moves only depend on
+    the position, so it should face a policy with some randomness for the
+    games to differ.
+
+    Attributes:
+    1. time_budget (float): The number of seconds allowed per move.
+    """
+    def __init__(self, time_budget=0.01):
+        self.time_budget = time_budget
+        self._computer = None
+
+    def choose(self, game, rng):
+        """Returns the chosen column (1-7) of the game."""
+        if self._computer is None:
+            self._computer = ComputerPlayer(time_budget=self.time_budget)
+        return self._computer.search(Position.from_moves(game.moves)) + 1
+
+
+def parse_policy(text):
+    """
+    Function to build a policy from its command-line name.
+
+    Args:
+    1. text (str): "random", "greedy", "computer", or a comma-separated list
+       of columns for a scripted policy.
+
+    Raises ValueError if the name is not recognised.
+
+    Returns the policy.
+    """
+    match text.lower():
+        case "random":
+            return RandomPolicy()
+        case "greedy":
+            return GreedyPolicy()
+        case "computer":
+            return ComputerPolicy()
+    columns = [int(column) for column in text.split(",")]
+    if not all(1 <= column <= 7 for column in columns):
+        raise ValueError(f"Unknown policy: {text}")
+    return ScriptedPolicy(columns)
+
+
+def play_game(policies, rng):
+    """
+    Function to play one game between two policies.
+
+    Args:
+    1. policies (list): The policies of player 1 and player 2.
+    2. rng (random.Random): The random number generator of the game.
+
+    Returns a tuple of the winning seat (1 or 2, 0 for a draw) and the number
+    of moves played.
+    """
+    game = GameState.new()
+    while not game.is_over:
+        game.play(policies[game.turn].choose(game, rng))
+    winner, _ = game.result()
+    return (0 if winner is None else int(winner.player)), game.move_count
+
+
+def play_batch(policies, seed, batch, count):
+    """
+    Function run by the workers, playing a batch of games. Each batch has its
+    own random number generator, seeded from the simulation seed and the batch
+    number, so that results do not depend on which worker plays which batch.
+
+    Args:
+    1. policies (list): The policies of player 1 and player 2.
+    2. seed (int): The seed of the simulation.
+    3. batch (int): The batch number.
+    4. count (int): The number of games to play.
+
+    Returns a list of (winning seat, moves played) tuples.
+    """
+    rng = random.Random(seed * 1_000_003 + batch)
+    return [play_game(policies, rng) for _ in range(count)]
+
+
+def run_simulation(games, policies, workers=None, seed=0, output=None):
+    """
+    Function to simulate games between two policies over a pool of processes.
+
+    Args:
+    1. games (int): The number of games to play.
+    2. policies (list): The policies of player 1 and player 2.
+    3. workers (int): The number of processes. Defaults to the number of CPUs.
+    4. seed (int): The seed of the simulation.
+    5. output (file): A text file to which each game is written as a
+       "winner,moves" line as its batch completes. None by default.
+
+    Raises ValueError if games is less than 1.
+
+    Returns a dictionary of aggregate results: games, p1_win_rate,
+    p2_win_rate, draw_rate, average_length, and games_per_second.
+    """
+    if games < 1:
+        raise ValueError(f"At least one game must be simulated, not {games}.")
+    workers = workers or os.cpu_count()
+    wins = [0, 0, 0]
+    total_moves = 0
+    start = time.perf_counter()
+    batches = iter(range(-(-games // BATCH_SIZE)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keeps two batches per worker in flight, so that finished batches are
+        # written out and dropped instead of piling up in memory.
+        pending = set()
+        while True:
+            for batch in batches:
+                pending.add(executor.submit(
+                    play_batch, policies, seed, batch,
+                    min(BATCH_SIZE, games - batch * BATCH_SIZE)
+                ))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for winner, moves in future.result():
+                    wins[winner] += 1
+                    total_moves += moves
+                    if output is not None:
+                        output.write(f"{winner},{moves}\n")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "p1_win_rate": wins[1] / games,
+        "p2_win_rate": wins[2] / games,
+        "draw_rate": wins[0] / games,
+        "average_length": total_moves / games,
+        "games_per_second": games / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(__doc__)
+        sys.exit(1)
+    policy_pair = [parse_policy(sys.argv[2]), parse_policy(sys.argv[3])]
+    worker_count = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    if len(sys.argv) > 5:
+        with open(sys.argv[5], "w", encoding="utf-8") as results_file:
+            results = run_simulation(
+                int(sys.argv[1]), policy_pair, worker_count, output=results_file
+            )
+    else:
+        results = run_simulation(int(sys.argv[1]), policy_pair, worker_count)
+    for name, value in results.items():
+        print(f"{name}: {value:,.3f}" if isinstance(value, float) else f"{name}: {value:,}")
@@ -5,15 +5,15 @@ store accounts, validate login to existing account, and use a guest account.
 """
 
 
-# Standard Library Modules
-import json
-
 #Third-party Library Modules
 from termcolor import colored
 import art
 from maskpass import askpass
 
 # Local Modules
+from leaderboards import update_leaderboards
+from sessions import sessions
+from user_store import new_user, repository
 from utilities import (
     clear_screen,
     validate_input,
@@ -49,8 +49,8 @@ def start_screen():
 def store_account(username, pin, color, piece_type):
     """
     Function to define how accounts are stored. Each account is stored as a 
-    dictionary with account details in the users.json file. The user.json file 
-    is a list with all the generated user dictionaries.
+    dictionary with account details in the user repository (by default the
+    users.json file, a list with all the generated user dictionaries).
 
     Args:
     1. username (str): The username to be stored in the user dictionary.
@@ -58,52 +58,37 @@ def store_account(username, pin, color, piece_type):
     3. color (str): The Piece color associated with the account.
     4. piece_type (str): The Piece type associated with the account.
     """
-    # Determines how a user dictionary is formatted.
-    user_data = {
-        "username": username,
-        "pin": pin,
-        "games_played": 0,
-        "wins": 0,
-        "losses": 0,
-        "win_ratio": float(0),
-        "color": color,
-        "piece_type": piece_type,
-        "logged_in": "y"
-    }
-    # Reads users.json, appends a user dictionary, and writes them to the file.
-    with open("users.json", "r", encoding="utf-8") as file:
-        users = json.load(file)
-    users.append(user_data)
-    with open("users.json", "w", encoding="utf-8") as file:
-        json.dump(users, file, indent=4)
+    user_data = new_user(username, pin, color, piece_type)
+    # Adds the user dictionary to the stored accounts, and to the high-score
+    # boards, then logs the new user in.
+    version = repository().version
+    repository().add(user_data)
+    update_leaderboards(user_data, version=version)
+    sessions().login(username)
 
     return user_data
 
 
 def validate_account(username, pin):
     """
-    Function to define how user login is validated. Accesses user.json to make
-    sure username and pin match with a user's record.
+    Function to define how user login is validated. Accesses the user
+    repository to make sure username and pin match with a user's record.
 
     Args:
     1. username (str): The username to be validated.
     2. pin (str): The pin to be validated.
     """
-    with open("users.json", "r", encoding="utf-8") as file:
-        users = json.load(file)
+    # Usernames are matched whatever their case.
+    user = repository().find(username)
     # Matches username and pin with user records.
-    for user in users:
-        if username == user.get("username") and pin == user.get("pin"):
-            # Invalidate login attempt when the associated user is currently
-            # logged in.
-            if user.get("logged_in") == "y":
-                return "Duplicate"
-            # When username and pin is validated, user is set to logged in.
-            user["logged_in"] = "y"
-            with open("users.json", "w", encoding="utf-8") as file:
-                json.dump(users, file, indent=4)
-
-            return user
+    if user is not None and pin == user.get("pin"):
+        # When username and pin is validated, user is set to logged in,
+        # unless the associated user is currently logged in. The stored
+        # account is left untouched.
+        if not sessions().login(user["username"]):
+            return "Duplicate"
+
+        return user
     # If username and pin combination is not found, invalidates login attempt.
     return None
 
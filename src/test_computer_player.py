@@ -0,0 +1,80 @@
+"""
+Module to test important methods from computer_player.py
+"""
+
+
+import pytest
+from computer_player import ComputerPlayer, Position
+from game_board import Board, BitBoard, Piece
+from game_engine import game_in_progress
+from win_conditions import VictoryChecker
+
+
+@pytest.mark.parametrize("moves, expected", [
+    # Player 1 to move, with 3 pieces in column 1: wins in column 1.
+    ([1, 2, 1, 2, 1, 2], 1),
+    # Player 2 to move, player 1 threatens column 5: blocks in column 5.
+    ([4, 1, 3, 1, 2], 5),
+])
+def test_choose_move_wins_or_blocks(moves, expected):
+    """
+    Tests that the computer takes an immediate win, and blocks the other
+    player's immediate win, on both kinds of boards.
+    """
+    for board_class in [Board, BitBoard]:
+        # Define required variables
+        player1 = Piece("Test1","red", "O", "1")
+        player2 = Piece("Test2","blue", "X", "2")
+        players = [player1, player2]
+        board = board_class(players)
+        for turn, column in enumerate(moves):
+            players[turn % 2].drop(board, column)
+
+        computer = ComputerPlayer(time_budget=0.05)
+
+        assert computer.choose_move(board) == expected
+        assert computer.last_search["nodes"] > 0
+
+
+def test_position_from_board_matches_from_moves():
+    """
+    Tests that a Position read from a board is the same as one built by
+    playing the moves.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = Board(players)
+    moves = [4, 4, 3, 5, 7, 1, 4]
+    for turn, column in enumerate(moves):
+        players[turn % 2].drop(board, column)
+
+    from_board = Position.from_board(board)
+    from_moves = Position.from_moves(moves)
+
+    assert from_board.key() == from_moves.key()
+    assert from_board.moves == from_moves.moves == 7
+
+
+def test_game_in_progress_against_computer(monkeypatch):
+    """
+    Tests that player 1 stacking in column 1 against the computer in player
+    2's seat never wins, since the computer blocks the column.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = Board(players)
+    referee = VictoryChecker(board, players)
+    computers = {1: ComputerPlayer(time_budget=0.02)}
+
+    # Player 1 keeps trying column 1, then surrenders once it is blocked.
+    input_sequence = iter(["1", "1", "1", "surrender"])
+    monkeypatch.setattr("builtins.input", lambda _: next(input_sequence))
+
+    # Main function
+    result = game_in_progress(board, players, referee, computers)
+
+    assert result == (player2, player1)
@@ -0,0 +1,98 @@
+"""
+Module to test important methods from game_board.py
+"""
+
+
+import pytest
+from termcolor import colored
+from game_board import Board, BitBoard, Piece, render_static_frame
+from custom_errors import ColumnFullError
+
+
+def test_bitboard_drop_matches_board():
+    """
+    Tests that dropping the same sequence of pieces onto a Board and a
+    BitBoard results in the same array and the same landing rows.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = Board(players)
+    bitboard = BitBoard(players)
+
+    # Sequence of columns, alternating between player 1 and player 2
+    columns = [4, 4, 3, 5, 4, 1, 7, 7, 7, 2, 4, 4]
+
+    for turn, column in enumerate(columns):
+        row = players[turn % 2].drop(board, column)
+        bit_row = players[turn % 2].drop(bitboard, column)
+        # Both boards should place the piece on the same row
+        assert row == bit_row
+
+    assert (board.array == bitboard.array).all()
+
+
+def test_bitboard_column_full():
+    """
+    Tests that a BitBoard refuses a piece dropped onto a full column.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    bitboard = BitBoard([player1, player2])
+
+    # Fills column 1
+    for _ in range(3):
+        player1.drop(bitboard, 1)
+        player2.drop(bitboard, 1)
+
+    with pytest.raises(ColumnFullError):
+        player1.drop(bitboard, 1)
+
+
+def test_bitboard_array_setter_and_clear():
+    """
+    Tests that assigning an array to a BitBoard rebuilds its bitboards, and
+    that clearing the board empties it.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = Board(players)
+    bitboard = BitBoard(players)
+
+    for column in [1, 2, 2, 3, 3, 4, 3]:
+        player1.drop(board, column)
+        player1, player2 = player2, player1
+
+    bitboard.array = board.array
+    assert (bitboard.array == board.array).all()
+    assert bitboard.heights == (1, 2, 3, 1, 0, 0, 0)
+
+    bitboard.clear_board()
+    assert (bitboard.array == "0").all()
+
+
+def test_render_static_frame_cached_until_piece_changes():
+    """
+    Tests that redrawing the board reuses the cached static frame, and that
+    changing a piece's color renders the new color.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    board = BitBoard([player1, player2])
+    render_static_frame.cache_clear()
+
+    board.render()
+    player1.drop(board, 4)
+    frame = board.render()
+    assert render_static_frame.cache_info().hits == 1
+    assert colored("O", "red") in frame
+
+    player1.color = "green"
+    frame = board.render()
+    assert render_static_frame.cache_info().misses == 2
+    assert colored("O", "green") in frame
@@ -0,0 +1,128 @@
+"""
+Module to test important methods from game_records.py
+"""
+
+
+from game_board import Board, BitBoard, Piece
+from game_engine import game_in_progress
+from game_records import (
+    RECORD_HEADER,
+    GameArchive,
+    GameRecord,
+    pack_moves,
+    unpack_moves
+)
+from game_state import GameState
+from win_conditions import VictoryChecker
+
+
+def test_pack_moves_3_bits_each():
+    """
+    Tests that moves are packed into 3 bits each and unpacked unchanged.
+    """
+    moves = (4, 4, 0, 7, 1, 3, 2, 5)
+
+    packed = pack_moves(moves)
+
+    assert len(packed) == 3
+    assert unpack_moves(packed, len(moves)) == moves
+
+
+def test_archive_round_trip_and_replay(tmp_path):
+    """
+    Tests that finished games are read back from an archive as they were
+    recorded, and replay onto a board, in full or up to a given ply.
+    """
+    archive = GameArchive(tmp_path / "games.bin")
+    first = GameState.new()
+    for column in [4, 4, 3, 0, 1, 2, 1, 2, 1, 2, 1]:
+        if column == 0:
+            first.clear()
+        else:
+            first.play(column)
+    second = GameState.new()
+    second.play(5)
+    second.surrender(second.current_player)
+
+    archive.append(GameRecord.from_game(first, 100, 160))
+    archive.append(GameRecord.from_game(second, 200, 230))
+    records = list(archive)
+
+    assert [record.winner for record in records] == [1, 1]
+    assert [record.surrendered for record in records] == [False, True]
+    assert records[0].moves == (4, 4, 3, 0, 1, 2, 1, 2, 1, 2, 1)
+    assert (records[0].started, records[0].ended) == (100, 160)
+    assert records[0].players == ("Player1", "Player2")
+
+    board = records[0].replay(BitBoard(first.players))
+    assert (board.array == first.board.array).all()
+    board = records[0].replay(Board(first.players), ply=3)
+    assert board.slot(5, 3) == "1" and board.slot(4, 4) == "2"
+
+
+def test_archive_stops_at_torn_record(tmp_path):
+    """
+    Tests that a record cut short at the end of an archive is left out,
+    whether its names or its moves are missing.
+    """
+    path = tmp_path / "games.bin"
+    archive = GameArchive(path)
+    game = GameState.new()
+    for column in [1, 2, 1, 2, 1, 2, 1]:
+        game.play(column)
+    archive.append(GameRecord.from_game(game, 100, 160))
+    whole = path.read_bytes()
+    archive.append(GameRecord.from_game(game, 200, 260))
+
+    content = path.read_bytes()
+    for cut in (len(whole) + RECORD_HEADER.size + 3, len(content) - 1):
+        (tmp_path / "torn.bin").write_bytes(content[:cut])
+        records = list(GameArchive(tmp_path / "torn.bin"))
+        assert [record.started for record in records] == [100]
+
+
+def test_archive_appends_after_torn_record(tmp_path):
+    """
+    Tests that a record cut short at the end of an archive is cut off before
+    new records are added, so that they can be read.
+    """
+    path = tmp_path / "games.bin"
+    archive = GameArchive(path)
+    game = GameState.new()
+    for column in [1, 2, 1, 2, 1, 2, 1]:
+        game.play(column)
+    archive.append(GameRecord.from_game(game, 100, 160))
+    whole = path.read_bytes()
+    archive.append(GameRecord.from_game(game, 200, 260))
+
+    content = path.read_bytes()
+    for cut in (len(whole) + 5, len(whole) + RECORD_HEADER.size + 3,
+                len(content) - 1):
+        path.write_bytes(content[:cut])
+        archive = GameArchive(path)
+        archive.append(GameRecord.from_game(game, 300, 360))
+        archive.append(GameRecord.from_game(game, 400, 460))
+        assert [record.started for record in archive] == [100, 300, 400]
+
+
+def test_game_in_progress_records_game(monkeypatch, tmp_path):
+    """
+    Tests that game_in_progress records the finished game in the archive.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = Board(players)
+    referee = VictoryChecker(board, players)
+    archive = GameArchive(tmp_path / "games.bin")
+
+    input_sequence = iter(["1", "2", "1", "2", "1", "2", "1"])
+    monkeypatch.setattr("builtins.input", lambda _: next(input_sequence))
+
+    game_in_progress(board, players, referee, archive=archive)
+
+    (record,) = list(archive)
+    assert record.players == ("Test1", "Test2")
+    assert record.winner == 1
+    assert record.moves == (1, 2, 1, 2, 1, 2, 1)
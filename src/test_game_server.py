@@ -0,0 +1,343 @@
+"""
+Module to test the GameServer class from game_server.py
+"""
+
+
+import asyncio
+import json
+import threading
+
+import game_server
+import pytest
+from conftest import stored_user
+from game_records import GameArchive
+from game_server import GameServer, Player, SpectatorFeed
+from sessions import sessions
+from user_store import configure_repository
+from user_utils import User
+
+
+async def connect(port):
+    """Returns the streams of a new connection to a server on localhost."""
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+async def send(streams, line):
+    """Sends a line to the server, and returns the next line received."""
+    streams[1].write(f"{line}\n".encode("utf-8"))
+    return await receive(streams)
+
+
+async def receive(streams):
+    """Returns the next line received from the server."""
+    return (await streams[0].readline()).decode("utf-8").strip()
+
+
+async def play(server, moves, logins=()):
+    """
+    Starts a server, seats two players at a table, and plays a list of
+    commands, each sent by the player to move. Returns the lines each player
+    received after the game started.
+    """
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    players = [await connect(port), await connect(port)]
+    for streams, login in zip(players, logins):
+        assert await send(streams, f"LOGIN {login}") == (
+            f"OK LOGIN {login.split()[0]}"
+        )
+    assert await send(players[0], "JOIN") == "OK JOIN waiting"
+    await send(players[1], "JOIN")
+    await receive(players[0])
+    assert len(server.tables) == 1
+
+    received = [[], []]
+    for seat, command in moves:
+        players[seat][1].write(f"{command}\n".encode("utf-8"))
+        for streams, lines in zip(players, received):
+            lines.append(await receive(streams))
+    # Each player quits, and the lines left are read up to the reply.
+    for streams, lines in zip(players, received):
+        lines.append(await send(streams, "QUIT"))
+        while lines[-1] != "OK QUIT":
+            lines.append(await receive(streams))
+        streams[1].close()
+    listener.close()
+    await listener.wait_closed()
+    return received
+
+
+def test_guests_play_to_a_win(tmp_path):
+    """
+    Tests that moves are announced to both players, and that the finished
+    game is announced, archived and its table freed.
+    """
+    archive = GameArchive(tmp_path / "games.bin")
+    server = GameServer(archive)
+    moves = [(0, "DROP 1"), (1, "DROP 2")] * 3 + [(0, "DROP 1")]
+    received = asyncio.run(play(server, moves))
+
+    assert received[0][:2] == ["MOVE 1 1 5", "MOVE 2 2 5"]
+    assert received[1][-3:] == ["MOVE 1 1 2", "OVER 1 0", "OK QUIT"]
+    assert not server.tables
+    (record,) = list(archive)
+    assert record.players == ("Guest1", "Guest2")
+    assert record.moves == (1, 2, 1, 2, 1, 2, 1)
+
+
+def test_turns_and_errors():
+    """
+    Tests that commands out of turn and invalid columns are refused, and that
+    clearing the board gives the first move back to player 1.
+    """
+    async def session():
+        server = GameServer()
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        first, second = await connect(port), await connect(port)
+        assert await send(first, "HELLO") == "ERR Unknown command: HELLO"
+        assert await send(first, "DROP 1") == "ERR Not at a table."
+        await send(first, "JOIN")
+        assert await send(second, "JOIN") == "START 1 2 Guest"
+        assert await receive(first) == "START 1 1 Guest"
+        assert await send(first, "JOIN") == "ERR Already at a table."
+        assert await send(second, "DROP 1") == "ERR Not your turn."
+        assert await send(first, "DROP 8") == (
+            "ERR Invalid column, please try again"
+        )
+        assert await send(first, "DROP 3") == "MOVE 1 3 5"
+        assert await receive(second) == "MOVE 1 3 5"
+        assert await send(second, "CLEAR") == "CLEARED 2"
+        assert await receive(first) == "CLEARED 2"
+        assert await send(first, "QUIT") == "OVER 2 1"
+        assert await receive(first) == "OK QUIT"
+        assert await receive(second) == "OVER 2 1"
+        second[1].close()
+        listener.close()
+        await listener.wait_closed()
+        return server
+
+    assert not asyncio.run(session()).tables
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def users_store(request, tmp_path):
+    """
+    Provides the backend and path of a users file of each backend holding
+    two users, as the repository in use, and configures the default
+    repository again once the test is done.
+    """
+    users = [stored_user(username) for username in ("tester001", "tester002")]
+    if request.param == "sqlite":
+        path = tmp_path / "users.db"
+        repository = configure_repository("sqlite", path)
+        for user in users:
+            repository.add(user)
+    else:
+        path = tmp_path / "users.json"
+        path.write_text(json.dumps(users), encoding="utf-8")
+        configure_repository("json", path)
+    yield request.param, path
+    configure_repository()
+
+
+def test_accounts_record_surrender(users_store):
+    """
+    Tests that logged in players have the result of a surrender recorded in
+    their stats, and are logged out when they leave, without their stored
+    accounts being changed by logging in or out.
+    """
+    received = asyncio.run(play(
+        GameServer(), [(1, "SURRENDER")],
+        ["tester001 1234", "tester002 1234"]
+    ))
+    assert received == [["OVER 1 2", "OK QUIT"]] * 2
+
+    users = configure_repository(*users_store).all()
+    assert [user["wins"] for user in users] == [1, 0]
+    assert [user["losses"] for user in users] == [0, 1]
+    assert all("logged_in" not in user for user in users)
+    assert not sessions().is_logged_in("tester001")
+    assert not sessions().is_logged_in("tester002")
+
+
+def test_spectators_get_snapshot_then_moves():
+    """
+    Tests that a spectator gets a snapshot of the game they watch, then the
+    lines of every change to it, until it is over.
+    """
+    async def session():
+        server = GameServer()
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        first, second = await connect(port), await connect(port)
+        spectator = await connect(port)
+        assert await send(spectator, "WATCH 1") == "ERR No game at table 1."
+        await send(first, "JOIN")
+        await send(second, "JOIN")
+        await receive(first)
+        await send(first, "DROP 4")
+        await receive(second)
+        await send(second, "DROP 4")
+        await receive(first)
+
+        assert await send(spectator, "TABLES") == "OK TABLES 1"
+        assert await send(spectator, "WATCH 1") == "OK WATCH 1"
+        assert await receive(spectator) == "SNAPSHOT 1 Guest Guest 1 44"
+        await send(first, "DROP 3")
+        assert await receive(spectator) == "MOVE 1 3 5"
+        await send(second, "SURRENDER")
+        assert await receive(spectator) == "OVER 1 2"
+        assert await send(spectator, "UNWATCH") == "ERR Not watching a game."
+        for streams in (first, second, spectator):
+            streams[1].close()
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(session())
+
+
+class StalledWriter:
+    """Represents the stream to a spectator who takes no lines until told."""
+    def __init__(self):
+        self.transport = self
+        self.data = b""
+        self.released = asyncio.Event()
+        self.limits = (16384, 65536)
+
+    def get_write_buffer_limits(self):
+        """Returns the buffer limits (low, high)."""
+        return self.limits
+
+    def set_write_buffer_limits(self, high, low=None):
+        """Keeps the buffer limits set by the feed."""
+        self.limits = (high // 4 if low is None else low, high)
+
+    def get_extra_info(self, name):
+        """Returns no socket for the feed to set buffer sizes on."""
+
+    def write(self, data):
+        """Keeps the data written."""
+        self.data += data
+
+    async def drain(self):
+        """Waits until the spectator is released."""
+        await self.released.wait()
+
+
+def test_slow_spectator_drops_to_snapshot():
+    """
+    Tests that a spectator falling too far behind has the lines waiting
+    replaced by a snapshot, without holding up the lines queued.
+    """
+    async def session():
+        writer = StalledWriter()
+        feed = SpectatorFeed(writer)
+        feed.push("MOVE 1 1 5", None)
+        await asyncio.sleep(0)
+        for _ in range(SpectatorFeed.QUEUE_SIZE):
+            feed.push("MOVE 2 2 5", None)
+        feed.push("MOVE 1 3 5", lambda: "SNAPSHOT 1 Guest Guest 2 -")
+        writer.released.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        feed.close()
+        return writer.data.decode("utf-8"), feed.snapshots
+
+    assert asyncio.run(session()) == (
+        "MOVE 1 1 5\nSNAPSHOT 1 Guest Guest 2 -\n", 1
+    )
+
+
+def test_results_recorded_off_event_loop(monkeypatch, tmp_path):
+    """
+    Tests that results are recorded in a worker thread, not in the thread
+    running the event loop.
+    """
+    threads = []
+    monkeypatch.setattr(
+        game_server, "record_result",
+        lambda *args, **kwargs: threads.append(threading.get_ident())
+    )
+    asyncio.run(play(
+        GameServer(GameArchive(tmp_path / "games.bin")), [(0, "SURRENDER")]
+    ))
+    assert len(threads) == 1
+    assert threads[0] != threading.get_ident()
+
+
+def test_new_accounts_rated_as_guests():
+    """
+    Tests that accounts with no games played are rated in the middle, as
+    guests are, and other accounts by their win ratio.
+    """
+    player = Player(None)
+    assert player.rating == 50.0
+    player.account = {"username": "tester001"}
+    player.user = User("tester001", 0, 0, 0, 0.0)
+    assert player.rating == 50.0
+    player.user = User("tester001", 4, 1, 3, 25.0)
+    assert player.rating == 25.0
+
+
+def test_unwatch_drops_lines_waiting():
+    """
+    Tests that a spectator who stops watching gets none of the lines still
+    waiting, and that the stream's buffer limits are only capped while a game
+    is watched.
+    """
+    async def session():
+        writer = StalledWriter()
+        feed = SpectatorFeed(writer)
+        feed.start()
+        limits = writer.limits
+        feed.push("MOVE 1 1 5", None)
+        await asyncio.sleep(0)
+        feed.push("MOVE 2 2 5", None)
+        feed.reset()
+        writer.released.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        feed.close()
+        return writer.data.decode("utf-8"), limits, writer.limits
+
+    assert asyncio.run(session()) == (
+        "MOVE 1 1 5\n", (1024, 4096), (16384, 65536)
+    )
+
+
+@pytest.mark.parametrize("data, reply", [
+    (b"TABLES \xff\n", "ERR Lines must be UTF-8 text."),
+    (b"A" * (1 << 17) + b"\n", "ERR Line too long."),
+], ids=["not_utf8", "too_long"])
+def test_unreadable_lines_close_connection(data, reply):
+    """
+    Tests that a line that is not UTF-8 text, or is too long, is answered
+    with an error before the connection is closed, without the connection's
+    task failing.
+    """
+    async def session():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        server = GameServer()
+        handled = asyncio.Event()
+
+        async def handle(reader, writer):
+            try:
+                await server.handle(reader, writer)
+            finally:
+                handled.set()
+
+        listener = await asyncio.start_server(handle, "127.0.0.1", 0)
+        streams = await connect(listener.sockets[0].getsockname()[1])
+        streams[1].write(data)
+        lines = [await receive(streams), await streams[0].read()]
+        streams[1].close()
+        await handled.wait()
+        listener.close()
+        await listener.wait_closed()
+        return lines, errors
+
+    assert asyncio.run(session()) == ([reply, b""], [])
@@ -0,0 +1,76 @@
+"""
+Module to test important methods from game_state.py
+"""
+
+
+import pytest
+from game_state import GameState
+from custom_errors import ColumnFullError, GameOverError
+
+
+def test_play_until_vertical_victory():
+    """
+    Tests that playing alternately in columns 1 and 2 gives player 1 a
+    vertical victory, after which no more moves are accepted.
+    """
+    game = GameState.new()
+
+    for column in [1, 2, 1, 2, 1, 2]:
+        game.play(column)
+        assert game.result() is None
+    game.play(1)
+
+    assert game.result() == (game.players[0], None)
+    assert game.legal_moves() == []
+    with pytest.raises(GameOverError):
+        game.play(3)
+
+
+def test_play_until_draw():
+    """
+    Tests that filling the board without a line of 4 results in a draw.
+    """
+    game = GameState.new()
+    listing = (
+        [1, 2] * 3 + [2, 1] * 3 + [3, 4] * 3 + [4, 3] * 3
+        + [5, 6] * 3 + [6, 5] * 3 + [7] * 6
+    )
+
+    for column in listing:
+        game.play(column)
+
+    assert game.result() == (None, None)
+    assert game.move_count == 42
+
+
+def test_clear_and_full_column():
+    """
+    Tests that a full column is refused and left out of the legal moves, and
+    that clearing the board gives the first turn back to player 1.
+    """
+    game = GameState.new()
+    for _ in range(6):
+        game.play(4)
+
+    assert game.legal_moves() == [1, 2, 3, 5, 6, 7]
+    with pytest.raises(ColumnFullError):
+        game.play(4)
+
+    game.play(1)
+    assert game.turn == 1
+    game.clear()
+    assert game.turn == 0
+    assert game.moves == ()
+    assert game.legal_moves() == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_surrender():
+    """
+    Tests that a surrender gives victory to the other player.
+    """
+    game = GameState.new()
+    game.play(4)
+
+    game.surrender(game.current_player)
+
+    assert game.result() == (game.players[0], game.players[1])
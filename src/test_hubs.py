@@ -111,6 +111,93 @@ def test_player_lounge_enter_check_user_info_exit(monkeypatch):
     assert captured_print[1:-1] == expected_print
 
 
+def test_player_lounge_enter_check_ranking_exit(monkeypatch):
+    """
+    Tests the following sequence: enter player lounge, checks rankings, type
+    in "tester321" as username, exits rankings, and exits player lounge.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", 1)
+    player2 = Piece("Test2","blue", "X", 2)
+    players = [player1, player2]
+    users_record = generate_users_record()
+    lounge = PlayerLounge(users_record)
+
+    # Print commands that will be captured
+    captured_print = []
+    # Expected print commands if test is successful
+    expected_print = [
+        "tester321's rankings:",
+        "wins: 1, rank 2 of 3, ahead of 33.33% of users",
+        "games_played: 2, rank 2 of 3, ahead of 33.33% of users",
+        "win_ratio: 75.0, rank 1 of 3, ahead of 66.67% of users",
+    ]
+
+    # Sequence of user input to achieve the desired sequence of commands
+    input_sequence = iter([" ", "ranking", "tester321", "exit", "exit", "y"])
+
+    # Mock print function to catch print commands and append to
+    # captured_print
+    def mock_print(*args):
+        output = " ".join(map(str, args))
+        captured_print.append(output)
+
+    # Replaces default print function to mock_print
+    monkeypatch.setattr("builtins.print", mock_print)
+    # Replaces default input function to enter input_sequence in sequence
+    monkeypatch.setattr("builtins.input", lambda _: next(input_sequence))
+
+    # Main function
+    result = lounge.enter(players)
+
+    # Function should return and print the following
+    assert result == "lobby"
+    assert captured_print[1:-1] == expected_print
+
+
+def test_player_lounge_enter_browse_mixed_case_exit(monkeypatch):
+    """
+    Tests the following sequence: enter player lounge, browse the
+    leaderboards typing "WIN_Ratio 2", exits browsing, and exits player
+    lounge.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", 1)
+    player2 = Piece("Test2","blue", "X", 2)
+    players = [player1, player2]
+    lounge = PlayerLounge(generate_users_record())
+
+    # Print commands that will be captured
+    captured_print = []
+    # Expected print commands if test is successful
+    expected_print = [
+        "Most win_ratio, ranks 2 - 3:\n",
+        "2. tester123: 60.0",
+        "3. tester009: 0.0",
+    ]
+
+    # Sequence of user input to achieve the desired sequence of commands
+    input_sequence = iter([" ", "browse", "WIN_Ratio 2", "exit", "exit", "y"])
+
+    # Mock print function to catch print commands and append to
+    # captured_print
+    def mock_print(*args):
+        output = " ".join(map(str, args))
+        captured_print.append(output)
+
+    # Replaces default print function to mock_print
+    monkeypatch.setattr("builtins.print", mock_print)
+    # Replaces default input function to enter input_sequence in sequence
+    monkeypatch.setattr("builtins.input", lambda _: next(input_sequence))
+
+    # Main function
+    result = lounge.enter(players)
+
+    # Function should return and print the following
+    assert result == "lobby"
+    assert captured_print[1:-1] == expected_print
+
+
 def test_main_lobby_to_lounge(monkeypatch):
     """
     Tests the following sequence: enter main lobby, enter player lounge from
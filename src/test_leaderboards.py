@@ -0,0 +1,150 @@
+"""
+Module to test important classes and functions from leaderboards.py
+"""
+
+
+import json
+import random
+
+from conftest import game_record, stored_user
+from leaderboards import Leaderboard, Leaderboards, leaderboards
+from user_store import CachedJsonUserRepository, configure_repository
+from user_utils import User, record_result
+
+
+def test_leaderboards_top_and_rank():
+    """
+    Tests that the leaderboards list the highest scorers and ranks users, with
+    users on the same score in creation order, and follow updated records.
+    """
+    boards = Leaderboards([
+        game_record("tester001", 5, 2, 1),
+        game_record("tester002", 2, 1, 0),
+        game_record("tester003", 0, 0, 0),
+        game_record("tester004", 4, 2, 2),
+    ])
+
+    assert [user["username"] for user in boards.top("wins", 3)] == [
+        "tester001", "tester004", "tester002"
+    ]
+    assert boards.rank("games_played", "tester002") == 3
+    assert boards.rank("games_played", "tester005") is None
+
+    boards.update(game_record("tester003", 6, 6, 0))
+    boards.update(game_record("tester005", 0, 0, 0))
+    assert boards.top("win_ratio", 1)[0]["username"] == "tester003"
+    assert boards.rank("wins", "tester003") == 1
+    assert boards.rank("wins", "tester005") == 5
+    assert len(boards.top("wins", 10)) == 5
+
+
+def test_leaderboard_matches_sorting():
+    """
+    Tests that a leaderboard split over many blocks agrees with a full sort
+    after random score changes.
+    """
+    class SmallBlocks(Leaderboard):
+        BLOCK_SIZE = 4
+
+    rng = random.Random(7)
+    scores = {f"user{index}": rng.randrange(20) for index in range(200)}
+    board = SmallBlocks(
+        (username, score, index)
+        for index, (username, score) in enumerate(scores.items())
+    )
+    order = list(scores)
+    for _ in range(1000):
+        username = rng.choice(order)
+        scores[username] = rng.randrange(20)
+        board.update(username, scores[username], order.index(username))
+
+    expected = sorted(order, key=lambda name: -scores[name])
+    assert board.top(len(expected)) == expected
+    for rank, username in enumerate(expected, 1):
+        assert board.rank(username) == rank
+
+
+def test_leaderboard_pages_and_percentiles():
+    """
+    Tests that pages of a leaderboard split over many blocks list the right
+    ranks, and that percentiles count the users with a lower score.
+    """
+    class SmallBlocks(Leaderboard):
+        BLOCK_SIZE = 3
+
+    board = SmallBlocks(
+        (f"user{index}", index // 2, index) for index in range(50)
+    )
+    board.update("user0", 100, 0)
+
+    assert board.page(1, 3) == ["user0", "user48", "user49"]
+    assert board.page(20, 4) == ["user30", "user31", "user28", "user29"]
+    assert board.page(49, 5) == ["user3", "user1"]
+    assert board.page(51, 5) == []
+    assert board.count_below(24) == 47
+    assert board.count_below(0) == 0
+
+    boards = Leaderboards([game_record("tester001", 4, 2, 0),
+                           game_record("tester002", 4, 1, 0),
+                           game_record("tester003", 4, 1, 0)])
+    assert boards.percentile("wins", "tester001") == 66.67
+    assert boards.percentile("wins", "tester003") == 0.0
+    assert boards.page("wins", 2, 5) == [
+        (2, game_record("tester002", 4, 1, 0)),
+        (3, game_record("tester003", 4, 1, 0))
+    ]
+
+
+def test_leaderboards_follow_other_programs(tmp_path):
+    """
+    Tests that the leaderboards in use show games recorded in the users file
+    by another program.
+    """
+    path = tmp_path / "users.json"
+    users = [stored_user(username) for username in ("tester001", "tester002")]
+    path.write_text(json.dumps(users), encoding="utf-8")
+    configure_repository("json", path)
+    try:
+        assert leaderboards().top("wins", 1)[0]["username"] == "tester001"
+        other = CachedJsonUserRepository(path, flush_interval=None)
+        other.record_game(["tester001", "tester002"], "tester002")
+        other.close()
+        assert leaderboards().top("wins", 1)[0]["username"] == "tester002"
+        assert leaderboards().get("tester001")["losses"] == 1
+    finally:
+        configure_repository()
+
+
+def test_local_games_do_not_refresh_leaderboards(tmp_path, monkeypatch):
+    """
+    Tests that games recorded by this program update the leaderboards in use
+    without them being refreshed from the repository, while a game recorded
+    by another program before them still shows.
+    """
+    path = tmp_path / "users.json"
+    users = [stored_user(username) for username in ("tester001", "tester002")]
+    path.write_text(json.dumps(users), encoding="utf-8")
+    configure_repository("json", path)
+    refreshed = []
+    refresh = Leaderboards.refresh
+    monkeypatch.setattr(
+        Leaderboards, "refresh",
+        lambda self, records: refreshed.append(True) or refresh(self, records)
+    )
+    try:
+        leaderboards()
+        players = [User(username, 0, 0, 0, 0.0)
+                   for username in ("tester001", "tester002")]
+        record_result(players[1], players[0])
+        assert leaderboards().get("tester002")["wins"] == 1
+        assert not refreshed
+
+        other = CachedJsonUserRepository(path, flush_interval=None)
+        other.record_game(["tester001", "tester002"], "tester001")
+        other.close()
+        record_result(players[1], players[0])
+        assert leaderboards().get("tester001")["wins"] == 1
+        assert leaderboards().get("tester002")["wins"] == 2
+        assert refreshed == [True]
+    finally:
+        configure_repository()
@@ -0,0 +1,59 @@
+"""
+Module to test the MatchmakingQueue class from matchmaking.py
+"""
+
+
+import pytest
+from matchmaking import MatchmakingQueue
+
+
+def test_pair_same_bucket_oldest_first():
+    """
+    Tests that players with close ratings are paired in the order they
+    joined, and that a player left alone keeps waiting.
+    """
+    queue = MatchmakingQueue()
+    for now, (player, rating) in enumerate(
+            [("a", 50.0), ("b", 90.0), ("c", 51.0), ("d", 50.5), ("e", 51.5)]
+    ):
+        queue.enqueue(player, rating, now)
+
+    assert queue.pair(now=5) == [("a", "c"), ("d", "e")]
+    assert len(queue) == 1 and "b" in queue
+
+
+def test_pair_gap_widens_with_waiting():
+    """
+    Tests that players across buckets are paired with the closest player
+    within the gap either of them accepts, which widens as they wait.
+    """
+    queue = MatchmakingQueue(base_gap=5.0, widening=1.0)
+    queue.enqueue("a", 40.0, now=0)
+    queue.enqueue("b", 60.0, now=0)
+    queue.enqueue("c", 44.0, now=10)
+
+    assert queue.pair(now=10) == [("a", "c")]
+    assert queue.gap("b", now=10) == 15.0
+    queue.enqueue("d", 80.0, now=12)
+    assert queue.pair(now=12) == []
+    assert queue.pair(now=15) == [("b", "d")]
+    assert not queue
+
+
+def test_remove_and_enqueue_twice():
+    """
+    Tests that players who leave are not paired, and that a player cannot
+    wait twice.
+    """
+    queue = MatchmakingQueue()
+    queue.enqueue("a", 50.0, now=0)
+    with pytest.raises(ValueError):
+        queue.enqueue("a", 50.0, now=0)
+    queue.enqueue("b", 50.0, now=1)
+    queue.remove("a")
+    queue.remove("a")
+    queue.enqueue("c", 50.0, now=2)
+    queue.enqueue("a", 50.0, now=3)
+
+    assert queue.pair(now=3) == [("b", "c")]
+    assert len(queue) == 1 and "a" in queue
@@ -0,0 +1,44 @@
+"""
+Module to test important functions from opening_book.py
+"""
+
+
+from computer_player import ComputerPlayer, Position
+from opening_book import generate_book, load_book
+
+
+def test_opening_book_lookup(tmp_path):
+    """
+    Tests that a generated book finds its positions, mirror images included,
+    and that positions deeper than the book are not found.
+    """
+    path = tmp_path / "book.bin"
+    count = generate_book(path, plies=3, time_budget=0.005)
+    book = load_book(path)
+
+    # 1 empty board, 4 first moves and (49 + 1) / 2 second moves once mirror
+    # images are folded together.
+    assert len(book) == count == 1 + 4 + 25
+    assert book.lookup(Position()) is not None
+    for moves in ([1], [2, 5], [3, 3]):
+        column, score = book.lookup(Position.from_moves(moves))
+        mirror_column, mirror_score = book.lookup(
+            Position.from_moves([8 - move for move in moves])
+        )
+        assert mirror_column == 8 - column
+        assert mirror_score == score
+    assert book.lookup(Position.from_moves([1, 2, 3])) is None
+
+    # The computer plays from the book without searching.
+    computer = ComputerPlayer(book=book)
+    column = computer.search(Position.from_moves([1])) + 1
+    assert computer.last_search["book"] is True
+    assert column == book.lookup(Position.from_moves([1]))[0]
+    book.close()
+
+
+def test_load_book_missing(tmp_path):
+    """
+    Tests that there is no book when the file does not exist.
+    """
+    assert load_book(tmp_path / "missing.bin") is None
@@ -0,0 +1,55 @@
+"""
+Module to test important methods from screen.py
+"""
+
+
+import io
+import os
+
+from screen import Screen, CLEAR_SCREEN, move_to
+
+
+class FakeTerminal(io.StringIO):
+    """A text stream that reports itself as an interactive terminal."""
+    def isatty(self):
+        return True
+
+
+def test_draw_not_terminal():
+    """
+    Tests that a screen writing to a file neither clears nor moves the cursor,
+    and writes each frame in full.
+    """
+    stream = io.StringIO()
+    screen = Screen(stream)
+
+    screen.clear()
+    screen.draw("a\nb")
+    screen.draw("a\nc")
+
+    assert stream.getvalue() == "a\nb\na\nc\n"
+
+
+def test_draw_terminal_repaints_changed_lines(monkeypatch):
+    """
+    Tests that a screen repaints the whole terminal after being cleared, and
+    only rewrites the lines that changed on the next draw.
+    """
+    monkeypatch.setattr(
+        "shutil.get_terminal_size", lambda: os.terminal_size((80, 24))
+    )
+    stream = FakeTerminal()
+    screen = Screen(stream)
+
+    screen.clear()
+    screen.draw("line 1\nline 2\nline 3")
+    assert CLEAR_SCREEN in stream.getvalue()
+
+    stream.truncate(0)
+    stream.seek(0)
+    screen.draw("line 1\nline two\nline 3")
+    output = stream.getvalue()
+
+    assert CLEAR_SCREEN not in output
+    assert move_to(2) + "line two" in output
+    assert "line 1" not in output and "line 3" not in output
@@ -0,0 +1,67 @@
+"""
+Module to test the SessionRegistry class from sessions.py
+"""
+
+
+import pytest
+import sessions
+from sessions import SessionRegistry
+
+
+@pytest.fixture(params=["memory", "lease_file"])
+def registry(request, tmp_path):
+    """Provides a registry keeping sessions in memory, or in a lease file."""
+    if request.param == "memory":
+        return SessionRegistry()
+    return SessionRegistry(tmp_path / "sessions.json")
+
+
+def test_login_logout(registry):
+    """
+    Tests that a user cannot be logged in twice, whatever the case of their
+    username, until they log out.
+    """
+    assert registry.login("tester001") is True
+    assert registry.login("TESTER001") is False
+    assert registry.is_logged_in("Tester001")
+    assert registry.logout("tester001") is True
+    assert registry.logout("tester001") is False
+    assert registry.login("tester001") is True
+
+    registry.login("tester002")
+    assert registry.logout_all() == 2
+    assert not registry.is_logged_in("tester002")
+
+
+def test_lease_file_shared(tmp_path):
+    """
+    Tests that processes sharing a lease file see each other's sessions, and
+    only log out their own.
+    """
+    path = tmp_path / "sessions.json"
+    first, second = SessionRegistry(path), SessionRegistry(path)
+    first.login("tester001")
+    assert second.login("tester001") is False
+    second.login("tester002")
+
+    assert first.logout_all() == 1
+    assert first.is_logged_in("tester002")
+    assert second.login("tester001") is True
+
+
+def test_leases_expire(tmp_path, monkeypatch):
+    """
+    Tests that leases end once they expire, or once the process holding them
+    is gone.
+    """
+    now = [1000.0]
+    registry = SessionRegistry(
+        tmp_path / "sessions.json", lease_seconds=60, clock=lambda: now[0]
+    )
+    registry.login("tester001")
+    now[0] += 61
+    assert not registry.is_logged_in("tester001")
+    assert registry.login("tester001") is True
+
+    monkeypatch.setattr(sessions, "process_alive", lambda pid: False)
+    assert registry.login("tester001") is True
@@ -0,0 +1,62 @@
+"""
+Module to test important functions from simulation.py
+"""
+
+
+import io
+
+import pytest
+from simulation import (
+    GreedyPolicy,
+    RandomPolicy,
+    ScriptedPolicy,
+    parse_policy,
+    run_simulation
+)
+
+
+def test_run_simulation_scripted_vertical_victory():
+    """
+    Tests that a scripted policy stacking column 1 always beats a scripted
+    policy stacking column 2, and that every game is streamed to the output.
+    """
+    output = io.StringIO()
+    policies = [ScriptedPolicy([1] * 4), ScriptedPolicy([2] * 4)]
+
+    results = run_simulation(10, policies, workers=1, output=output)
+
+    assert results["p1_win_rate"] == 1.0
+    assert results["average_length"] == 7
+    assert output.getvalue() == "1,7\n" * 10
+
+
+def test_run_simulation_is_seeded():
+    """
+    Tests that the same seed gives the same results whatever the number of
+    workers, and that greedy play beats random play.
+    """
+    policies = [RandomPolicy(), GreedyPolicy()]
+
+    first = run_simulation(600, policies, workers=1, seed=3)
+    second = run_simulation(600, policies, workers=2, seed=3)
+
+    for key in ["p1_win_rate", "p2_win_rate", "draw_rate", "average_length"]:
+        assert first[key] == second[key]
+    assert first["p2_win_rate"] > first["p1_win_rate"]
+
+
+def test_run_simulation_rejects_no_games():
+    """
+    Tests that simulating no games is refused.
+    """
+    with pytest.raises(ValueError):
+        run_simulation(0, [RandomPolicy(), RandomPolicy()], workers=1)
+
+
+def test_parse_policy():
+    """
+    Tests that policies are built from their command-line names.
+    """
+    assert isinstance(parse_policy("random"), RandomPolicy)
+    assert isinstance(parse_policy("Greedy"), GreedyPolicy)
+    assert parse_policy("4,4,3").columns == (4, 4, 3)
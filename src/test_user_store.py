@@ -0,0 +1,396 @@
+"""
+Module to test important classes and functions from user_store.py
+"""
+
+
+import json
+
+import pytest
+from conftest import stored_user
+from custom_errors import UserRecordError
+from user_store import (
+    CachedJsonUserRepository,
+    JsonUserRepository,
+    SqliteUserRepository,
+    UserRepository,
+    migrate_json_to_sqlite,
+    read_user_records
+)
+
+
+@pytest.fixture(params=["json", "cached_json", "sqlite"])
+def repository(request, tmp_path):
+    """Provides an empty repository of each backend."""
+    if request.param == "sqlite":
+        return SqliteUserRepository(tmp_path / "users.db")
+    path = tmp_path / "users.json"
+    path.write_text("[]", encoding="utf-8")
+    if request.param == "cached_json":
+        repository = CachedJsonUserRepository(path)
+        request.addfinalizer(repository.close)
+        return repository
+    return JsonUserRepository(path)
+
+
+def test_repository_add_get_update(repository):
+    """
+    Tests that users added to a repository can be looked up and updated, and
+    that missing users are reported.
+    """
+    repository.add(stored_user("tester001"))
+    repository.add(stored_user("tester002", 3, 3))
+
+    assert repository.get("tester002")["wins"] == 3
+    assert repository.get("tester003") is None
+
+    assert repository.update("tester001", wins=1) is True
+    assert repository.update("tester003", wins=1) is False
+    assert repository.get("tester001")["wins"] == 1
+    assert repository.stats() == [
+        {"username": "tester001", "games_played": 0, "wins": 1, "losses": 0,
+         "win_ratio": 0.0},
+        {"username": "tester002", "games_played": 3, "wins": 3, "losses": 0,
+         "win_ratio": 100.0},
+    ]
+
+
+def test_repository_find(repository):
+    """
+    Tests that users are found whatever the case of their username.
+    """
+    repository.add(stored_user("Tester001"))
+    repository.add(stored_user("tester002"))
+
+    assert repository.find("tester001")["username"] == "Tester001"
+    assert repository.find("TESTER002")["username"] == "tester002"
+    assert repository.find("tester003") is None
+
+
+def test_repository_stats_view(repository):
+    """
+    Tests that the stats view of a repository only exposes game records,
+    cannot be changed, and follows changes to the repository.
+    """
+    assert len(repository.stats_view()) == 0
+
+    repository.add(stored_user("tester001"))
+    repository.add(stored_user("tester002", 2, 2))
+    view = repository.stats_view()
+    assert view[1] == {"username": "tester002", "games_played": 2, "wins": 2,
+                       "losses": 0, "win_ratio": 100.0}
+    assert "pin" not in view[0]
+    with pytest.raises(TypeError):
+        view[0]["wins"] = 3
+
+    repository.record_game(["tester001", "tester002"], "tester001")
+    assert [user["wins"] for user in view] == [1, 2]
+
+
+def test_cached_repository_stats_view_refresh(tmp_path, monkeypatch):
+    """
+    Tests that the stats view of a cached repository shares its user
+    dictionaries, checks for changes once per iteration, and only fetches
+    them again after a change.
+    """
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([stored_user("tester001")]), encoding="utf-8")
+    repository = CachedJsonUserRepository(path, flush_interval=None)
+    records = repository.records
+    fetched = []
+    monkeypatch.setattr(repository, "records",
+                        lambda: fetched.append(1) or records())
+    view = repository.stats_view()
+    versions = []
+    monkeypatch.setattr(
+        CachedJsonUserRepository, "version",
+        property(lambda self: versions.append(1) or self._version)
+    )
+
+    assert view[0]["wins"] == 0
+    assert len(view) == 1
+    assert versions == [] and len(fetched) == 1
+    assert [user["wins"] for user in view] == [0]
+    assert len(versions) == 1 and len(fetched) == 1
+    repository.update("tester001", wins=1)
+    assert [user["wins"] for user in view] == [1]
+    assert len(versions) == 2 and len(fetched) == 2
+    repository.close()
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    """
+    Tests that migrating a JSON file copies every user into the database.
+    """
+    json_path = tmp_path / "users.json"
+    users = [stored_user("tester001"), stored_user("tester002", 2, 2)]
+    json_path.write_text(json.dumps(users), encoding="utf-8")
+
+    count = migrate_json_to_sqlite(json_path, tmp_path / "users.db")
+
+    assert count == 2
+    assert SqliteUserRepository(tmp_path / "users.db").all() == users
+
+
+def test_cached_repository_writes_back(tmp_path):
+    """
+    Tests that a cached repository serves reads from memory, and writes the
+    file once the number of changes reaches flush_every.
+    """
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([stored_user("tester001")]), encoding="utf-8")
+    repository = CachedJsonUserRepository(path, flush_every=3,
+                                          flush_interval=None)
+
+    assert repository.get("tester001")["wins"] == 0
+
+    repository.add(stored_user("tester002"))
+    repository.update("tester001", wins=1)
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 1
+    assert repository.dirty == {"tester001", "tester002"}
+
+    repository.update("tester003", wins=1)
+    repository.add(stored_user("tester004"))
+    on_disk = json.loads(path.read_text(encoding="utf-8"))
+    assert [user["username"] for user in on_disk] == [
+        "tester001", "tester002", "tester004"
+    ]
+    assert on_disk[0]["wins"] == 1
+    assert repository.dirty == set()
+    repository.close()
+
+
+def test_cached_repository_counts_changes_to_one_user(tmp_path):
+    """
+    Tests that repeated changes to the same user count towards flush_every.
+    """
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([stored_user("tester001")]), encoding="utf-8")
+    repository = CachedJsonUserRepository(path, flush_every=3,
+                                          flush_interval=None)
+
+    repository.update("tester001", wins=1)
+    repository.update("tester001", wins=2)
+    assert json.loads(path.read_text(encoding="utf-8"))[0]["wins"] == 0
+    repository.update("tester001", wins=3)
+    assert json.loads(path.read_text(encoding="utf-8"))[0]["wins"] == 3
+    repository.update("tester001", wins=4)
+    assert json.loads(path.read_text(encoding="utf-8"))[0]["wins"] == 3
+    repository.close()
+
+
+def test_cached_repository_flush_interval(tmp_path):
+    """
+    Tests that a cached repository writes changes once flush_interval has
+    passed, and that returned dictionaries do not change the cache.
+    """
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([stored_user("tester001")]), encoding="utf-8")
+    repository = CachedJsonUserRepository(path, flush_interval=0.05)
+
+    repository.get("tester001")["wins"] = 10
+    repository.update("tester001", color="blue")
+    timer = repository._timer
+    timer.join()
+
+    on_disk = json.loads(path.read_text(encoding="utf-8"))
+    assert on_disk[0]["color"] == "blue"
+    assert on_disk[0]["wins"] == 0
+    repository.close()
+
+
+def test_repository_record_game(repository):
+    """
+    Tests that recording a game updates the game record of both players, and
+    ignores players that are not stored.
+    """
+    repository.add(stored_user("tester001"))
+    repository.add(stored_user("tester002", 1, 1))
+
+    repository.record_game(["tester001", "tester002"], "tester001")
+    repository.record_game(["tester001", "Guest"], None)
+
+    assert repository.stats() == [
+        {"username": "tester001", "games_played": 2, "wins": 1, "losses": 0,
+         "win_ratio": 75.0},
+        {"username": "tester002", "games_played": 2, "wins": 1, "losses": 1,
+         "win_ratio": 50.0},
+    ]
+
+
+def test_cached_repository_journal(tmp_path):
+    """
+    Tests that game results are appended to the journal without writing the
+    file, folded back in when the file is loaded again, and compacted into
+    the file once the journal is long enough.
+    """
+    path = tmp_path / "users.json"
+    users = [stored_user("tester001"), stored_user("tester002")]
+    path.write_text(json.dumps(users), encoding="utf-8")
+    repository = CachedJsonUserRepository(path, flush_interval=None,
+                                          compact_every=3)
+
+    repository.record_game(["tester001", "tester002"], "tester001")
+    repository.record_game(["tester001", "tester002"], "tester002")
+    assert json.loads(path.read_text(encoding="utf-8"))[0]["wins"] == 0
+    assert repository.journal_lines == 2
+
+    # A new repository folds the journal into the file it loads.
+    reloaded = CachedJsonUserRepository(path, flush_interval=None)
+    assert reloaded.get("tester001")["games_played"] == 2
+    reloaded.close()
+
+    repository.record_game(["tester001", "tester002"], None)
+    repository.compact().join()
+    on_disk = json.loads(path.read_text(encoding="utf-8"))
+    assert on_disk[0]["games_played"] == 3
+    assert on_disk[0]["win_ratio"] == 50.0
+    assert repository.journal_lines == 0
+
+    # The journal was compacted, so it is not folded into the file again.
+    reloaded = CachedJsonUserRepository(path, flush_interval=None)
+    assert reloaded.get("tester002")["games_played"] == 3
+    reloaded.close()
+    repository.close()
+
+
+def test_cached_repository_journal_torn_line(tmp_path):
+    """
+    Tests that a half-written last line of the journal is ignored, and that
+    the next game result is not appended after it.
+    """
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([stored_user("tester001")]), encoding="utf-8")
+    repository = CachedJsonUserRepository(path, flush_interval=None)
+    repository.record_game(["tester001"], "tester001")
+    repository.close()
+    with open(repository.journal_path, "a", encoding="utf-8") as file:
+        file.write('{"players": ["tester0')
+
+    repository = CachedJsonUserRepository(path, flush_interval=None)
+    assert repository.get("tester001")["wins"] == 1
+    repository.record_game(["tester001"], "tester001")
+    repository.close()
+
+    repository = CachedJsonUserRepository(path, flush_interval=None)
+    assert repository.get("tester001")["wins"] == 2
+    repository.close()
+
+
+def test_cached_repositories_share_file(tmp_path):
+    """
+    Tests that cached repositories of the same file, as used by several
+    processes, see each other's writes and game results, and do not lose
+    each other's changes.
+    """
+    path = tmp_path / "users.json"
+    users = [stored_user("tester001"), stored_user("tester002")]
+    path.write_text(json.dumps(users), encoding="utf-8")
+    first = CachedJsonUserRepository(path, flush_interval=None)
+    second = CachedJsonUserRepository(path, flush_interval=None)
+
+    first.update("tester001", color="blue")
+    second.update("tester002", color="green")
+    second.record_game(["tester001", "tester002"], "tester002")
+    first.flush()
+    second.add(stored_user("tester003"))
+    second.flush()
+    first.record_game(["tester001", "tester002"], None)
+
+    for repository in (first, second):
+        assert [user["color"] for user in repository.all()] == [
+            "blue", "green", "red"
+        ]
+        assert repository.get("tester002")["games_played"] == 2
+        assert repository.get("tester002")["wins"] == 1
+    first.close()
+    second.close()
+    reloaded = CachedJsonUserRepository(path, flush_interval=None)
+    assert reloaded.get("tester001")["games_played"] == 2
+    reloaded.close()
+
+
+def test_read_user_records(tmp_path):
+    """
+    Tests that users are streamed from a file read a few characters at a
+    time, as they would be loaded whole.
+    """
+    path = tmp_path / "users.json"
+    users = [
+        stored_user(f"tester{index:03}", index, index) for index in range(20)
+    ]
+    path.write_text(json.dumps(users, indent=4), encoding="utf-8")
+
+    assert list(read_user_records(path, chunk_size=7)) == users
+
+    path.write_text(" [ ] ", encoding="utf-8")
+    assert list(read_user_records(path, chunk_size=2)) == []
+
+
+@pytest.mark.parametrize("content, index", [
+    ('{"username": "tester001"}', None),
+    ('[{0}, {0}, 5]', 2),
+    ('[{0}, {0}, {1}]', 2),
+    ('[{0}, {0}, {2}]', 2),
+    ('[{0}, {0}', 2),
+    ('[{0} {0}]', 1),
+    ('[{0}] {0}', 1),
+])
+def test_read_user_records_errors(tmp_path, content, index):
+    """
+    Tests that the first record not in the right format is reported with its
+    index, whether it is not a dictionary, has a field of the wrong type, or
+    is not valid JSON.
+    """
+    valid = json.dumps(stored_user("tester001"))
+    bad_type = json.dumps(dict(stored_user("tester002"), wins=True))
+    missing = json.dumps({"username": "tester003"})
+    path = tmp_path / "users.json"
+    path.write_text(content.replace("{0}", valid).replace("{1}", bad_type)
+                    .replace("{2}", missing), encoding="utf-8")
+
+    with pytest.raises(UserRecordError) as error:
+        list(read_user_records(path, chunk_size=16))
+    assert error.value.index == index
+
+
+def test_read_user_records_stops_at_invalid_record(tmp_path):
+    """
+    Tests that an invalid record is reported without reading the rest of the
+    file.
+    """
+    class ReadCounter:
+        """Counts the bytes read, as a digest of the file."""
+        def __init__(self):
+            self.size = 0
+
+        def update(self, data):
+            """Adds the bytes read to the count."""
+            self.size += len(data)
+
+    path = tmp_path / "users.json"
+    users = [
+        json.dumps(stored_user(f"tester{index:03}")) for index in range(200)
+    ]
+    path.write_text(
+        '[{"username": "tester", "wins": tru}, ' + ", ".join(users) + "]",
+        encoding="utf-8"
+    )
+    counter = ReadCounter()
+    with pytest.raises(UserRecordError) as error:
+        list(read_user_records(path, chunk_size=64, digest=counter))
+    assert error.value.index == 0
+    assert counter.size <= 128
+
+
+def test_incomplete_backend_fails_on_creation():
+    """
+    Tests that a backend missing operations of UserRepository cannot be
+    created.
+    """
+    class ReadOnlyRepository(UserRepository):
+        """A backend only able to list users."""
+        def all(self):
+            return []
+
+    with pytest.raises(TypeError):
+        ReadOnlyRepository()
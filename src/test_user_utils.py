@@ -0,0 +1,144 @@
+"""
+Module to test important classes and functions from user_utils.py
+"""
+
+
+import json
+import os
+
+import pytest
+import user_utils
+from conftest import stored_user
+from leaderboards import leaderboards
+from sessions import SESSIONS_FILE, configure_sessions, sessions
+from user_store import (
+    JsonUserRepository,
+    SqliteUserRepository,
+    configure_repository
+)
+from user_utils import (
+    User,
+    bootstrap_users,
+    record_result,
+    reset_log
+)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def repository(request, tmp_path, monkeypatch):
+    """
+    Provides a repository of each backend holding two users, used by
+    user_utils in place of the configured one.
+    """
+    users = [stored_user("tester001", 2, 1, 1), stored_user("tester002")]
+    if request.param == "sqlite":
+        repository = SqliteUserRepository(tmp_path / "users.db")
+        repository.add_many(users)
+        request.addfinalizer(repository.close)
+    else:
+        path = tmp_path / "users.json"
+        path.write_text(json.dumps(users), encoding="utf-8")
+        repository = JsonUserRepository(path)
+    monkeypatch.setattr(user_utils, "repository", lambda: repository)
+    return repository
+
+
+def test_record_result(repository):
+    """
+    Tests that recording a result updates both User instances and both stored
+    users.
+    """
+    winner = User("tester001", 2, 1, 1, 50.0)
+    loser = User("tester002", 0, 0, 0, 0.0)
+
+    record_result(winner, loser)
+
+    assert (winner.games_played, winner.wins, winner.win_ratio) == (3, 2, 66.67)
+    assert (loser.games_played, loser.losses, loser.win_ratio) == (1, 1, 0.0)
+    assert repository.stats() == [
+        {"username": "tester001", "games_played": 3, "wins": 2, "losses": 1,
+         "win_ratio": 66.67},
+        {"username": "tester002", "games_played": 1, "wins": 0, "losses": 1,
+         "win_ratio": 0.0},
+    ]
+
+
+def test_record_result_draw_with_guest(repository):
+    """
+    Tests that a draw is recorded for both users, and that a guest account is
+    skipped.
+    """
+    guest = User("Guest", None, None, None, None)
+    user = User("tester002", 0, 0, 0, 0.0)
+
+    record_result(guest, user, draw=True)
+
+    assert (user.games_played, user.wins, user.losses) == (1, 0, 0)
+    assert user.win_ratio == 50.0
+    assert repository.get("tester002")["win_ratio"] == 50.0
+    assert repository.get("tester001")["games_played"] == 2
+
+
+def test_record_result_guests_only(monkeypatch):
+    """Tests that a game between guests does not touch the repository."""
+    def fail():
+        raise AssertionError("The repository should not be used.")
+    monkeypatch.setattr(user_utils, "repository", fail)
+
+    record_result(User("Guest", None, None, None, None),
+                  User("Guest", None, None, None, None))
+
+
+@pytest.fixture
+def users_directory(tmp_path):
+    """
+    Provides a directory to run from, and configures the default repository
+    and sessions again once the test is done.
+    """
+    directory = os.getcwd()
+    os.chdir(tmp_path)
+    yield tmp_path
+    os.chdir(directory)
+    configure_repository()
+    configure_sessions()
+
+
+def test_bootstrap_users(users_directory):
+    """
+    Tests that bootstrapping loads users.json into the repository and the
+    leaderboards without writing it, and keeps sessions in the lease file.
+    """
+    path = users_directory / "users.json"
+    users = [stored_user("tester001", 3, 2, 1), stored_user("tester002")]
+    path.write_text(json.dumps(users), encoding="utf-8")
+    modified = os.stat(path).st_mtime_ns
+
+    bootstrap_users().flush()
+    assert leaderboards().rank("wins", "tester001") == 1
+    assert sessions().path == SESSIONS_FILE
+    assert sessions().login("tester001")
+    reset_log()
+    assert os.stat(path).st_mtime_ns == modified
+    assert (users_directory / SESSIONS_FILE).exists()
+
+
+def test_bootstrap_users_blank_and_invalid(users_directory, monkeypatch):
+    """
+    Tests that bootstrapping turns a blank users.json into an empty list, and
+    exits on the first bad record, telling its index.
+    """
+    path = users_directory / "users.json"
+    path.write_text("  \n", encoding="utf-8")
+    assert bootstrap_users().all() == []
+    assert json.loads(path.read_text(encoding="utf-8")) == []
+
+    users = [stored_user("tester001"), stored_user("tester002")]
+    users[1]["pin"] = 1234
+    path.write_text(json.dumps(users), encoding="utf-8")
+    captured_print = []
+    monkeypatch.setattr("builtins.print", captured_print.append)
+    with pytest.raises(SystemExit):
+        bootstrap_users()
+    assert "Record 1 of users.json ('tester002') has an invalid pin" in (
+        captured_print[0]
+    )
@@ -120,3 +120,29 @@ def test_validate_username_invalid(monkeypatch):
 
     # Function should return user_input as last input is valid
     assert result == valid_input
+
+
+def test_validate_username_guest_and_case(monkeypatch):
+    """
+    Tests validate_username, inputting a guest name and a taken username in
+    another case before a valid input.
+    """
+    # Required variables:
+    prompt = "Valid username: "
+    match = "^[a-zA-Z0-9][a-zA-Z0-9._-]{3,18}[a-zA-Z0-9]$"
+
+    # Guest1 is a guest account, and TESTER123 is tester123, which exists in
+    # users.json.
+    input_sequence = iter(["Guest1", "TESTER123", "tester000"])
+
+    # Replaces default input function to enter input_sequence in sequence
+    monkeypatch.setattr("builtins.input", lambda _: next(input_sequence))
+
+    # Main function
+    result = validate_username(
+        prompt = prompt,
+        match = match
+    )
+
+    # Function should return the last input, the only valid one
+    assert result == "tester000"
@@ -0,0 +1,69 @@
+"""
+Module to test important methods from win_conditions.py
+"""
+
+
+import random
+
+import numpy as np
+import pytest
+from game_board import Board, BitBoard, Piece
+from win_conditions import VictoryChecker, batch_victory
+from custom_errors import ColumnFullError
+
+
+@pytest.mark.parametrize("board_class", [Board, BitBoard])
+def test_last_move_victory_matches_check_victory(board_class):
+    """
+    Tests that checking only the lines through the last move gives the same
+    result as checking the whole board, over a number of random games.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = board_class(players)
+    referee = VictoryChecker(board, players)
+    rng = random.Random(4)
+
+    for _ in range(50):
+        board.clear_board()
+        for turn in range(42):
+            player = players[turn % 2]
+            try:
+                column = rng.randint(1, 7)
+                row = player.drop(board, column)
+            except ColumnFullError:
+                continue
+            winner = referee.check_victory((column, row, player.player))
+            # Both ways of checking should agree after every move
+            assert winner is referee.check_victory()
+            if winner is not None:
+                break
+
+
+def test_batch_victory_matches_referee():
+    """
+    Tests that batch_victory gives the same winner as the referee for each of
+    a stack of random boards, including boards where both players have lines,
+    and that the reported line belongs to the winner.
+    """
+    # Define required variables
+    player1 = Piece("Test1","red", "O", "1")
+    player2 = Piece("Test2","blue", "X", "2")
+    players = [player1, player2]
+    board = Board(players)
+    referee = VictoryChecker(board, players)
+    rng = np.random.default_rng(4)
+    positions = rng.choice(["0", "1", "2"], size=(500, 6, 7), p=[0.4, 0.3, 0.3])
+
+    winners, lines = batch_victory(positions)
+
+    for position, winner, line in zip(positions, winners, lines):
+        board.array = position
+        expected = referee.check_victory()
+        assert winner == (0 if expected is None else int(expected.player))
+        if winner:
+            assert all(position[row, column] == str(winner) for row, column in line)
+        else:
+            assert (line == -1).all()
@@ -0,0 +1,1231 @@
+"""
+Module that defines where user accounts are stored. Every read or write of
+user data goes through a UserRepository, so the storage backend can be chosen
+in one place:
+
+1. JsonUserRepository: the users.json file, a list of user dictionaries.
+2. CachedJsonUserRepository: the users.json file, loaded once and served from
+   memory, with changes written back in batches, and game results appended
+   to a journal next to it. Used for the "json" backend.
+3. SqliteUserRepository: an SQLite database, with the username as primary
+   key and indexes on the high-score fields.
+
+The repository in use is set with configure_repository() and accessed with
+repository().
+"""
+
+
+# Standard Library Modules
+import abc
+import atexit
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Mapping, Sequence
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Local Modules
+from custom_errors import UserRecordError
+
+
+# Fields of a user dictionary, in the order they are stored. Logins are kept
+# by the session registry (sessions.py): the logged_in field of older users
+# files and databases is left as it is, and never read.
+USER_FIELDS = (
+    "username",
+    "pin",
+    "games_played",
+    "wins",
+    "losses",
+    "win_ratio",
+    "color",
+    "piece_type",
+)
+# Fields of a user dictionary that make up their game record.
+STATS_FIELDS = ("username", "games_played", "wins", "losses", "win_ratio")
+# Types of the fields of a stored user dictionary.
+USER_SCHEMA = {
+    "username": str,
+    "pin": str,
+    "games_played": int,
+    "wins": int,
+    "losses": int,
+    "win_ratio": (int, float),
+    "color": str,
+    "piece_type": str,
+}
+# Number of characters read at a time when streaming the users file.
+CHUNK_SIZE = 1 << 16
+
+
+def replace_file(path, content):
+    """
+    Function to replace a file's content in one step: the content is written
+    to a temporary file in the same directory and flushed to disk, then the
+    temporary file is renamed over the file. The file is never seen
+    half-written, even if the program or the machine stops.
+
+    Args:
+    1. path (str): The path of the file.
+    2. content (bytes): The new content of the file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    # The rename itself is only on disk once the directory is.
+    if hasattr(os, "O_DIRECTORY"):
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def file_signature(path):
+    """
+    Function to identify the version of a file without reading it. Files are
+    replaced rather than rewritten, so a new version is a new inode.
+
+    Returns a tuple of the file's inode, modification time and size, or None
+    if the file does not exist.
+    """
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return status.st_ino, status.st_mtime_ns, status.st_size
+
+
+@contextlib.contextmanager
+def file_lock(path, exclusive=True):
+    """
+    Function to hold an advisory lock (fcntl.flock) shared by every process
+    using a file, for the duration of a with statement. The lock is taken on
+    a separate lock file (path + ".lock"), since the file itself is replaced
+    when written. Nothing is locked where fcntl is not available (Windows).
+
+    Args:
+    1. path (str): The path of the file.
+    2. exclusive (bool): Whether to lock out every other process (to write),
+       or only those writing (to read).
+    """
+    with open(f"{os.fspath(path)}.lock", "a", encoding="utf-8") as lock:
+        if fcntl is not None:
+            fcntl.flock(
+                lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            )
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def username_key(username):
+    """
+    Function to give the key of a username in username indexes. Usernames
+    differing only by case have the same key, so they cannot both be taken.
+    """
+    return username.casefold()
+
+
+def check_user_record(user, index):
+    """
+    Function to check that a stored user dictionary has every field of
+    USER_SCHEMA, with the right type.
+
+    Args:
+    1. user (dict): The user dictionary.
+    2. index (int): The index of the user in the file, for error messages.
+
+    Raises UserRecordError if the user dictionary is not in the right format.
+    """
+    if not isinstance(user, dict):
+        raise UserRecordError(
+            f"Data type error. Record {index} of users.json should be a "
+            "dictionary.", index
+        )
+    for field, kind in USER_SCHEMA.items():
+        value = user.get(field)
+        # Booleans are integers to isinstance(), but not valid numbers here.
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise UserRecordError(
+                f"Data type error. Record {index} of users.json "
+                f"({user.get('username')!r}) has an invalid {field}: "
+                f"{value!r}.", index
+            )
+
+
+def read_user_records(path="users.json", chunk_size=CHUNK_SIZE, digest=None):
+    """
+    Function to read the user dictionaries of a users file one at a time,
+    checking each one as it is read. The file is parsed incrementally, so no
+    more than one record and one chunk of the file are held in memory,
+    however large the file is.
+
+    Args:
+    1. path (str): The path of the users file.
+    2. chunk_size (int): The number of characters read at a time.
+    3. digest (hashlib object): A hash updated with the content of the file
+       as it is read, or None.
+
+    Raises UserRecordError at the first record (or part of the file) that is
+    not in the right format, and FileNotFoundError if there is no file.
+
+    Yields each user dictionary, in creation order.
+    """
+    decoder = json.JSONDecoder()
+    # Line endings are kept as they are, so the digest is the file's.
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        buffer, position, consumed, end_of_file = "", 0, 0, False
+
+        def read():
+            """Returns the next chunk of the file, or "" at its end."""
+            chunk = file.read(chunk_size)
+            if digest is not None:
+                digest.update(chunk.encode("utf-8"))
+            return chunk
+
+        def skip_whitespace():
+            """Returns the next character after whitespace, or ""."""
+            nonlocal buffer, position, consumed, end_of_file
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or end_of_file:
+                    return buffer[position:position + 1]
+                consumed += position
+                buffer, position = read(), 0
+                end_of_file = buffer == ""
+
+        def cut_short(error):
+            """
+            Returns whether a decoding error may only be due to the record
+            running past the text read so far: the error is in a string not
+            closed yet, or in the last few characters, where a literal,
+            number or escape may be cut.
+            """
+            return (
+                error.msg.startswith("Unterminated string")
+                or len(buffer) - error.pos <= len("-Infinity")
+            )
+
+        def decode_error(index, error):
+            """Returns the UserRecordError of an invalid JSON document."""
+            return UserRecordError(
+                f"JSON decoding failed at record {index} (character "
+                f"{consumed + error.pos} of users.json): {error.msg}.", index
+            )
+
+        if skip_whitespace() != "[":
+            raise UserRecordError(
+                "Data type error. users.json should be a list."
+            )
+        position += 1
+        index = 0
+        while True:
+            character = skip_whitespace()
+            if character == "]" and index == 0:
+                break
+            if index > 0:
+                if character == "]":
+                    break
+                if character != ",":
+                    raise decode_error(index, json.JSONDecodeError(
+                        "Expecting ',' delimiter", buffer, position
+                    ))
+                position += 1
+                skip_whitespace()
+            # Chunks are added until the record can be decoded whole, and no
+            # longer once it is found invalid.
+            while True:
+                try:
+                    user, record_end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as error:
+                    if end_of_file or not cut_short(error):
+                        raise decode_error(index, error) from None
+                else:
+                    if record_end < len(buffer) or end_of_file:
+                        break
+                chunk = read()
+                end_of_file = chunk == ""
+                consumed += position
+                buffer, position = buffer[position:] + chunk, 0
+            position = record_end
+            check_user_record(user, index)
+            yield user
+            index += 1
+        position += 1
+        if skip_whitespace() != "":
+            raise decode_error(index, json.JSONDecodeError(
+                "Extra data", buffer, position
+            ))
+
+
+def new_user(username, pin, color, piece_type):
+    """
+    Function to build the user dictionary of a new account, with no games
+    played yet.
+
+    Args:
+    1. username (str): The username of the account.
+    2. pin (str): The pin of the account.
+    3. color (str): The Piece color of the account.
+    4. piece_type (str): The Piece type of the account.
+
+    Returns the user dictionary.
+    """
+    return {
+        "username": username,
+        "pin": pin,
+        "games_played": 0,
+        "wins": 0,
+        "losses": 0,
+        "win_ratio": 0.0,
+        "color": color,
+        "piece_type": piece_type
+    }
+
+
+def game_stats(user, winner):
+    """
+    Function to work out a user's game record after one more game.
+
+    Args:
+    1. user (dict): The user dictionary.
+    2. winner (str): The username of the winner, or None for a draw.
+
+    Returns a dictionary of the updated game record fields.
+    """
+    games_played = int(user["games_played"]) + 1
+    wins = int(user["wins"]) + (winner == user["username"])
+    losses = int(user["losses"]) + (
+        winner is not None and winner != user["username"]
+    )
+    draws = games_played - (wins + losses)
+    return {
+        "games_played": games_played,
+        "wins": wins,
+        "losses": losses,
+        "win_ratio": round(((wins + (0.5 * draws)) / games_played) * 100, 2),
+    }
+
+
+class UserStats(Mapping):
+    """
+    Represents a user's game record: a read-only view of the STATS_FIELDS of
+    a user dictionary, which is neither copied nor changed.
+
+    Attributes:
+    1. _user (dict): The user dictionary.
+    """
+    __slots__ = ("_user",)
+
+    def __init__(self, user):
+        self._user = user
+
+    def __getitem__(self, field):
+        if field not in STATS_FIELDS:
+            raise KeyError(field)
+        return self._user[field]
+
+    def __iter__(self):
+        return iter(STATS_FIELDS)
+
+    def __len__(self):
+        return len(STATS_FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class StatsProjection(Sequence):
+    """
+    Represents every user's game record in creation order, as UserStats views
+    of the user dictionaries of a repository. The user dictionaries are
+    fetched when the projection is created, and the repository's version is
+    checked once each time the projection is iterated: they are only fetched
+    again if the repository has changed since. Indexing and len() use the
+    user dictionaries as last fetched.
+
+    Attributes:
+    1. _repository (UserRepository): The repository projected.
+    2. _users (list): The user dictionaries as last fetched.
+    3. _version (object): The version of the repository they were fetched
+       at.
+    """
+    def __init__(self, repository):
+        self._repository = repository
+        self._users = []
+        self._version = None
+        self.refresh()
+
+    def refresh(self):
+        """
+        A method to fetch the user dictionaries again if the repository
+        changed since they were last fetched.
+        """
+        version = self._repository.version
+        if version is None or version != self._version:
+            self._users = self._repository.records()
+            self._version = version
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [UserStats(user) for user in self._users[index]]
+        return UserStats(self._users[index])
+
+    def __iter__(self):
+        self.refresh()
+        return (UserStats(user) for user in self._users)
+
+    def __len__(self):
+        return len(self._users)
+
+
+class UserRepository(abc.ABC):
+    """
+    A template of the operations available on stored user accounts. Backends
+    have their own classes, inheriting from this class and implementing its
+    abstract methods.
+
+    Attributes:
+    1. backend (str): The name of the backend ("json" or "sqlite").
+    """
+    backend = None
+
+    @abc.abstractmethod
+    def all(self):
+        """Returns a list of every user dictionary, in creation order."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, username):
+        """Returns the user dictionary of a username, or None if not found."""
+        raise NotImplementedError
+
+    def find(self, username):
+        """
+        Returns the user dictionary of a username whatever its case (see
+        username_key()), or None if not found.
+        """
+        key = username_key(username)
+        for user in self.all():
+            if username_key(user["username"]) == key:
+                return user
+        return None
+
+    @abc.abstractmethod
+    def add(self, user):
+        """A method to store a new user dictionary."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update(self, username, **fields):
+        """
+        A method to change fields of a user dictionary.
+
+        Returns True if the user was found, False otherwise.
+        """
+        raise NotImplementedError
+
+    def record_game(self, players, winner):
+        """
+        A method to add a finished game to the game record of its players.
+
+        Args:
+        1. players (list): The usernames of the players. Usernames that are
+           not stored (e.g. guests) are ignored.
+        2. winner (str): The username of the winner, or None for a draw.
+        """
+        for username in players:
+            user = self.get(username)
+            if user is not None:
+                self.update(username, **game_stats(user, winner))
+
+    def stats(self):
+        """
+        Returns a list of dictionaries with each user's game record only
+        (STATS_FIELDS), in creation order.
+        """
+        return [
+            {field: user[field] for field in STATS_FIELDS}
+            for user in self.all()
+        ]
+
+    @property
+    def version(self):
+        """
+        A method to access a value that changes whenever the stored users
+        change, or None if the backend cannot tell.
+        """
+        return None
+
+    def records(self):
+        """
+        Returns a list of every user dictionary, in creation order, without
+        copying them where the backend can (e.g. for StatsProjection). The
+        dictionaries may be shared, and must not be changed.
+        """
+        return self.all()
+
+    def stats_view(self):
+        """
+        Returns a StatsProjection of every user's game record, in creation
+        order.
+        """
+        return StatsProjection(self)
+
+    def close(self):
+        """A method to release the repository once it is no longer used."""
+
+
+class JsonUserRepository(UserRepository):
+    """
+    Represents user accounts stored in a JSON file, as a list of user
+    dictionaries. Every operation reads the file, and every change rewrites
+    it.
+
+    The file can be shared by several processes. Changes are optimistic: the
+    file is read and changed without a lock, then written under the file's
+    lock only if no other process replaced it in the meantime, and retried
+    from a fresh read otherwise. After RETRIES attempts, the change is made
+    with the lock held from the read to the write.
+
+    Attributes:
+    1. _path (str): The path of the JSON file.
+    """
+    backend = "json"
+    RETRIES = 5
+
+    def __init__(self, path="users.json"):
+        self._path = path
+
+    @property
+    def path(self):
+        """A method to access the path of the JSON file."""
+        return self._path
+
+    @property
+    def version(self):
+        """A method to access the signature of the file."""
+        return file_signature(self._path)
+
+    def _read(self):
+        """
+        Returns a tuple of the list of user dictionaries in the file, and the
+        signature of the file they were read from.
+        """
+        with open(self._path, "rb") as file:
+            status = os.fstat(file.fileno())
+            users = json.loads(file.read())
+        return users, (status.st_ino, status.st_mtime_ns, status.st_size)
+
+    def _load(self):
+        """Returns the list of user dictionaries in the file."""
+        return self._read()[0]
+
+    def _save(self, users):
+        """A method to replace the file with a list of user dictionaries."""
+        replace_file(self._path, json.dumps(users, indent=4).encode("utf-8"))
+
+    def _modify(self, change):
+        """
+        A method to change the file without losing the changes of other
+        processes.
+
+        Args:
+        1. change (func): The function changing the list of user dictionaries
+           in place. It returns whether anything was changed, and may be
+           called again on a fresher list.
+
+        Returns the value returned by change.
+        """
+        for _ in range(self.RETRIES):
+            users, signature = self._read()
+            changed = change(users)
+            if not changed:
+                return changed
+            with file_lock(self._path):
+                if file_signature(self._path) == signature:
+                    self._save(users)
+                    return changed
+        # Other processes kept writing first, so they are locked out.
+        with file_lock(self._path):
+            users = self._load()
+            changed = change(users)
+            if changed:
+                self._save(users)
+            return changed
+
+    def all(self):
+        """Returns a list of every user dictionary in the file."""
+        return self._load()
+
+    def get(self, username):
+        """Returns the user dictionary of a username, or None if not found."""
+        for user in self._load():
+            if user.get("username") == username:
+                return user
+        return None
+
+    def add(self, user):
+        """A method to append a new user dictionary to the file."""
+        def change(users):
+            users.append(user)
+            return True
+        self._modify(change)
+
+    def update(self, username, **fields):
+        """
+        A method to change fields of a user dictionary.
+
+        Returns True if the user was found, False otherwise.
+        """
+        def change(users):
+            for user in users:
+                if user.get("username") == username:
+                    user.update(fields)
+                    return True
+            return False
+        return self._modify(change)
+
+    def record_game(self, players, winner):
+        """
+        A method to add a finished game to the game record of its players,
+        with one read and one write of the file.
+
+        Args:
+        1. players (list): The usernames of the players. Usernames that are
+           not stored (e.g. guests) are ignored.
+        2. winner (str): The username of the winner, or None for a draw.
+        """
+        def change(users):
+            changed = False
+            for user in users:
+                if user.get("username") in players:
+                    user.update(game_stats(user, winner))
+                    changed = True
+            return changed
+        self._modify(change)
+
+
+class CachedJsonUserRepository(JsonUserRepository):
+    """
+    Represents user accounts stored in a JSON file, loaded into memory on
+    first access and served from there. Changes are made in memory, and the
+    file is written back once enough changes have been made, once changes are
+    old enough, and when the program exits. The file is replaced in one step
+    (written to a temporary file, then renamed), so it is never seen
+    half-written.
+
+    Game results are not written to the file. Each finished game is appended
+    as one line to a journal next to it (users.json.journal), and the game
+    records are the file's folded with the journal's lines. Once the journal
+    is long enough, a background thread compacts it: the file is written
+    with every result in it, and the journal starts over. The journal is also
+    started over whenever the file is written for other changes. The journal's
+    first line holds the SHA-1 of the file it applies to, so a journal
+    already compacted into the file is never folded twice, even if the
+    program stopped between writing the file and starting the journal over.
+
+    The file and journal can be shared by several processes. Each operation
+    first checks their signatures, and reloads them if another process
+    changed them, keeping the fields changed here but not written yet.
+    Writing the file and appending to the journal hold the file's lock.
+
+    Attributes (in addition to those of JsonUserRepository):
+    1. _users (dict): The user dictionaries keyed by username, in creation
+       order, or None until loaded.
+    2. _dirty (dict): The fields changed since the last write of each
+       changed username, or None for a user added since.
+    3. _changes (int): The number of changes made since the last write.
+    4. _flush_every (int): The number of changes after which the file is
+       written.
+    5. _flush_interval (float): The number of seconds after which changes
+       are written, whatever their number.
+    6. _timer (threading.Timer): The timer writing changes after
+       _flush_interval, or None if there are no changes waiting.
+    7. _lock (threading.RLock): Lock shared by the timer and the program.
+    8. _journal_path (str): The path of the journal.
+    9. _journal (file): The journal, open for appending, or None until the
+       next game result is recorded.
+    10. _journal_lines (int): The number of game results in the journal.
+    11. _journal_valid (bool): Whether the journal on disk can be appended
+        to, i.e. it applies to the file and has no half-written line.
+    12. _compact_every (int): The number of game results after which the
+        journal is compacted.
+    13. _compactor (threading.Thread): The thread of the last compaction, or
+        None if there has not been any.
+    14. _digest (str): The SHA-1 of the file as last read or written.
+    15. _signature (tuple): The signatures of the file and the journal as
+        last read or written.
+    16. _version (int): The number of times the cached users changed, here
+        or on disk.
+    17. _index (dict): The username of each username key (see
+        username_key()), built when the file is loaded and kept up to date
+        as users are added.
+    """
+    def __init__(self, path="users.json", flush_every=20, flush_interval=5.0,
+                 compact_every=500):
+        super().__init__(path)
+        self._users = None
+        self._dirty = {}
+        self._changes = 0
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+        self._timer = None
+        self._lock = threading.RLock()
+        self._journal_path = f"{os.fspath(path)}.journal"
+        self._journal = None
+        self._journal_lines = 0
+        self._journal_valid = False
+        self._compact_every = compact_every
+        self._compactor = None
+        self._digest = None
+        self._signature = None
+        self._version = 0
+        self._index = {}
+        atexit.register(self.flush)
+
+    @property
+    def dirty(self):
+        """A method to access the usernames changed since the last write."""
+        return frozenset(self._dirty)
+
+    @property
+    def journal_path(self):
+        """A method to access the path of the journal."""
+        return self._journal_path
+
+    @property
+    def journal_lines(self):
+        """A method to access the number of game results in the journal."""
+        return self._journal_lines
+
+    @property
+    def version(self):
+        """A method to access the number of times the cached users changed."""
+        with self._lock:
+            self._cache()
+            return self._version
+
+    def records(self):
+        """Returns a list of the cached user dictionaries themselves."""
+        with self._lock:
+            return list(self._cache().values())
+
+    def _disk_signature(self):
+        """Returns the current signatures of the file and the journal."""
+        return file_signature(self._path), file_signature(self._journal_path)
+
+    def _stale(self):
+        """A method to check whether the cache is missing or out of date."""
+        return self._users is None or self._signature != self._disk_signature()
+
+    def _reload(self, validate=False):
+        """
+        A method to load the file and fold the journal into it, keeping the
+        changes not written yet. The file's lock must be held.
+
+        Args:
+        1. validate (bool): Whether to check each record of the file as it is
+           read (see read_user_records()), rather than load it whole.
+        """
+        if validate:
+            digest = hashlib.sha1()
+            users = {
+                user["username"]: user
+                for user in read_user_records(self._path, digest=digest)
+            }
+            self._digest = digest.hexdigest()
+        else:
+            with open(self._path, "rb") as file:
+                content = file.read()
+            self._digest = hashlib.sha1(content).hexdigest()
+            users = {
+                user.get("username"): user for user in json.loads(content)
+            }
+        self._fold_journal(users)
+        # Changes not written yet are kept over the file's.
+        for username, fields in self._dirty.items():
+            user = self._users[username]
+            if fields is None or username not in users:
+                users[username] = user
+            else:
+                users[username].update(
+                    {field: user[field] for field in fields}
+                )
+        self._users = users
+        self._index = {username_key(username): username for username in users}
+        self._version += 1
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._signature = self._disk_signature()
+
+    def _cache(self):
+        """
+        Returns the cached user dictionaries, loading the file and folding
+        the journal into it if needed.
+        """
+        if self._stale():
+            with file_lock(self._path, exclusive=False):
+                self._reload()
+        return self._users
+
+    def load(self):
+        """
+        A method to load the file into memory, checking each record as it is
+        read, so that the file is only read once when the program starts.
+
+        Raises UserRecordError at the first record not in the right format.
+        """
+        with self._lock, file_lock(self._path, exclusive=False):
+            self._reload(validate=True)
+
+    def _fold_journal(self, users):
+        """
+        A method to apply the game results of the journal to user
+        dictionaries, if the journal applies to the file that was loaded.
+        """
+        self._journal_lines = 0
+        self._journal_valid = not os.path.exists(self._journal_path)
+        if self._journal_valid:
+            return
+        with open(self._journal_path, "r", encoding="utf-8") as file:
+            lines = file.read().split("\n")
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            return
+        # A journal written for another version of the file has already been
+        # compacted into it.
+        if header.get("snapshot") != self._digest:
+            return
+        # The last element is empty if the journal ends with a full line.
+        for line in lines[1:-1]:
+            try:
+                game = json.loads(line)
+            except json.JSONDecodeError:
+                return
+            self._apply_game(users, game["players"], game["winner"])
+            self._journal_lines += 1
+        self._journal_valid = lines[-1] == ""
+
+    @staticmethod
+    def _apply_game(users, players, winner):
+        """A method to add a game result to user dictionaries."""
+        for username in players:
+            user = users.get(username)
+            if user is not None:
+                user.update(game_stats(user, winner))
+
+    def _open_journal(self, reset):
+        """
+        A method to open the journal for appending. The file's lock must be
+        held.
+
+        Args:
+        1. reset (bool): Whether to start the journal over, with the SHA-1 of
+           the file as last read or written.
+        """
+        if self._journal is not None:
+            self._journal.close()
+        if reset:
+            header = json.dumps({"snapshot": self._digest}) + "\n"
+            replace_file(self._journal_path, header.encode("utf-8"))
+            self._journal_lines = 0
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+        self._journal_valid = True
+
+    def _save(self, users):
+        """
+        A method to replace the file with a list of user dictionaries, and
+        start the journal over since its results are now in the file. The
+        file's lock must be held.
+        """
+        content = json.dumps(users, indent=4).encode("utf-8")
+        replace_file(self._path, content)
+        self._digest = hashlib.sha1(content).hexdigest()
+        if self._journal is not None or os.path.exists(self._journal_path):
+            self._open_journal(reset=True)
+        self._signature = self._disk_signature()
+
+    def _changed(self, usernames, fields):
+        """
+        A method to record changed users, and write the file if the number of
+        changes calls for it, or start the timer otherwise.
+
+        Args:
+        1. usernames (iterable): The usernames of the changed users.
+        2. fields (iterable): The fields changed, or None for added users.
+        """
+        self._version += 1
+        self._changes += 1
+        for username in usernames:
+            if fields is None:
+                self._dirty[username] = None
+            elif self._dirty.get(username, ()) is not None:
+                self._dirty.setdefault(username, set()).update(fields)
+        if self._changes >= self._flush_every:
+            self.flush()
+        elif self._timer is None and self._flush_interval is not None:
+            self._timer = threading.Timer(self._flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self, compact=False):
+        """
+        A method to write the changes made in memory to the file. Game results
+        in the journal are written along with them.
+
+        Args:
+        1. compact (bool): Whether to write the file when only the journal has
+           changed, to compact it.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            changed = self._dirty or (compact and self._journal_lines)
+            if changed and self._users is not None:
+                with file_lock(self._path):
+                    if self._stale():
+                        self._reload()
+                    self._save(list(self._users.values()))
+                self._dirty.clear()
+                self._changes = 0
+
+    def compact(self):
+        """
+        A method to compact the journal into the file in a background thread,
+        unless a compaction is already running.
+
+        Returns the compaction thread.
+        """
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(
+                    target=self.flush, args=(True,), daemon=True
+                )
+                self._compactor.start()
+            return self._compactor
+
+    def close(self):
+        """A method to write any changes before the repository is dropped."""
+        self.flush()
+        atexit.unregister(self.flush)
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def all(self):
+        """Returns a copy of every user dictionary, in creation order."""
+        with self._lock:
+            return [dict(user) for user in self._cache().values()]
+
+    def get(self, username):
+        """Returns a copy of the user dictionary of a username, or None."""
+        with self._lock:
+            user = self._cache().get(username)
+            return None if user is None else dict(user)
+
+    def find(self, username):
+        """
+        Returns a copy of the user dictionary of a username whatever its
+        case, or None, looked up in the username index.
+        """
+        with self._lock:
+            self._cache()
+            username = self._index.get(username_key(username))
+            return None if username is None else dict(self._users[username])
+
+    def add(self, user):
+        """A method to add a new user dictionary."""
+        with self._lock:
+            self._cache()[user["username"]] = dict(user)
+            self._index[username_key(user["username"])] = user["username"]
+            self._changed([user["username"]], None)
+
+    def update(self, username, **fields):
+        """
+        A method to change fields of a user dictionary.
+
+        Returns True if the user was found, False otherwise.
+        """
+        with self._lock:
+            user = self._cache().get(username)
+            if user is None:
+                return False
+            user.update(fields)
+            self._changed([username], fields)
+            return True
+
+    def record_game(self, players, winner):
+        """
+        A method to append a finished game to the journal, and add it to the
+        game record of its players in memory.
+
+        Args:
+        1. players (list): The usernames of the players. Usernames that are
+           not stored (e.g. guests) are ignored.
+        2. winner (str): The username of the winner, or None for a draw.
+        """
+        with self._lock, file_lock(self._path):
+            if self._stale():
+                self._reload()
+            if not self._journal_valid:
+                # The journal cannot be appended to, but its results are in
+                # memory: they are kept by compacting them into the file,
+                # which starts the journal over.
+                self._save(list(self._users.values()))
+                self._dirty.clear()
+                self._changes = 0
+            elif self._journal is None:
+                self._open_journal(
+                    reset=not os.path.exists(self._journal_path)
+                )
+            self._journal.write(
+                json.dumps({"players": list(players), "winner": winner}) + "\n"
+            )
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_lines += 1
+            self._apply_game(self._users, players, winner)
+            self._version += 1
+            self._signature = self._disk_signature()
+        if self._journal_lines >= self._compact_every:
+            self.compact()
+
+
+class SqliteUserRepository(UserRepository):
+    """
+    Represents user accounts stored in an SQLite database, one row per user.
+    Lookups go through the username primary key, and the high-score fields
+    are indexed.
+
+    Attributes:
+    1. _path (str): The path of the database file.
+    2. _connection (sqlite3.Connection): The connection to the database.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path="users.db"):
+        self._path = path
+        # The game server uses the repository from worker threads, one call
+        # at a time, so the connection is not bound to the opening thread.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    pin TEXT NOT NULL,
+                    games_played INTEGER NOT NULL DEFAULT 0,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    losses INTEGER NOT NULL DEFAULT 0,
+                    win_ratio REAL NOT NULL DEFAULT 0,
+                    color TEXT NOT NULL,
+                    piece_type TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS users_username_nocase
+                    ON users (username COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS users_wins ON users (wins);
+                CREATE INDEX IF NOT EXISTS users_games_played
+                    ON users (games_played);
+                CREATE INDEX IF NOT EXISTS users_win_ratio ON users (win_ratio);
+            """)
+
+    @property
+    def path(self):
+        """A method to access the path of the database file."""
+        return self._path
+
+    def all(self):
+        """Returns a list of every user dictionary, in creation order."""
+        rows = self._connection.execute("SELECT * FROM users ORDER BY rowid")
+        return [dict(row) for row in rows]
+
+    def get(self, username):
+        """Returns the user dictionary of a username, or None if not found."""
+        row = self._connection.execute(
+            "SELECT * FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return None if row is None else dict(row)
+
+    def find(self, username):
+        """
+        Returns the user dictionary of a username whatever its case, or None,
+        looked up in the case-insensitive username index.
+        """
+        row = self._connection.execute(
+            "SELECT * FROM users WHERE username = ? COLLATE NOCASE",
+            (username,)
+        ).fetchone()
+        return None if row is None else dict(row)
+
+    def add(self, user):
+        """A method to insert a new user dictionary."""
+        self.add_many([user])
+
+    def add_many(self, users):
+        """
+        A method to insert or replace many user dictionaries in one
+        transaction. Missing fields take the values of a new account.
+        """
+        defaults = {"games_played": 0, "wins": 0, "losses": 0,
+                    "win_ratio": 0.0}
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO users ({', '.join(USER_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(USER_FIELDS))})",
+                [[user.get(field, defaults.get(field)) for field in USER_FIELDS]
+                 for user in users]
+            )
+
+    def update(self, username, **fields):
+        """
+        A method to change fields of a user dictionary.
+
+        Returns True if the user was found, False otherwise.
+        """
+        columns = [field for field in fields if field in USER_FIELDS]
+        with self._connection:
+            cursor = self._connection.execute(
+                f"UPDATE users SET {', '.join(f'{c} = ?' for c in columns)} "
+                "WHERE username = ?",
+                [fields[column] for column in columns] + [username]
+            )
+        return cursor.rowcount > 0
+
+    def record_game(self, players, winner):
+        """
+        A method to add a finished game to the game record of its players,
+        with one UPDATE statement, so both players are updated or neither.
+
+        Args:
+        1. players (list): The usernames of the players. Usernames that are
+           not stored (e.g. guests) are ignored.
+        2. winner (str): The username of the winner, or None for a draw.
+        """
+        if not players:
+            return
+        # The right-hand sides see the values from before the update, so the
+        # win ratio is computed from the updated counts explicitly.
+        wins = "(wins + (username IS :winner))"
+        losses = "(losses + (:winner IS NOT NULL AND username IS NOT :winner))"
+        with self._connection:
+            self._connection.execute(
+                f"UPDATE users SET games_played = games_played + 1, "
+                f"wins = {wins}, losses = {losses}, "
+                f"win_ratio = ROUND(({wins} + 0.5 * (games_played + 1 - "
+                f"{wins} - {losses})) * 100.0 / (games_played + 1), 2) "
+                f"WHERE username IN "
+                f"({', '.join(f':player{i}' for i in range(len(players)))})",
+                {"winner": winner,
+                 **{f"player{i}": name for i, name in enumerate(players)}}
+            )
+
+    @property
+    def version(self):
+        """
+        A method to access the database's version: changes made by other
+        connections, and by this one.
+        """
+        data_version = self._connection.execute(
+            "PRAGMA data_version"
+        ).fetchone()[0]
+        return data_version, self._connection.total_changes
+
+    def stats(self):
+        """Returns a list of every user's game record, in creation order."""
+        rows = self._connection.execute(
+            f"SELECT {', '.join(STATS_FIELDS)} FROM users ORDER BY rowid"
+        )
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """A method to close the connection to the database."""
+        self._connection.close()
+
+
+def migrate_json_to_sqlite(json_path="users.json", db_path="users.db"):
+    """
+    Function to copy every user of a JSON file into an SQLite database, in one
+    transaction. Users already in the database are overwritten.
+
+    Args:
+    1. json_path (str): The path of the JSON file to read.
+    2. db_path (str): The path of the database to write.
+
+    Returns the number of users copied.
+    """
+    users = JsonUserRepository(json_path).all()
+    target = SqliteUserRepository(db_path)
+    target.add_many(users)
+    target.close()
+    return len(users)
+
+
+# The repository in use, created on first access if not configured.
+_repository = None
+
+
+def configure_repository(backend=None, path=None):
+    """
+    Function to choose where user accounts are stored.
+
+    Args:
+    1. backend (str): "json" or "sqlite". Defaults to the CONNECT4_USER_STORE
+       environment variable, or "json" if it is not set.
+    2. path (str): The path of the users file. Defaults to users.json or
+       users.db depending on the backend.
+
+    Raises ValueError if the backend is unknown.
+
+    Returns the repository.
+    """
+    global _repository
+    if _repository is not None:
+        _repository.close()
+    backend = backend or os.environ.get("CONNECT4_USER_STORE", "json")
+    if backend == "json":
+        _repository = CachedJsonUserRepository(path or "users.json")
+    elif backend == "sqlite":
+        _repository = SqliteUserRepository(path or "users.db")
+    else:
+        raise ValueError(f"Unknown user store: {backend}")
+    return _repository
+
+
+def repository():
+    """
+    Function to access the repository in use, configured from the environment
+    if configure_repository() has not been called.
+    """
+    if _repository is None:
+        configure_repository()
+    return _repository
+
+
+if __name__ == "__main__":
+    count = migrate_json_to_sqlite()
+    print(f"{count:,} users copied from users.json to users.db.")
@@ -15,102 +15,118 @@ import re
 import sys
 
 # Local Modules
-from custom_errors import UsernameError
+from custom_errors import UserRecordError, UsernameError
+from leaderboards import leaderboards, update_leaderboards
+from sessions import SESSIONS_FILE, configure_sessions, sessions
+from user_store import configure_repository, repository
 
 
-def check_json():
+def create_blank_json():
     """
-    A function to ensure users.json exists, and that it is in the right format.
+    A function to create users.json as an empty list if the file is missing,
+    or if it is completely empty.
+
+    Returns True if the file was created, False if it already had content.
     """
-    # Error handling if users.json is not found or is an invalid .json file.
     try:
         with open("users.json", "r", encoding="utf-8") as file:
-            content = file.read()
-            # If users.json is completely empty, make it into an empty list.
-            if not content.strip():
-                users = []
-                with open("users.json", "w", encoding="utf-8") as file:
-                    json.dump(users, file, indent=4)
-            else:
-                with open("users.json", "r", encoding="utf-8") as file:
-                    users = json.load(file)
-    # Creates users.json as an empty list if the file is missing
+            blank = all(
+                not chunk.strip() for chunk in iter(lambda: file.read(4096), "")
+            )
     except FileNotFoundError:
+        blank = True
+    if blank:
         with open("users.json", "w", encoding="utf-8") as file:
             json.dump([], file, indent=4)
-            users = []
-    except json.JSONDecodeError as error:
-        # If users.json is invalid, warns user and exit.
-        print(
-            "JSON decoding failed. If users.json has been manually edited, "
-            "there may have been an issue with the format of the file. "
-            "Please backup any user data from users.json, and ensure the "
-            "file is in the right format before starting the game. "
-            "Exiting game now."    
-        )
-        print(error)
-        sys.exit()
-    else:
-        # Warns user and exits the game if users.json exists but is not a list.
-        if not isinstance(users, list):
-            print(
-                "Data type error. users.json should be a list. Please backup "
-                "any user data from the file, and fix the issue. "
-                "Exiting game now."
-            )
-            sys.exit()
-        # Warns user and exits the game if users.json is a list but any of its
-        # elements is not a dictionary. Empty lists are exempt.
-        if users != []:
-            for user in users:
-                if not isinstance(user, dict):
-                    print(
-                        "Data type error. All elements in users.json should be "
-                        "dictionaries. Please backup any user data from the "
-                        "file, and fix the issue. Exiting game now."
-                )
-                    sys.exit()
-    return users
+    return blank
+
+
+def exit_invalid_json(error):
+    """
+    A function to warn the user that users.json is invalid, and exit.
+
+    Args:
+    1. error (UserRecordError): The error describing the first invalid part
+       of the file.
+    """
+    print(
+        f"{error} If users.json has been manually edited, there may have "
+        "been an issue with the format of the file. Please backup any "
+        "user data from users.json, and fix the issue before starting the "
+        "game. Exiting game now."
+    )
+    sys.exit()
+
+
+def bootstrap_users():
+    """
+    A function to prepare user accounts when the program starts. The user
+    repository is configured, and with the JSON backend, users.json is
+    checked and loaded into memory in one read. Sessions are kept in the
+    lease file shared with other processes, and the lounge's leaderboards
+    are built from the loaded users.
+
+    Returns the user repository.
+    """
+    store = configure_repository()
+    if store.backend == "json":
+        create_blank_json()
+        try:
+            store.load()
+        except UserRecordError as error:
+            exit_invalid_json(error)
+    configure_sessions(SESSIONS_FILE)
+    leaderboards()
+    return store
 
 
 def generate_users_record():
-    """A function to return all of users' game records from users.json"""
-    with open("users.json", "r", encoding="utf-8") as file:
-        users_record = json.load(file)
-    # Delete keys that has nothing to do with game history
-    key_del_list = ["pin", "color", "piece_type", "logged_in"]
-    for user in users_record:
-        for key in key_del_list:
-            del user[key]
-    return users_record
+    """
+    A function to return all of users' game records from the repository, as a
+    read-only view of the stored users (see StatsProjection).
+    """
+    # Only keys that have to do with game history are exposed.
+    return repository().stats_view()
 
 
 def reset_log():
     """
-    Function to ensure all users are logged out from the game.
+    Function to ensure all users logged in by this program are logged out.
     """
-    with open("users.json", "r", encoding="utf-8") as file:
-        users = json.load(file)
-    if users != []:
-        for user in users:
-            user["logged_in"] = "n"
-        with open("users.json", "w", encoding="utf-8") as file:
-            json.dump(users, file, indent=4)
+    sessions().logout_all()
 
 
 def logout(username):
     """Function for a user to log out of the game."""
-    with open("users.json", "r", encoding="utf-8") as file:
-        users = json.load(file)
-    for user in users:
-        if user["username"] == username:
-            user["logged_in"] = "n"
-            break
-    else:
+    if not sessions().logout(username):
         print("Logout failed.")
 
-    with open("users.json", "w",encoding="utf-8") as file:
-        json.dump(users, file, indent=4)
+
+def record_result(winner, loser, draw=False):
+    """
+    Function to add a finished game to the game history of both users, in
+    memory and in the user repository. Both users' stats are stored in one
+    write (or one transaction), so they are updated together or not at all.
+    Guest accounts are skipped, and storage is not touched if both users are
+    guests.
+
+    Args:
+    1. winner (User): The User instance of the player that won the game, or
+       of either player for a draw.
+    2. loser (User): The User instance of the other player.
+    3. draw (bool): Whether the game was a draw.
+    """
+    winner_name = None if draw else winner.username
+    players = [
+        user.username for user in (winner, loser) if user.add_game(winner_name)
+    ]
+    if players:
+        version = repository().version
+        repository().record_game(players, winner_name)
+        update_leaderboards(*(
+            user.game_record() for user in (winner, loser)
+            if user.username in players
+        ), version=version)
 
 
 class User:
@@ -195,43 +211,42 @@ class User:
         """A method to set win ratio of a user."""
         self._win_ratio = float(win_ratio)
 
-    def update_game_history(self, winner):
+    def add_game(self, winner):
         """
-        A method to update the game history of a user as stored in users.json.
+        A method to update the game history of a user in memory only, unless
+        the user is a guest.
 
         Args:
-        1. winner (Piece): A Piece instance that represents the player that
-           won a game.
+        1. winner (str): The username of the player that won a game, or None
+           for a draw.
+
+        Returns True if the game history was updated, False for a guest.
         """
-        # Updates a User instance's game stats if it is not a guest account.
-        if self.username.lower() != "guest":
-            self.games_played += 1
-            # If there is a winner, meaning the game is not a draw, wins and
-            # losses are updated accordingly.
-            if winner is not None:
-                self.wins += 1 if winner.player_name == self.username else 0
-                self.losses += 0 if winner.player_name == self.username else 1
-
-            draws = self.games_played - (self.wins + self.losses)
-            self.win_ratio = (
-                ((self.wins + (0.5 * draws)) / self.games_played)
-                * 100
-                )
-
-            # Stores updated records in users.json.
-            with open("users.json", "r", encoding="utf-8") as file:
-                users = json.load(file)
-            for user in users:
-                if user["username"] == self.username:
-                    user["games_played"] = self.games_played
-                    user["wins"] = self.wins
-                    user["losses"] = self.losses
-                    user["win_ratio"] = self.win_ratio
-                    break
-            with open("users.json", "w", encoding="utf-8") as file:
-                json.dump(users, file, indent=4)
-        else:
-            pass
+        if self.username.lower() == "guest":
+            return False
+        self.games_played += 1
+        # If there is a winner, meaning the game is not a draw, wins and
+        # losses are updated accordingly.
+        if winner is not None:
+            self.wins += 1 if winner == self.username else 0
+            self.losses += 0 if winner == self.username else 1
+
+        draws = self.games_played - (self.wins + self.losses)
+        self.win_ratio = (
+            ((self.wins + (0.5 * draws)) / self.games_played)
+            * 100
+            )
+        return True
+
+    def game_record(self):
+        """A method to return the user's game stats as a dictionary."""
+        return {
+            "username": self.username,
+            "games_played": self.games_played,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_ratio": self.win_ratio,
+        }
 
     def display(self):
         """Method to display own game statistics, unless user is a guest."""
@@ -6,9 +6,6 @@ program.
 
 # Standard Library Modules
 import re
-import subprocess
-import json
-import os
 
 # Third-party Library Modules
 from maskpass import askpass
@@ -16,24 +13,21 @@ from termcolor import colored
 
 # Local Modules
 from custom_errors import InvalidCommandError, UsernameError, ColorError
+from screen import SCREEN
+from user_store import repository
 
 
 def clear_screen():
     """A function that clears the terminal."""
-    # If OS is Windows, use cls
-    if os.name == "nt":
-        try:
-            subprocess.run("cls", shell=True, check=True)
-        except subprocess.CalledProcessError:
-            subprocess.run("clear", shell=True, check=True)
-    else:
-        subprocess.run("clear", shell=True, check=True)
+    SCREEN.clear()
 
 
 def reset_screen(board):
-    """A function that clears the terminal, and displays updated game board."""
-    clear_screen()
-    board.display()
+    """
+    A function that displays the updated game board at the top of the
+    terminal, rewriting only the lines of the board that changed.
+    """
+    SCREEN.draw(board.render())
 
 
 def validate_input(
@@ -89,8 +83,6 @@ def validate_username(prompt, match):
     Returns the user input once it is considered valid.
     """
     user_input = input(prompt)
-    with open("users.json", "r", encoding="utf-8") as file:
-        users = json.load(file)
 
     # Loops until a valid username format is entered.
     while True:
@@ -99,14 +91,13 @@ def validate_username(prompt, match):
             if not re.fullmatch(match, user_input):
                 raise UsernameError("Invalid username, please try again: ")
             # If username has right format, but is guest, loops again.
-            if user_input.lower in ("guest", "guest1", "guest2"):
+            if user_input.lower() in ("guest", "guest1", "guest2"):
                 raise UsernameError("That's a guest account, please try again: ")
             # If username has right format and is not guest, but is associated
-            # with another user account, loops again.
-            for user in users:
-                if user_input == user.get("username"):
-                    raise UsernameError(f"Username {user_input} is taken, "
-                                        "please try again: ")
+            # with another user account (whatever the case), loops again.
+            if repository().find(user_input) is not None:
+                raise UsernameError(f"Username {user_input} is taken, "
+                                    "please try again: ")
             clear_screen()
             return user_input
         except UsernameError as error:
@@ -217,15 +208,9 @@ def change_piece_properties(player):
                 continue
             break
 
-        with open("users.json", "r", encoding="utf-8") as file:
-            users = json.load(file)
-
-        for user in users:
-            if user["username"] == player.player_name:
-                user["color"] = player.color
-                user["piece_type"] = player.piece_type
-                break
-
-        with open("users.json", "w", encoding="utf-8") as file:
-            json.dump(users, file, indent=4)
+        repository().update(
+            player.player_name,
+            color=player.color,
+            piece_type=player.piece_type
+        )
      
\ No newline at end of file
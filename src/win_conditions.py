@@ -1,8 +1,88 @@
 """
 Module that contains the VictoryChecker class, representing the game's referee.
-Defines the win logic of the game.
+Defines the win logic of the game, along with a vectorised version of it to
+evaluate many boards at once.
 """
 
+
+# Third-party Library Modules
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _generate_windows():
+    """
+    Function to list every line of 4 slots on the board, as flat indices into a
+    6 x 7 array, along with the order in which the referee checks them.
+
+    Returns a tuple of the lines (np.array of shape (69, 4)) and the checks
+    (np.array of shape (138, 2)), each check being a (line index, player) pair
+    listed in the same order as horizontal_victory(), vertical_victory() and
+    diagonal_victory() scan the board.
+    """
+    indices = np.arange(42).reshape(6, 7)
+    # Sliding windows over the rows, columns, and 4 x 4 blocks of the board.
+    horizontal = sliding_window_view(indices, 4, axis=1).reshape(-1, 4)
+    vertical = sliding_window_view(indices, 4, axis=0).reshape(-1, 4)
+    blocks = sliding_window_view(indices, (4, 4)).reshape(-1, 4, 4)
+    # North-west to south-east and south-west to north-east diagonals of each
+    # block, interleaved as diagonal_victory() checks them.
+    diagonal = np.stack(
+        [blocks.diagonal(axis1=1, axis2=2),
+         blocks[:, :, ::-1].diagonal(axis1=1, axis2=2)],
+        axis=1
+    ).reshape(-1, 4)
+    lines = np.concatenate([horizontal, vertical, diagonal])
+
+    checks = []
+    straight = len(horizontal) + len(vertical)
+    # Horizontal and vertical lines: player 1 then player 2 for each line.
+    for line in range(straight):
+        checks += [(line, 1), (line, 2)]
+    # Diagonal lines: player 1 on either diagonal of a block, then player 2.
+    for line in range(straight, len(lines), 2):
+        checks += [(line, 1), (line + 1, 1), (line, 2), (line + 1, 2)]
+    return lines, np.array(checks)
+
+
+_LINES, _CHECKS = _generate_windows()
+
+
+def batch_victory(positions):
+    """
+    Function to check the win conditions of many boards at once, without a
+    Python loop per board. The result of each board is the same as the one
+    VictoryChecker would give through horizontal_victory(), vertical_victory()
+    and diagonal_victory(), including which line is reported when a board has
+    more than one.
+
+    Args:
+    1. positions (np.array): An N x 6 x 7 array of board arrays, each slot
+       being "0", "1" or "2" (or their integer equivalents).
+
+    Returns a tuple of:
+    1. winners (np.array): N player numbers (1 or 2), 0 where nobody won.
+    2. lines (np.array): N x 4 x 2 (row, column) array indices of the winning
+       line of each board, -1 where nobody won.
+    """
+    positions = np.asarray(positions).astype(str).reshape(-1, 42)
+    # Slots of every line of every board, shape (N, 69, 4).
+    slots = positions[:, _LINES]
+    owned = np.stack(
+        [(slots == "1").all(axis=2), (slots == "2").all(axis=2)],
+        axis=2
+    )
+    # Result of every check in the referee's order, shape (N, 138).
+    hits = owned[:, _CHECKS[:, 0], _CHECKS[:, 1] - 1]
+    found = hits.any(axis=1)
+    first = _CHECKS[hits.argmax(axis=1)]
+
+    winners = np.where(found, first[:, 1], 0).astype(np.int8)
+    lines = np.stack(np.divmod(_LINES[first[:, 0]], 7), axis=2)
+    lines[~found] = -1
+    return winners, lines
+
+
 class VictoryChecker:
     """
     An instance of this class represents the referee of the game.
@@ -72,6 +152,41 @@ class VictoryChecker:
                     return self._piece2
         return None
 
+    def last_move_victory(self, column, row, player):
+        """
+        Defines how the referee detects 4 game pieces aligned through the slot
+        of the last piece dropped. Only the four lines (horizontal, vertical
+        and both diagonals) crossing that slot are walked, since no other line
+        can have been completed by the move.
+
+        Args:
+        1. column (int): The column number (1-7) of the last piece dropped.
+        2. row (int): The index of the row (0 being the top row of the board's
+           array) where the last piece landed, as returned by Piece.drop().
+        3. player (str): The player number of the last piece dropped.
+
+        Returns the Piece instance that won based on this condition, or None
+        if the last move did not complete a line.
+        """
+        player = str(player)
+        for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            # Walks away from the slot in both directions of the line, as long
+            # as the slots belong to the same player.
+            for sign in (1, -1):
+                i_row = row + sign * row_step
+                i_column = column + sign * column_step
+                while (
+                    0 <= i_row < 6 and 1 <= i_column <= 7 and
+                    self._board.slot(i_row, i_column) == player
+                ):
+                    count += 1
+                    i_row += sign * row_step
+                    i_column += sign * column_step
+            if count >= 4:
+                return self._piece1 if player == "1" else self._piece2
+        return None
+
     def surrender(self):
         """
         Defines how surrenders are implemented. Reads the surrender attribute
@@ -87,14 +202,23 @@ class VictoryChecker:
             return self._piece1
         return None
 
-    def check_victory(self):
+    def check_victory(self, last_move=None):
         """
         Combines all the methods to check if any piece satisfies at least one
         of the three winning conditions.
 
+        Args:
+        1. last_move (tuple): The (column, row, player) of the last piece
+           dropped. If given, only the lines through that slot are checked
+           (see last_move_victory()) instead of the whole board. None by
+           default.
+
         Returns the Piece instance that satisfies at least one winning
         condition, or None if none is detected.
         """
+        if last_move is not None:
+            return self.last_move_victory(*last_move) or self.surrender()
+
         winner = (
             self.horizontal_victory() or
             self.vertical_victory() or